@@ -0,0 +1,40 @@
+"""Compare per-run latency of the Python execution backends.
+
+Usage: python benchmarks/bench_execution_backends.py [runs]
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import Config
+from services.code_execution_service import execute_code
+
+SNIPPET = "import collections\nprint(sum(range(1000)))"
+
+
+def bench(backend: str, runs: int) -> list[float]:
+    Config.PYTHON_EXECUTION_BACKEND = backend
+    execute_code(SNIPPET, "python")  # warm-up, starts pools / the zygote
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        execute_code(SNIPPET, "python")
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for backend in ("subprocess", "pool", "zygote"):
+        timings = bench(backend, runs)
+        print(
+            f"{backend:<10} median {statistics.median(timings) * 1000:7.2f} ms  "
+            f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
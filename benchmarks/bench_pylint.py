@@ -0,0 +1,42 @@
+"""Compare the pylint CLI path with the long-lived pylint worker.
+
+Usage: python benchmarks/bench_pylint.py [runs]
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import Config
+from services.attempt_service import run_pylint
+
+SUBMISSION = '''def reverse_string(s):
+    result = ""
+    for ch in s:
+        result = ch + result
+    return result
+'''
+
+
+def bench(backend: str, runs: int) -> tuple[list[float], float]:
+    Config.PYLINT_BACKEND = backend
+    score, _ = run_pylint(SUBMISSION)  # warm-up, starts the worker pool
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run_pylint(SUBMISSION)
+        timings.append(time.perf_counter() - started)
+    return timings, score
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for backend in ("subprocess", "worker"):
+        timings, score = bench(backend, runs)
+        print(f"{backend:<10} score {score:5.2f}  median {statistics.median(timings) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,10 @@ from flask import Flask, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 from database.db import init_db
-from routes import code_execution, ai_assistant, exercises, attempts, users
+from config import Config
+from services.grading_queue import resume_pending_attempts
+from services.regrade_service import resume_regrade_jobs
+from routes import code_execution, ai_assistant, exercises, attempts, users, sessions
 from prometheus_client import make_wsgi_app
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 import psutil
@@ -22,13 +25,27 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
-init_db()
+
+def start_background_work():
+    """Creates or upgrades tables and resumes pending attempts and unfinished regrade jobs."""
+    init_db()
+    if Config.GRADING_RESUME_ON_STARTUP:
+        resume_pending_attempts()
+    if Config.REGRADE_RESUME_ON_STARTUP:
+        resume_regrade_jobs()
+
+
+# Processes spawned by the regrade pool import this module as __mp_main__
+# when it is run as a script; only the serving process starts the work
+if __name__ != '__mp_main__':
+    start_background_work()
 
 app.register_blueprint(code_execution.bp, url_prefix='/api/code')
 app.register_blueprint(ai_assistant.bp, url_prefix='/api/ai')
 app.register_blueprint(exercises.bp, url_prefix='/api/exercises')
 app.register_blueprint(attempts.bp, url_prefix='/api/attempts')
 app.register_blueprint(users.bp, url_prefix='/api/users')
+sessions.register(app)
 
 @app.before_request
 def before_request():
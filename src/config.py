@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,6 +18,97 @@ class Config:
     
     EXECUTION_TIMEOUT = int(os.environ.get('EXECUTION_TIMEOUT', 30))
     MAX_CODE_LENGTH = int(os.environ.get('MAX_CODE_LENGTH', 10000))
+    # Per-stream cap on captured program output; runs that exceed it are killed
+    MAX_OUTPUT_BYTES = int(os.environ.get('MAX_OUTPUT_BYTES', 1024 * 1024))
+    # Per-process rlimits for submitted code (POSIX only); exercises may override them.
+    # 0 disables a limit. Node gets the memory limit as its heap size instead of RLIMIT_AS.
+    EXECUTION_MEMORY_LIMIT_MB = int(os.environ.get('EXECUTION_MEMORY_LIMIT_MB', 256))
+    EXECUTION_CPU_LIMIT_SECONDS = int(os.environ.get('EXECUTION_CPU_LIMIT_SECONDS', 5))
+    EXECUTION_PROCESS_LIMIT = int(os.environ.get('EXECUTION_PROCESS_LIMIT', 0))
+    # Admission control for /api/code/execute: runs allowed at once, runs allowed
+    # to wait for a slot, and how long one may wait before getting a 429
+    EXECUTION_MAX_CONCURRENCY = int(os.environ.get('EXECUTION_MAX_CONCURRENCY', 8))
+    EXECUTION_MAX_QUEUED = int(os.environ.get('EXECUTION_MAX_QUEUED', 32))
+    EXECUTION_MAX_QUEUE_WAIT = float(os.environ.get('EXECUTION_MAX_QUEUE_WAIT', 2))
+    # Parse code in-process (Python) or in a warm node worker (JavaScript) before
+    # spawning anything, so syntax errors come back without a subprocess
+    SYNTAX_PRECHECK = os.environ.get('SYNTAX_PRECHECK', 'true').lower() == 'true'
+    # Max memoized results of deterministic snippets, keyed by code, language and
+    # runtime version; 0 (the default) disables the cache. Entries expire after TTL seconds.
+    EXECUTION_CACHE_SIZE = int(os.environ.get('EXECUTION_CACHE_SIZE', 0))
+    EXECUTION_CACHE_TTL = float(os.environ.get('EXECUTION_CACHE_TTL', 600))
+    # Interactive sessions over WebSocket (needs flask-sock): each holds one
+    # interpreter whose state persists between runs. The rlimits above apply to
+    # the whole session, which is closed after IDLE_TIMEOUT seconds without a run.
+    EXECUTION_SESSIONS_ENABLED = os.environ.get('EXECUTION_SESSIONS_ENABLED', 'false').lower() == 'true'
+    EXECUTION_MAX_SESSIONS = int(os.environ.get('EXECUTION_MAX_SESSIONS', 20))
+    EXECUTION_SESSION_IDLE_TIMEOUT = float(os.environ.get('EXECUTION_SESSION_IDLE_TIMEOUT', 300))
+
+    # 'subprocess' spawns a fresh interpreter per run, 'pool' reuses warm workers,
+    # 'zygote' forks each run from a preloaded Python process (POSIX only)
+    PYTHON_EXECUTION_BACKEND = os.environ.get('PYTHON_EXECUTION_BACKEND', 'subprocess')
+    JAVASCRIPT_EXECUTION_BACKEND = os.environ.get('JAVASCRIPT_EXECUTION_BACKEND', 'subprocess')
+    EXECUTION_POOL_SIZE = int(os.environ.get('EXECUTION_POOL_SIZE', 4))
+    EXECUTION_POOL_MAX_RUNS = int(os.environ.get('EXECUTION_POOL_MAX_RUNS', 50))
+    EXECUTION_POOL_QUEUE_TIMEOUT = float(os.environ.get('EXECUTION_POOL_QUEUE_TIMEOUT', 10))
+
+    # 'subprocess' runs the pylint CLI per attempt, 'worker' keeps pylint loaded
+    PYLINT_BACKEND = os.environ.get('PYLINT_BACKEND', 'subprocess')
+    PYLINT_POOL_SIZE = int(os.environ.get('PYLINT_POOL_SIZE', 2))
+    PYLINT_POOL_MAX_RUNS = int(os.environ.get('PYLINT_POOL_MAX_RUNS', 200))
+
+    # 'subprocess' runs npx eslint per attempt, 'daemon' keeps ESLint loaded
+    ESLINT_BACKEND = os.environ.get('ESLINT_BACKEND', 'subprocess')
+    ESLINT_POOL_SIZE = int(os.environ.get('ESLINT_POOL_SIZE', 1))
+    ESLINT_POOL_MAX_RUNS = int(os.environ.get('ESLINT_POOL_MAX_RUNS', 500))
+
+    GRADING_WORKERS = int(os.environ.get('GRADING_WORKERS', 4))
+    GRADING_QUEUE_SIZE = int(os.environ.get('GRADING_QUEUE_SIZE', 100))
+    # Queue attempts left pending by a restart for grading again on startup
+    GRADING_RESUME_ON_STARTUP = os.environ.get('GRADING_RESUME_ON_STARTUP', 'true').lower() == 'true'
+    # A pending attempt claimed this long ago is taken to have lost its grader;
+    # keep it above the longest grading
+    GRADING_LEASE_SECONDS = int(os.environ.get('GRADING_LEASE_SECONDS', 600))
+    # Test and lint phases of all in-flight gradings share this many threads
+    GRADING_PHASE_CONCURRENCY = int(os.environ.get('GRADING_PHASE_CONCURRENCY', 8))
+    # Harness processes all sharded gradings may run at once (see Exercise.test_shards)
+    GRADING_SHARD_CONCURRENCY = int(os.environ.get('GRADING_SHARD_CONCURRENCY', os.cpu_count() or 4))
+    # Max cached grading results keyed by code and exercise; 0 disables the cache
+    GRADING_CACHE_SIZE = int(os.environ.get('GRADING_CACHE_SIZE', 1000))
+    # Max cached expected digests of generated test cases, one entry per generator spec
+    GRADING_GENERATOR_CACHE_SIZE = int(os.environ.get('GRADING_GENERATOR_CACHE_SIZE', 256))
+    # Generated test cases are written here once per spec and read by the harnesses
+    GRADING_GENERATOR_DIR = os.environ.get(
+        'GRADING_GENERATOR_DIR', os.path.join(tempfile.gettempdir(), 'codesnap-generated-cases')
+    )
+    # Deadline for each test case inside the grading harness. On a timeout,
+    # 'continue' runs the remaining cases and 'abort' skips them.
+    GRADING_CASE_TIMEOUT_MS = int(os.environ.get('GRADING_CASE_TIMEOUT_MS', 1000))
+    GRADING_TIMEOUT_POLICY = os.environ.get('GRADING_TIMEOUT_POLICY', 'continue')
+    # Benchmark submissions that pass every test against the exercise's reference
+    # solution: WARMUP untimed passes, then the median of RUNS timed passes, with
+    # both processes pinned to one of BENCHMARK_CPUS (comma-separated; empty picks
+    # the last CPU available). Each reserved CPU runs one benchmark at a time; a
+    # submission still waiting for one after BENCHMARK_QUEUE_TIMEOUT seconds is
+    # graded without a benchmark.
+    GRADING_BENCHMARK_ENABLED = os.environ.get('GRADING_BENCHMARK_ENABLED', 'false').lower() == 'true'
+    GRADING_BENCHMARK_WARMUP = int(os.environ.get('GRADING_BENCHMARK_WARMUP', 1))
+    GRADING_BENCHMARK_RUNS = int(os.environ.get('GRADING_BENCHMARK_RUNS', 5))
+    GRADING_BENCHMARK_CPUS = os.environ.get('GRADING_BENCHMARK_CPUS', '')
+    GRADING_BENCHMARK_TIMEOUT = float(os.environ.get('GRADING_BENCHMARK_TIMEOUT', 10))
+    GRADING_BENCHMARK_QUEUE_TIMEOUT = float(os.environ.get('GRADING_BENCHMARK_QUEUE_TIMEOUT', 30))
+    # Efficiency score (0-10) below which the third star is withheld; 0 ignores efficiency
+    GRADING_MIN_EFFICIENCY = float(os.environ.get('GRADING_MIN_EFFICIENCY', 0))
+    # Bulk regrades of an exercise's attempts: BATCH_SIZE attempts are read,
+    # graded on WORKERS processes and written back at a time. A job whose
+    # heartbeat is older than LEASE_SECONDS is taken over by another process;
+    # unfinished jobs are resumed on startup when RESUME_ON_STARTUP is set.
+    REGRADE_WORKERS = int(os.environ.get('REGRADE_WORKERS', 2))
+    REGRADE_BATCH_SIZE = int(os.environ.get('REGRADE_BATCH_SIZE', 20))
+    REGRADE_LEASE_SECONDS = int(os.environ.get('REGRADE_LEASE_SECONDS', 300))
+    REGRADE_RESUME_ON_STARTUP = os.environ.get('REGRADE_RESUME_ON_STARTUP', 'true').lower() == 'true'
+    # Keycloak realm role allowed to start regrades
+    ADMIN_ROLE = os.environ.get('ADMIN_ROLE', 'admin')
     
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, literal
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 from dotenv import load_dotenv
@@ -23,6 +23,42 @@ def get_db():
     finally:
         db.close()
 
+def upgrade_schema(engine):
+    """Adds model columns and indexes missing from tables an older version created.
+
+    create_all never alters existing tables, so without this, columns added
+    to a model later never reach an existing database. A column is added
+    nullable unless its info has a "backfill" value, which rows that predate
+    it get as their default; NOT NULL columns need one.
+    """
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} " \
+                      f"{column.type.compile(dialect=engine.dialect)}"
+                backfill = column.info.get("backfill")
+                if backfill is not None:
+                    value = literal(backfill, column.type).compile(
+                        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+                    )
+                    ddl += f" DEFAULT {value} NOT NULL"
+                print(f"Upgrading schema: {ddl}")
+                conn.exec_driver_sql(ddl)
+            present = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in present:
+                    print(f"Upgrading schema: CREATE INDEX {index.name}")
+                    index.create(conn)
+
 def init_db():
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
@@ -35,6 +35,162 @@ ACTIVE_REQUESTS = Gauge(
     ["blueprint", "method"]
 )
 
+EXECUTION_POOL_SIZE = Gauge(
+    "codesnap_execution_pool_size",
+    "Number of pre-started workers in an execution pool",
+    ["pool"]
+)
+
+EXECUTION_POOL_MAX_RUNS = Gauge(
+    "codesnap_execution_pool_max_runs",
+    "Runs a pooled worker serves before it is recycled",
+    ["pool"]
+)
+
+EXECUTION_POOL_RECYCLES = Counter(
+    "codesnap_execution_pool_recycles_total",
+    "Pooled workers replaced, by reason (max_runs, cpu_limit, dirty, timeout, desync, crashed)",
+    ["pool", "reason"]
+)
+
+EXECUTION_POOL_QUEUE_WAIT = Histogram(
+    "codesnap_execution_pool_queue_wait_seconds",
+    "Time a run waited for an idle pooled worker",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+EXECUTION_POOL_BUSY = Gauge(
+    "codesnap_execution_pool_busy_workers",
+    "Pooled workers currently running a submission",
+    ["pool"]
+)
+
+EXECUTION_DURATION = Histogram(
+    "codesnap_execution_duration_seconds",
+    "Wall time of a single code execution, by language and backend",
+    ["language", "backend"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+EXECUTION_PEAK_RSS = Histogram(
+    "codesnap_execution_peak_rss_bytes",
+    "Peak resident memory of a single run, by language and kind (execute or grading)",
+    ["language", "kind"],
+    buckets=(8e6, 16e6, 32e6, 64e6, 128e6, 256e6, 512e6, 1e9)
+)
+
+EXECUTION_CPU_TIME = Histogram(
+    "codesnap_execution_cpu_seconds",
+    "User plus system CPU time of a single run, by language and kind (execute or grading)",
+    ["language", "kind"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+EXECUTION_IN_FLIGHT = Gauge(
+    "codesnap_execution_in_flight",
+    "Code executions currently holding an admission slot"
+)
+
+EXECUTION_QUEUED = Gauge(
+    "codesnap_execution_queued",
+    "Code executions waiting for an admission slot"
+)
+
+EXECUTION_REJECTED = Counter(
+    "codesnap_execution_rejected_total",
+    "Code executions turned away with 429, by reason (queue_full or wait_timeout)",
+    ["reason"]
+)
+
+EXECUTION_CANCELLED = Counter(
+    "codesnap_execution_cancelled_total",
+    "Executions cancelled before finishing, by reason (superseded or requested)",
+    ["reason"]
+)
+
+SYNTAX_PRECHECK_SPAWNS_AVOIDED = Counter(
+    "codesnap_syntax_precheck_spawns_avoided_total",
+    "Processes not started because the syntax precheck rejected the code, by language and kind",
+    ["language", "kind"]
+)
+
+EXECUTION_SCHEDULER_WAIT = Histogram(
+    "codesnap_execution_scheduler_wait_seconds",
+    "Time spent waiting for an execution slot, by priority class",
+    ["priority"],
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+EXECUTION_CACHE_HITS = Counter(
+    "codesnap_execution_cache_hits_total",
+    "Runs answered from the execution result cache",
+    ["language"]
+)
+
+EXECUTION_CACHE_MISSES = Counter(
+    "codesnap_execution_cache_misses_total",
+    "Cacheable runs that had to execute because no cached result matched",
+    ["language"]
+)
+
+EXECUTION_CACHE_SIZE = Gauge(
+    "codesnap_execution_cache_entries",
+    "Entries currently held in the execution result cache"
+)
+
+EXECUTION_SESSIONS = Gauge(
+    "codesnap_execution_sessions",
+    "Interactive execution sessions currently open",
+    ["language"]
+)
+
+EXECUTION_SESSIONS_CLOSED = Counter(
+    "codesnap_execution_sessions_closed_total",
+    "Interactive execution sessions closed, by reason",
+    ["reason"]
+)
+
+REGRADED_ATTEMPTS = Counter(
+    "codesnap_regraded_attempts_total",
+    "Attempts regraded by bulk regrade jobs, by outcome",
+    ["outcome"]
+)
+
+GRADING_QUEUE_DEPTH = Gauge(
+    "codesnap_grading_queue_depth",
+    "Attempts waiting for a background grading worker"
+)
+
+GRADING_LATENCY = Histogram(
+    "codesnap_grading_latency_seconds",
+    "Time from attempt submission to grading completion",
+    ["status"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+)
+
+GRADING_PHASE_DURATION = Histogram(
+    "codesnap_grading_phase_duration_seconds",
+    "Wall time of a grading phase (tests or lint), by language",
+    ["language", "phase"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+)
+
+GRADING_CACHE_HITS = Counter(
+    "codesnap_grading_cache_hits_total",
+    "Submissions answered from the grading result cache"
+)
+
+GRADING_CACHE_MISSES = Counter(
+    "codesnap_grading_cache_misses_total",
+    "Submissions that had to be graded because no cached result matched"
+)
+
+GRADING_CACHE_SIZE = Gauge(
+    "codesnap_grading_cache_entries",
+    "Entries currently held in the grading result cache"
+)
+
 APP_INFO = Info(
     "flask_app_info",
     "Application information"
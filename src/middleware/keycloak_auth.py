@@ -112,6 +112,16 @@ def get_user_info_from_token(decoded_token, user):
         'roles': decoded_token.get('realm_access', {}).get('roles', []),
     }
 
+def authenticate_token(token):
+    """Verifies a bearer token and returns the user info require_auth would attach.
+
+    For connections that cannot send an Authorization header, such as browser
+    WebSockets. Raises ValueError if the token is invalid.
+    """
+    decoded_token = verify_token(token)
+    user = sync_user_from_token(decoded_token)
+    return get_user_info_from_token(decoded_token, user)
+
 def require_auth(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -152,6 +162,18 @@ def require_auth(f):
     
     return decorated_function
 
+def require_role(role):
+    """Rejects requests whose user lacks the realm role; goes inside require_auth."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            user_info = getattr(request, 'user_info', None) or {}
+            if role not in user_info.get('roles', []):
+                return jsonify({'error': f"Requires the '{role}' role"}), 403
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
 def optional_auth(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -1,5 +1,6 @@
 from .user import User
 from .exercise import Exercise
 from .attempt import Attempt
+from .regrade_job import RegradeJob
 
-__all__ = ['User', 'Exercise', 'Attempt']
\ No newline at end of file
+__all__ = ['User', 'Exercise', 'Attempt', 'RegradeJob']
\ No newline at end of file
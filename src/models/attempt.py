@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, DateTime, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from database.db import Base
@@ -13,7 +13,16 @@ class Attempt(Base):
     code_submitted = Column(Text, nullable=False)
     score = Column(Integer, nullable=False, default=0)
     stars = Column(Integer, nullable=False, default=0)
+    # Attempts from before grading was asynchronous were graded on submission
+    status = Column(String(20), nullable=False, default='pending', info={'backfill': 'graded'})
     attempted_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    graded_at = Column(DateTime, nullable=True)
+    # Set when a grading worker takes the pending attempt; a stale claim can be taken again
+    claimed_at = Column(DateTime, nullable=True)
+    # Benchmark against the reference solution; null when not benchmarked
+    relative_runtime = Column(Float, nullable=True)
+    peak_memory_bytes = Column(BigInteger, nullable=True)
+    efficiency_score = Column(Float, nullable=True)
     
     user = relationship('User', back_populates='attempts')
     exercise = relationship('Exercise', back_populates='attempts')
\ No newline at end of file
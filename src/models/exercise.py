@@ -14,7 +14,18 @@ class Exercise(Base):
     language = Column(String(50), nullable=False) 
     function_name = Column(String, nullable=False)   
     test_cases = Column(JSON, nullable=False)
+    # Seeded generators ([{"seed": 1, "count": 3, "args": [...]}], see workers/case_generators.py)
+    # for large cases, expanded inside the grading harness and checked against
+    # reference_solution; test_cases stay the small visible examples
+    test_generators = Column(JSON, nullable=True)
     reference_solution = Column(Text, nullable=True)
+    # Overrides for the execution rlimits, e.g. {"memory_mb": 512, "cpu_seconds": 10}
+    resource_limits = Column(JSON, nullable=True)
+    # Split test_cases across this many parallel harness processes; null or 1 runs them in one
+    test_shards = Column(Integer, nullable=True)
+    # Larger inputs ([{"args": [...]}, ...]) for benchmarking against reference_solution;
+    # null benchmarks on test_cases
+    benchmark_cases = Column(JSON, nullable=True)
     
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     
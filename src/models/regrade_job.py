@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from database.db import Base
+
+class RegradeJob(Base):
+    __tablename__ = 'regrade_jobs'
+
+    id = Column(Integer, primary_key=True)
+    exercise_id = Column(Integer, ForeignKey('exercises.id'), nullable=False)
+    requested_by = Column(Integer, ForeignKey('users.id'), nullable=True)
+    status = Column(String(20), nullable=False, default='pending')
+
+    # Attempts up to this id existed when the job started; later ones are graded fresh
+    max_attempt_id = Column(Integer, nullable=False, default=0)
+    # Highest attempt id already regraded; a resumed job continues after it
+    last_attempt_id = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Renewed after every batch by the process running the job
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    exercise = relationship('Exercise')
+
+    # At most one unfinished job per exercise, so two concurrent starts cannot both insert one
+    __table_args__ = (
+        Index(
+            'ix_regrade_jobs_active_exercise', 'exercise_id', unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+            sqlite_where=text("status IN ('pending', 'running')")
+        ),
+    )
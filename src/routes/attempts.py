@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from sqlalchemy.orm import Session
 from database.db import get_db_session
-from services.attempt_service import create_attempt
+from services.attempt_service import store_attempt, get_attempt
+from services.grading_queue import get_grading_queue, GradingQueueFull
 from services.user_service import get_or_create_user
 from middleware.keycloak_auth import require_auth
 from services.user_service import get_user_by_keycloak_id
@@ -29,12 +30,18 @@ def submit_attempt():
             username=user_info['username']
         )
 
-        attempt = create_attempt(db, user.id, exercise_id, code)
+        attempt = store_attempt(db, user.id, exercise_id, code)
+
+        try:
+            get_grading_queue().submit(attempt.id)
+        except GradingQueueFull as e:
+            db.delete(attempt)
+            db.commit()
+            return jsonify({"error": str(e)}), 503
 
         response_data = {
             "attempt_id": attempt.id,
-            "stars": attempt.stars,
-            "score": attempt.score,
+            "status": attempt.status,
             "user_id": user.id,
             "exercise_id": attempt.exercise_id
         }
@@ -50,7 +57,38 @@ def submit_attempt():
     finally:
         db.close()
 
-    return jsonify(response_data)
+    return jsonify(response_data), 202, {"Location": f"/api/attempts/{response_data['attempt_id']}"}
+
+@bp.route("/<int:attempt_id>", methods=["GET"])
+@require_auth
+def get_attempt_status(attempt_id):
+    """Get grading status of one of the authenticated user's attempts"""
+    user_info = request.user_info
+    db: Session = get_db_session()
+
+    try:
+        user = get_user_by_keycloak_id(db, user_info['keycloak_id'])
+        attempt = get_attempt(db, attempt_id)
+
+        if not user or not attempt or attempt.user_id != user.id:
+            return jsonify({"error": "Attempt not found"}), 404
+
+        return jsonify({
+            "attempt_id": attempt.id,
+            "exercise_id": attempt.exercise_id,
+            "status": attempt.status,
+            "score": attempt.score,
+            "stars": attempt.stars,
+            "efficiency_score": attempt.efficiency_score,
+            "relative_runtime": attempt.relative_runtime,
+            "peak_memory_bytes": attempt.peak_memory_bytes,
+            "attempted_at": attempt.attempted_at.isoformat() if attempt.attempted_at else None,
+            "graded_at": attempt.graded_at.isoformat() if attempt.graded_at else None
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        db.close()
 
 @bp.route("/user", methods=["GET"])
 @require_auth
@@ -74,6 +112,7 @@ def get_user_attempts():
                 'exercise_id': attempt.exercise_id,
                 'score': attempt.score,
                 'stars': attempt.stars,
+                'status': attempt.status,
                 'attempted_at': attempt.attempted_at.isoformat()
             })
         
@@ -1,5 +1,8 @@
-from services.code_execution_service import execute_code
-from flask import Blueprint, request, jsonify
+import json
+from services.admission import get_admission_controller, AdmissionRejected
+from services.cancellation import get_execution_registry
+from services.code_execution_service import execute_code, stream_execution
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from middleware.keycloak_auth import require_auth
 
 bp = Blueprint("code", __name__)
@@ -8,5 +11,76 @@ bp = Blueprint("code", __name__)
 @require_auth
 def execute_code_route():
     data = request.get_json()
-    result = execute_code(data.get('code', ''), data.get('language', 'python'))
+    user_key = current_user_key()
+    # Registered before waiting for a slot, so the run it supersedes is killed right away
+    execution = start_execution(data, user_key)
+    try:
+        with get_admission_controller().slot(user_key):
+            result = execute_code(data.get('code', ''), data.get('language', 'python'), execution)
+    except AdmissionRejected as e:
+        return rejected(e)
+    finally:
+        if execution is not None:
+            get_execution_registry().finish(execution)
     return jsonify(result)
+
+@bp.route('/execute/stream', methods=['POST'])
+@require_auth
+def execute_code_stream_route():
+    data = request.get_json()
+    user_key = current_user_key()
+    execution = start_execution(data, user_key)
+    admission = get_admission_controller()
+    try:
+        admission.acquire(user_key)
+    except AdmissionRejected as e:
+        if execution is not None:
+            get_execution_registry().finish(execution)
+        return rejected(e)
+
+    events = stream_execution(data.get('code', ''), data.get('language', 'python'), execution=execution)
+    response = Response(
+        stream_with_context(format_sse(event, payload) for event, payload in events),
+        mimetype='text/event-stream',
+        # Stop proxies from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # The slot is held until the stream ends or the client goes away
+    response.call_on_close(admission.release)
+    if execution is not None:
+        response.call_on_close(lambda: get_execution_registry().finish(execution))
+    return response
+
+@bp.route('/cancel', methods=['POST'])
+@require_auth
+def cancel_execution_route():
+    data = request.get_json() or {}
+    execution_id = data.get('executionId')
+    if not execution_id:
+        return jsonify({"error": "Missing 'executionId'"}), 400
+    if not get_execution_registry().cancel(current_user_key(), str(execution_id)):
+        return jsonify({"error": "No running execution with that id"}), 404
+    return jsonify({"cancelled": True, "executionId": execution_id})
+
+def start_execution(data: dict, user_key: str):
+    """Registers the run under its client executionId, if it has one.
+
+    A newer run in the same sessionId (one per editor) supersedes and kills
+    the previous one.
+    """
+    execution_id = data.get('executionId')
+    if not execution_id:
+        return None
+    session_id = str(data.get('sessionId') or 'default')
+    return get_execution_registry().start(user_key, session_id, str(execution_id))
+
+def current_user_key() -> str:
+    """Scheduling key for the caller: their Keycloak id, else their address."""
+    user_info = getattr(request, "user_info", None) or {}
+    return user_info.get("keycloak_id") or request.remote_addr
+
+def rejected(error: AdmissionRejected):
+    return jsonify({"error": str(error)}), 429, {"Retry-After": str(error.retry_after)}
+
+def format_sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
@@ -1,7 +1,14 @@
 from flask import Blueprint, jsonify, request
 from sqlalchemy.orm import Session
-from database.db import get_db
-from middleware.keycloak_auth import require_auth
+from database.db import get_db, get_db_session
+from config import Config
+from middleware.keycloak_auth import require_auth, require_role
+from services.regrade_service import (
+    start_regrade,
+    get_regrade_job,
+    regrade_job_to_dict,
+    RegradeInProgress
+)
 from services.exercise_service import (
     get_all_exercises,
     get_exercise_by_id,
@@ -63,3 +70,31 @@ def delete_exercise_route(exercise_id):
         return jsonify({"message": "Exercise deleted successfully"})
     except Exception as e:
         return jsonify({"error": str(e)}), 400
+
+@bp.route('/<int:exercise_id>/regrade', methods=['POST'])
+@require_auth
+@require_role(Config.ADMIN_ROLE)
+def regrade_exercise_route(exercise_id):
+    db: Session = get_db_session()
+    try:
+        job = regrade_job_to_dict(start_regrade(db, exercise_id, request.user_info.get('id')))
+    except RegradeInProgress as e:
+        return jsonify({"error": str(e), "job": regrade_job_to_dict(e.job)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    finally:
+        db.close()
+    return jsonify(job), 202, {"Location": f"/api/exercises/regrade-jobs/{job['id']}"}
+
+@bp.route('/regrade-jobs/<int:job_id>', methods=['GET'])
+@require_auth
+@require_role(Config.ADMIN_ROLE)
+def regrade_job_route(job_id):
+    db: Session = get_db_session()
+    try:
+        job = get_regrade_job(db, job_id)
+        if not job:
+            return jsonify({"error": "Regrade job not found"}), 404
+        return jsonify(regrade_job_to_dict(job))
+    finally:
+        db.close()
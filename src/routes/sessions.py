@@ -0,0 +1,92 @@
+"""Interactive execution sessions over WebSocket, at /api/code/session.
+
+The client first sends {"type": "start", "token": ..., "language": ...} and
+gets {"type": "ready", "sessionId": ...} back. Each {"type": "execute",
+"code": ...} is then answered with {"type": "result", ...} shaped like the
+/api/code/execute response, run in the same interpreter as the ones before
+it. The session ends when the socket closes, on {"type": "close"}, or when
+the server reclaims it, which it announces with {"type": "closed", "reason"}.
+"""
+import json
+from config import Config
+from middleware.keycloak_auth import authenticate_token
+from services.admission import get_admission_controller, AdmissionRejected
+from services.execution_sessions import get_session_manager, SessionLimitReached
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    # Optional dependency; sessions are unavailable without it
+    Sock = None
+
+START_TIMEOUT = 10
+# How often an idle socket checks whether its session was reclaimed
+POLL_INTERVAL = 1
+
+
+def register(app) -> bool:
+    """Adds the session endpoint to app if sessions are enabled and flask-sock is installed."""
+    if not Config.EXECUTION_SESSIONS_ENABLED:
+        return False
+    if Sock is None:
+        print("EXECUTION_SESSIONS_ENABLED is set but flask-sock is not installed; sessions are disabled")
+        return False
+    Sock(app).route('/api/code/session')(serve_session)
+    return True
+
+
+def serve_session(ws):
+    start = receive_json(ws, START_TIMEOUT)
+    if not start or start.get("type") != "start":
+        send(ws, "error", error="Expected a start message")
+        return
+    try:
+        user_info = authenticate_token(start.get("token") or "")
+        manager = get_session_manager()
+        session = manager.open(user_info.get("keycloak_id"), start.get("language", "python"))
+    except (ValueError, SessionLimitReached) as e:
+        send(ws, "error", error=str(e))
+        return
+
+    send(ws, "ready", sessionId=session.session_id, idleTimeout=manager.idle_timeout)
+    try:
+        while True:
+            message = receive_json(ws, POLL_INTERVAL)
+            if message is None:
+                if session.closed:
+                    send(ws, "closed", reason=session.close_reason)
+                    return
+                continue
+            if message.get("type") == "close":
+                return
+            if message.get("type") != "execute":
+                send(ws, "error", error=f"Unknown message type: {message.get('type')}")
+                continue
+            try:
+                with get_admission_controller().slot(session.user_key):
+                    result = session.execute(message.get("code", ""))
+            except AdmissionRejected as e:
+                send(ws, "error", error=str(e), retryAfter=e.retry_after)
+                continue
+            send(ws, "result", **result)
+            if session.closed:
+                send(ws, "closed", reason=session.close_reason)
+                return
+    finally:
+        manager.close(session)
+
+
+def receive_json(ws, timeout: float):
+    """Next message as a dict; None on timeout, {} if it is not a JSON object."""
+    raw = ws.receive(timeout=timeout)
+    if raw is None:
+        return None
+    try:
+        message = json.loads(raw)
+    except (TypeError, ValueError):
+        return {}
+    return message if isinstance(message, dict) else {}
+
+
+def send(ws, message_type: str, **fields):
+    ws.send(json.dumps({"type": message_type, **fields}))
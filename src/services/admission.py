@@ -0,0 +1,142 @@
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from config import Config
+from metrics import EXECUTION_IN_FLIGHT, EXECUTION_QUEUED, EXECUTION_REJECTED, EXECUTION_SCHEDULER_WAIT
+
+# Priority classes, highest first
+PRIORITY_GRADING = "grading"
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITIES = (PRIORITY_GRADING, PRIORITY_INTERACTIVE)
+
+
+class AdmissionRejected(Exception):
+    """Raised when an execution cannot get a slot; retry_after is in seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    def __init__(self, user_key: str, priority: str):
+        self.user_key = user_key
+        self.priority = priority
+        self.granted = threading.Event()
+
+
+class AdmissionController:
+    """Fair-share scheduler for execution slots.
+
+    At most max_in_flight runs hold a slot at once. When slots are taken,
+    requests wait per priority class and, within a class, per user: a freed
+    slot goes to the highest class with waiters, round-robin between the users
+    waiting in it, so one user's burst cannot starve everyone else.
+
+    Interactive runs are bounded by max_queued and max_wait and rejected with
+    AdmissionRejected past them. Grading runs always wait for a slot; their
+    number is already bounded by the grading queue's workers.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int, max_wait: float):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # priority -> user key -> tickets, users kept in round-robin order
+        self._waiting = {priority: OrderedDict() for priority in PRIORITIES}
+        self._queued = {priority: 0 for priority in PRIORITIES}
+
+    def acquire(self, user_key: str = None, priority: str = PRIORITY_INTERACTIVE):
+        started = time.monotonic()
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._has_waiters():
+                self._in_flight += 1
+                EXECUTION_IN_FLIGHT.set(self._in_flight)
+                EXECUTION_SCHEDULER_WAIT.labels(priority=priority).observe(0)
+                return
+            if priority == PRIORITY_INTERACTIVE and self._queued[priority] >= self.max_queued:
+                self._reject("queue_full")
+            ticket = self._enqueue(user_key, priority)
+
+        timeout = self.max_wait if priority == PRIORITY_INTERACTIVE else None
+        if not ticket.granted.wait(timeout):
+            with self._lock:
+                # The slot may have been handed over while the wait timed out
+                if not ticket.granted.is_set():
+                    self._dequeue(ticket)
+                    self._reject("wait_timeout")
+        EXECUTION_SCHEDULER_WAIT.labels(priority=priority).observe(time.monotonic() - started)
+
+    def release(self):
+        with self._lock:
+            ticket = self._next_ticket()
+            if ticket is None:
+                self._in_flight -= 1
+                EXECUTION_IN_FLIGHT.set(self._in_flight)
+            else:
+                # Hand the slot straight to the next waiter; in-flight is unchanged
+                ticket.granted.set()
+
+    @contextmanager
+    def slot(self, user_key: str = None, priority: str = PRIORITY_INTERACTIVE):
+        self.acquire(user_key, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _has_waiters(self) -> bool:
+        return any(self._queued.values())
+
+    def _enqueue(self, user_key: str, priority: str) -> _Ticket:
+        ticket = _Ticket(user_key, priority)
+        self._waiting[priority].setdefault(user_key, deque()).append(ticket)
+        self._queued[priority] += 1
+        EXECUTION_QUEUED.set(sum(self._queued.values()))
+        return ticket
+
+    def _dequeue(self, ticket: _Ticket):
+        users = self._waiting[ticket.priority]
+        tickets = users[ticket.user_key]
+        tickets.remove(ticket)
+        if not tickets:
+            del users[ticket.user_key]
+        self._queued[ticket.priority] -= 1
+        EXECUTION_QUEUED.set(sum(self._queued.values()))
+
+    def _next_ticket(self):
+        for priority in PRIORITIES:
+            users = self._waiting[priority]
+            if users:
+                user_key, tickets = next(iter(users.items()))
+                ticket = tickets[0]
+                self._dequeue(ticket)
+                if user_key in users:
+                    # This user had their turn, so they go to the back of the line
+                    users.move_to_end(user_key)
+                return ticket
+        return None
+
+    def _reject(self, reason: str):
+        EXECUTION_REJECTED.labels(reason=reason).inc()
+        raise AdmissionRejected("Too many code executions in progress, try again shortly",
+                                retry_after=max(1, math.ceil(self.max_wait)))
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                Config.EXECUTION_MAX_CONCURRENCY,
+                Config.EXECUTION_MAX_QUEUED,
+                Config.EXECUTION_MAX_QUEUE_WAIT
+            )
+        return _controller
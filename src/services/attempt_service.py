@@ -1,16 +1,46 @@
 import subprocess
+from sqlalchemy import or_, update
 from sqlalchemy.orm import Session
 from models.exercise import Exercise
 from models.attempt import Attempt
-from datetime import datetime, timezone
-import tempfile
-import os
+from datetime import datetime, timedelta, timezone
 import re
 import json
+import math
+import os
+import secrets
 import sys
+from config import Config
+from services.zygote import get_zygote
+from services.code_execution_service import sanitize_error
+from services.admission import get_admission_controller, PRIORITY_GRADING
+from services.process_runner import run_bounded
+from services.syntax_check import check_syntax, record_spawns_avoided
+from services.resource_limits import resolve_limits, limit_preexec, node_args, observe_usage
+from services.benchmark import benchmark_submission, BenchmarkUnavailable
+from services.grading_cache import grading_cache_key, get_cached_grade, store_grade
+from services.generated_cases import generated_case_count, prepare_generated
+from services.worker_pool import create_pool
+from database.db import get_db_session
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from metrics import GRADING_PHASE_DURATION
+import threading
+import time
+
+ATTEMPT_PENDING = "pending"
+ATTEMPT_GRADED = "graded"
+ATTEMPT_FAILED = "failed"
 
 
 def create_attempt(db: Session, user_id: int, exercise_id: int, code: str) -> Attempt:
+    """Stores and grades an attempt synchronously."""
+    attempt = store_attempt(db, user_id, exercise_id, code)
+    return grade_attempt(db, attempt)
+
+
+def store_attempt(db: Session, user_id: int, exercise_id: int, code: str) -> Attempt:
+    """Stores an ungraded attempt; grading happens later via grade_attempt."""
     exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
     if not exercise:
         raise ValueError(f"Exercise with id {exercise_id} not found")
@@ -19,22 +49,87 @@ def create_attempt(db: Session, user_id: int, exercise_id: int, code: str) -> At
         user_id=user_id,
         exercise_id=exercise_id,
         code_submitted=code,
+        status=ATTEMPT_PENDING,
         attempted_at=datetime.now(timezone.utc)
     )
     db.add(attempt)
     db.commit()
     db.refresh(attempt)
+    return attempt
+
 
-    grade_result = grade_submission(code, exercise)
+def grade_attempt(db: Session, attempt: Attempt) -> Attempt:
+    user_key = attempt.user.keycloak_id if attempt.user else None
+    grade_result = grade_submission(attempt.code_submitted, attempt.exercise, user_key)
     attempt.score = grade_result["style_score"]
     attempt.stars = grade_result["stars"]
-    
+    attempt.relative_runtime = grade_result.get("relative_runtime")
+    attempt.peak_memory_bytes = grade_result.get("peak_memory_bytes")
+    attempt.efficiency_score = grade_result.get("efficiency_score")
+    attempt.status = ATTEMPT_GRADED
+    attempt.graded_at = datetime.now(timezone.utc)
+
     db.commit()
     db.refresh(attempt)
     return attempt
 
 
-def grade_submission(code: str, exercise) -> dict:
+def unclaimed(now: datetime):
+    """Filter for attempts no grader holds: never claimed, or claimed before the lease ran out."""
+    stale = now - timedelta(seconds=Config.GRADING_LEASE_SECONDS)
+    return or_(Attempt.claimed_at.is_(None), Attempt.claimed_at < stale)
+
+
+def claim_attempt(db: Session, attempt_id: int) -> bool:
+    """Atomically takes a pending attempt that no other grader holds."""
+    now = datetime.now(timezone.utc)
+    claimed = db.execute(
+        update(Attempt)
+        .where(Attempt.id == attempt_id, Attempt.status == ATTEMPT_PENDING, unclaimed(now))
+        .values(claimed_at=now)
+    ).rowcount == 1
+    db.commit()
+    return claimed
+
+
+def grade_attempt_by_id(attempt_id: int) -> str:
+    """Grades a stored attempt in its own session; used by the background grading queue.
+
+    The attempt is claimed first, so when several processes queue it (e.g.
+    each resuming pending attempts on startup) only one grades it. Returns the
+    final status of the attempt, or "skipped" if another grader holds it.
+    """
+    db = get_db_session()
+    try:
+        if not claim_attempt(db, attempt_id):
+            attempt = db.query(Attempt).filter(Attempt.id == attempt_id).first()
+            if not attempt:
+                print(f"Attempt {attempt_id} vanished before grading")
+                return ATTEMPT_FAILED
+            return "skipped"
+        attempt = db.query(Attempt).filter(Attempt.id == attempt_id).first()
+        try:
+            grade_attempt(db, attempt)
+        except Exception as e:
+            print(f"Grading attempt {attempt_id} failed: {type(e).__name__}: {e}")
+            db.rollback()
+            attempt.status = ATTEMPT_FAILED
+            db.commit()
+        return attempt.status
+    finally:
+        db.close()
+
+
+def get_attempt(db: Session, attempt_id: int):
+    return db.query(Attempt).filter(Attempt.id == attempt_id).first()
+
+
+def grade_submission(code: str, exercise, user_key: str = None) -> dict:
+    """Grades code against exercise, from the cache when possible.
+
+    Uncached gradings take an execution slot in the grading priority class,
+    scheduled fairly against other users by user_key.
+    """
     language = exercise.language.lower()
     if language == "python":
         grader = grade_python_attempt
@@ -42,56 +137,375 @@ def grade_submission(code: str, exercise) -> dict:
         grader = grade_javascript_attempt
     else:
         raise ValueError(f"Unsupported language: {exercise.language}")
-    return grader(code, exercise.function_name, exercise.test_cases)
+
+    key = grading_cache_key(
+        code, language, exercise.function_name, exercise.test_cases, exercise.resource_limits,
+        exercise.test_generators
+    )
+    cached = get_cached_grade(key)
+    if cached is not None:
+        return cached
+
+    syntax_error = check_syntax(code, language)
+    if syntax_error is not None:
+        record_spawns_avoided(language, "grading", grading_spawns(language))
+        result = syntax_error_grade(
+            sanitize_error(syntax_error), exercise.test_cases, generated_case_count(exercise.test_generators)
+        )
+        store_grade(key, exercise.id, result)
+        return result
+
+    with get_admission_controller().slot(user_key, PRIORITY_GRADING):
+        result = grader(
+            code, exercise.function_name, exercise.test_cases, exercise.resource_limits, exercise.test_shards,
+            exercise.test_generators, exercise.reference_solution
+        )
+        if should_benchmark(exercise, result):
+            try:
+                benchmark = _timed_phase(language, "benchmark", lambda: benchmark_submission(code, exercise))
+            except BenchmarkUnavailable as e:
+                print(f"Benchmark skipped: {e}")
+                # Left uncached, so a later grading can still benchmark it
+                result["complete"] = False
+                benchmark = None
+            apply_benchmark(result, benchmark)
+    # Timeouts and linter failures may be transient, so only complete runs are cached
+    if result.get("complete"):
+        store_grade(key, exercise.id, result)
+    return result
+
+
+def should_benchmark(exercise, result: dict) -> bool:
+    """Only correct submissions to exercises with a reference solution are benchmarked."""
+    return (
+        Config.GRADING_BENCHMARK_ENABLED
+        and bool(exercise.reference_solution)
+        and result.get("tests_total", 0) > 0
+        and result.get("tests_passed") == result.get("tests_total")
+    )
+
+
+def apply_benchmark(result: dict, benchmark: dict | None):
+    """Adds the benchmark to a grade and re-awards stars with its efficiency score."""
+    if benchmark is None:
+        return
+    result.update(benchmark)
+    result["stars"] = calculate_stars(result["test_pass_rate"], result["style_score"], benchmark["efficiency_score"])
+
+
+def syntax_error_grade(error: str, test_cases_json: str, generated_cases: int = 0) -> dict:
+    """Zero-score grade for code that does not parse; every test case errors."""
+    _, total = summarize_test_results(None, test_cases_json, generated_cases)
+    return {
+        "test_pass_rate": 0.0,
+        "style_score": 0.0,
+        "stars": 0,
+        "feedback": error,
+        "tests_passed": 0,
+        "tests_total": total,
+        "test_results": [{"status": "error", "exception": "SyntaxError", "elapsed_ms": 0.0} for _ in range(total)],
+        "complete": True
+    }
+
+
+def grading_spawns(language: str) -> int:
+    """Processes a full grading starts: the test run, plus the linter unless it is pooled."""
+    if language == "python":
+        return 1 if Config.PYLINT_BACKEND == "worker" else 2
+    return 1 if Config.ESLINT_BACKEND == "daemon" else 2
 
 
 # ---------------------- Generic helpers ----------------------
 
-def run_temp_file(command: list[str], content: str, suffix: str, timeout: int = 5):
-    """Writes content to a temp file, runs a subprocess command, and cleans up."""
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, mode='w')
-    tmp_name = tmp.name
+def run_with_input(command: list[str], stdin_text: str, timeout: int = 5, preexec_fn=None):
+    """Runs a subprocess command with stdin_text on its stdin; returns None on timeout or error."""
     try:
-        tmp.write(content)
-        tmp.flush()
-        tmp.close()
-        result = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=timeout,
-            text=True
+        return run_bounded(
+            command, timeout=timeout, max_bytes=Config.MAX_OUTPUT_BYTES, input=stdin_text, text=True,
+            preexec_fn=preexec_fn
         )
-        return result
     except subprocess.TimeoutExpired:
         return None
     except Exception as e:
         print(f"Error during subprocess: {e}")
         return None
-    finally:
+
+
+def run_python_source(source: str, stdin_text: str = "", timeout: int = 5, limits: dict | None = None) -> str:
+    """Runs a Python program on the configured backend and returns its stdout ("" on failure).
+
+    limits are the rlimits from resolve_limits; None runs without them.
+    """
+    if Config.PYTHON_EXECUTION_BACKEND == "zygote":
+        payload = {"code": source, "stdin": stdin_text, "max_output_bytes": Config.MAX_OUTPUT_BYTES}
+        if limits is not None:
+            payload["limits"] = limits
         try:
-            os.unlink(tmp_name)
-        except PermissionError:
-            pass
+            response = get_zygote().run(payload, timeout)
+        except Exception as e:
+            print(f"Error during zygote run: {e}")
+            return ""
+        observe_usage("python", "grading", response.get("usage"))
+        return response["output"]
+    result = run_with_input([sys.executable, "-c", source], stdin_text, timeout=timeout, preexec_fn=limit_preexec(limits))
+    if not result:
+        return ""
+    observe_usage("python", "grading", result.usage)
+    return result.stdout
+
+
+_phase_executor = None
+_phase_executor_lock = threading.Lock()
+
+def get_phase_executor() -> ThreadPoolExecutor:
+    global _phase_executor
+    with _phase_executor_lock:
+        if _phase_executor is None:
+            _phase_executor = ThreadPoolExecutor(
+                max_workers=Config.GRADING_PHASE_CONCURRENCY,
+                thread_name_prefix="grading-phase"
+            )
+        return _phase_executor
+
+
+_shard_executor = None
+_shard_executor_lock = threading.Lock()
+
+def get_shard_executor() -> ThreadPoolExecutor:
+    """Runs test shards; separate from the phase executor, whose tasks wait on shards."""
+    global _shard_executor
+    with _shard_executor_lock:
+        if _shard_executor is None:
+            _shard_executor = ThreadPoolExecutor(
+                max_workers=Config.GRADING_SHARD_CONCURRENCY,
+                thread_name_prefix="grading-shard"
+            )
+        return _shard_executor
+
+
+def _timed_phase(language: str, phase: str, fn):
+    started = time.monotonic()
+    try:
+        return fn()
+    finally:
+        GRADING_PHASE_DURATION.labels(language=language, phase=phase).observe(time.monotonic() - started)
+
 
+def run_grading_phases(language: str, run_tests, run_lint):
+    """Runs the independent test and lint phases concurrently on the shared executor.
 
-def extract_test_results(output: str, test_cases_count: int) -> tuple[int, int]:
-    """Parses test result summary like 'RESULTS: 3/5'."""
-    if not output or "RESULTS:" not in output:
-        return 0, test_cases_count
+    Returns (test_result, lint_result).
+    """
+    executor = get_phase_executor()
+    tests = executor.submit(_timed_phase, language, "tests", run_tests)
+    lint = executor.submit(_timed_phase, language, "lint", run_lint)
+    return tests.result(), lint.result()
+
+
+# Wall-clock limit on a harness process
+HARNESS_TIMEOUT = 5
+# Extra wall-clock and CPU seconds per megabyte of generated cases, for reading them and digesting results
+GENERATED_SECONDS_PER_MB = 0.5
+
+
+def new_results_marker() -> str:
+    """Per-run marker that frames the harness's JSON trailer on stdout."""
+    return f"__CODESNAP_RESULTS_{secrets.token_hex(8)}__"
+
+
+def extract_test_report(output: str, marker: str) -> list | None:
+    """Parses the JSON trailer the harness prints after the marker.
+
+    The trailer is located with rfind, which scans from the end of the output,
+    so the cost does not grow with how much the student code printed. Returns
+    the per-test results, or None when no valid trailer was found.
+    """
+    start = output.rfind(marker) if output else -1
+    if start == -1:
+        return None
     try:
-        line = next(line for line in output.splitlines() if "RESULTS:" in line)
-        passed_str = line.split("RESULTS:")[1].strip()
-        passed, total = map(int, passed_str.split("/"))
-        return passed, total
-    except Exception:
-        return 0, test_cases_count
+        report, _ = json.JSONDecoder().raw_decode(output, start + len(marker))
+        tests = report["tests"]
+        if not all(isinstance(test, dict) and "status" in test for test in tests):
+            return None
+        return tests
+    except (ValueError, KeyError, TypeError):
+        return None
+
 
+def split_test_cases(test_cases_json: str, shards: int) -> list[str]:
+    """Splits test cases into at most shards contiguous chunks, as JSON arrays."""
+    test_cases = json.loads(test_cases_json) if isinstance(test_cases_json, str) else test_cases_json
+    test_cases = test_cases or []
+    size = max(1, math.ceil(len(test_cases) / max(1, shards)))
+    return [json.dumps(test_cases[i:i + size]) for i in range(0, len(test_cases), size)] or ["[]"]
+
+
+def apply_run_limits(results: list, options: dict) -> list:
+    """Applies the timeout policy and the shared budget to concatenated shard reports.
+
+    Each shard runs under the whole budget and stops only at its own
+    timeouts, so the merged report is cut as one run over all cases would be:
+    after the first timeout under the "abort" policy, or once the cases'
+    combined time reaches budget_ms, the remaining cases are skipped, and a
+    case that ran past the budget counts as a timeout.
+    """
+    merged = []
+    spent = 0.0
+    stopped = False
+    for test in results:
+        if stopped:
+            merged.append({"status": "skipped", "exception": None, "elapsed_ms": 0.0})
+            continue
+        spent += test["elapsed_ms"]
+        if spent > options["budget_ms"]:
+            test = {"status": "timeout", "exception": None, "elapsed_ms": test["elapsed_ms"]}
+        stopped = spent >= options["budget_ms"] or (test["status"] == "timeout" and options["on_timeout"] == "abort")
+        merged.append(test)
+    return merged
+
+
+def run_test_shards(run_shard, test_cases_json: str, shards: int | None, marker: str,
+                    generated: list | None = None, options: dict | None = None) -> list | None:
+    """Runs the test cases through run_shard and returns the merged per-test report.
+
+    run_shard takes a JSON array of test cases and a list of harness
+    generators entries, and returns harness output. With shards > 1 the cases
+    are split into contiguous chunks that run in parallel processes, and every
+    generator runs in a process of its own after them; their reports are
+    concatenated in order and cut by apply_run_limits with the harness
+    options, so the result matches one run over all cases whatever the shard
+    count. Like a single run, it is None if any shard fails to report.
+    """
+    if not shards or shards <= 1:
+        return extract_test_report(run_shard(test_cases_json, generated), marker)
+    chunks = [(chunk, None) for chunk in split_test_cases(test_cases_json, shards) if chunk != "[]" or not generated]
+    chunks += [("[]", [entry]) for entry in generated or []]
+    futures = [get_shard_executor().submit(run_shard, *chunk) for chunk in chunks]
+    reports = [extract_test_report(future.result(), marker) for future in futures]
+    if any(report is None for report in reports):
+        return None
+    results = [test for report in reports for test in report]
+    return apply_run_limits(results, options) if options else results
+
+
+def summarize_test_results(test_results: list | None, test_cases_json: str,
+                           generated_cases: int = 0) -> tuple[int, int]:
+    """Returns (passed, total); without a report every test case counts as failed."""
+    if test_results is None:
+        # Only parsed on this failure path, so large test data is not decoded twice
+        return 0, len(json.loads(test_cases_json or "[]")) + generated_cases
+    passed = sum(1 for test in test_results if test["status"] == "passed")
+    return passed, len(test_results)
+
+
+def harness_options(limits: dict | None = None) -> dict:
+    """Per-case deadline, shared budget and timeout policy for the test harnesses.
+
+    The budget is 80% of what the harness process may use, the lower of
+    HARNESS_TIMEOUT and its CPU rlimit, leaving headroom for interpreter
+    startup and the report, so a timed-out case never costs the other results.
+    """
+    seconds = HARNESS_TIMEOUT
+    if limits and limits.get("cpu_seconds"):
+        seconds = min(seconds, limits["cpu_seconds"])
+    return {
+        "case_timeout_ms": Config.GRADING_CASE_TIMEOUT_MS,
+        "budget_ms": int(seconds * 1000 * 0.8),
+        "on_timeout": "abort" if Config.GRADING_TIMEOUT_POLICY == "abort" else "continue"
+    }
 
-def calculate_stars(test_pass_rate: float, style_score: float) -> int:
+
+def build_harness_input(code: str, function_name: str, test_cases_json: str, marker: str,
+                        options: dict | None = None, generated: list | None = None, mode: str | None = None) -> str:
+    """Builds the JSON request read by the fixed test harnesses.
+
+    test_cases_json is embedded verbatim rather than decoded and re-encoded,
+    so grading cost stays flat for large test data. generated and mode are
+    the harness's generators and mode fields, sent only when given.
+    """
+    if not isinstance(test_cases_json, str):
+        test_cases_json = json.dumps(test_cases_json)
+    extra = ""
+    if generated:
+        extra += ', "generators": %s' % json.dumps(generated)
+    if mode:
+        extra += ', "mode": %s' % json.dumps(mode)
+    return '{"code": %s, "function_name": %s, "marker": %s, "options": %s%s, "test_cases": %s}' % (
+        json.dumps(code), json.dumps(function_name), json.dumps(marker),
+        json.dumps(options or harness_options()), extra, test_cases_json or "[]"
+    )
+
+
+def extract_digests(output: str, marker: str) -> list | None:
+    """Parses the digests of the first generator from a digests-mode harness trailer."""
+    start = output.rfind(marker) if output else -1
+    if start == -1:
+        return None
+    try:
+        report, _ = json.JSONDecoder().raw_decode(output, start + len(marker))
+        return report["digests"][0]
+    except (ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def generated_allowance(generated: list | None = None) -> int:
+    """Seconds added to a harness run's limits for the size of its generated cases."""
+    size = sum(os.path.getsize(entry["path"]) for entry in generated or [])
+    return math.ceil(size / 1_000_000 * GENERATED_SECONDS_PER_MB)
+
+
+def with_allowance(limits: dict, seconds: int) -> dict:
+    if seconds and limits.get("cpu_seconds"):
+        return dict(limits, cpu_seconds=limits["cpu_seconds"] + seconds)
+    return limits
+
+
+def run_harness_tests(run_harness, language: str, code: str, function_name: str, test_cases_json: str,
+                      options: dict, test_shards: int | None = None, test_generators=None,
+                      reference_solution: str | None = None) -> list | None:
+    """Runs the test and generated cases through run_harness, which takes a request and returns output.
+
+    run_harness(request, allowance) must extend its time limits by allowance
+    seconds, which covers the grader's share of generated cases.
+
+    Expected digests of generated cases come from running reference_solution
+    in the same harness, once per spec until evicted from the cache. Raises
+    GradingUnavailable if they cannot be had.
+    """
+    marker = new_results_marker()
+
+    def run_shard(shard_json, generated=None):
+        harness_input = build_harness_input(code, function_name, shard_json, marker, options, generated)
+        return run_harness(harness_input, generated_allowance(generated))
+
+    def run_reference(entry):
+        harness_input = build_harness_input(
+            reference_solution, function_name, "[]", marker, options, [entry], mode="digests"
+        )
+        return extract_digests(run_harness(harness_input, generated_allowance([entry])), marker)
+
+    generated = prepare_generated(test_generators, language, function_name, reference_solution, run_reference)
+    return run_test_shards(run_shard, test_cases_json, test_shards, marker, generated, options)
+
+
+def report_complete(test_results: list | None) -> bool:
+    """True for a report that ran every case to an outcome.
+
+    Timed-out and skipped cases may be down to load, so such gradings are not cached.
+    """
+    return test_results is not None and not any(
+        test["status"] in ("timeout", "skipped") for test in test_results
+    )
+
+
+def calculate_stars(test_pass_rate: float, style_score: float, efficiency_score: float | None = None) -> int:
+    """Stars for a grade; below Config.GRADING_MIN_EFFICIENCY the third star is withheld."""
     if test_pass_rate < 1.0:
         return 0
     if style_score >= 8.0:
+        if efficiency_score is not None and efficiency_score < Config.GRADING_MIN_EFFICIENCY:
+            return 2
         return 3
     if style_score >= 6.0:
         return 2
@@ -100,35 +514,37 @@ def calculate_stars(test_pass_rate: float, style_score: float) -> int:
 
 # ---------------------- Python grading ----------------------
 
-def grade_python_attempt(code: str, function_name: str, test_cases_json: str) -> dict:
-    test_cases = json.loads(test_cases_json)
-    test_code = code + "\n\npassed = 0\ntotal = 0\n\n"
-
-    for i, test in enumerate(test_cases):
-        args = ", ".join(repr(a) for a in test["args"])
-        expected = repr(test["expected"])
-        test_code += f"""
-try:
-    result = {function_name}({args})
-    expected = {expected}
-    total += 1
-    if result == expected:
-        passed += 1
-        print(f"Test {i+1}: PASSED")
-    else:
-        print(f"Test {i+1}: FAILED - Expected {{expected}}, got {{result}}")
-except Exception as e:
-    total += 1
-    print(f"Test {i+1}: ERROR - {{str(e)}}")
-"""
-    test_code += '\nprint(f"RESULTS: {passed}/{total}")\n'
+WORKERS_DIR = Path(__file__).resolve().parent.parent / "workers"
+
+# Imported rather than run as a script, so its bytecode is cached in __pycache__
+PYTHON_HARNESS_SOURCE = (
+    f"import sys\nsys.path.insert(0, {str(WORKERS_DIR)!r})\n"
+    "import python_harness\npython_harness.main()\n"
+)
+
+def grade_python_attempt(code: str, function_name: str, test_cases_json: str, resource_limits=None,
+                         test_shards: int | None = None, test_generators=None,
+                         reference_solution: str | None = None) -> dict:
+    limits = resolve_limits(resource_limits)
+    options = harness_options(limits)
+
+    def run_harness(harness_input, allowance=0):
+        return run_python_source(
+            PYTHON_HARNESS_SOURCE, harness_input, timeout=HARNESS_TIMEOUT + allowance,
+            limits=with_allowance(limits, allowance)
+        )
 
-    result = run_temp_file([sys.executable, "temp.py"], test_code, ".py")
-    output = result.stdout if result else ""
-    passed, total = extract_test_results(output, len(test_cases))
+    test_results, (pylint_score, pylint_feedback) = run_grading_phases(
+        "python",
+        lambda: run_harness_tests(
+            run_harness, "python", code, function_name, test_cases_json, options, test_shards,
+            test_generators, reference_solution
+        ),
+        lambda: run_pylint(code)
+    )
+    passed, total = summarize_test_results(test_results, test_cases_json, generated_case_count(test_generators))
 
     test_pass_rate = passed / total if total > 0 else 0.0
-    pylint_score, pylint_feedback = run_pylint(code)
     stars = calculate_stars(test_pass_rate, pylint_score)
 
     return {
@@ -137,20 +553,54 @@ except Exception as e:
         "stars": stars,
         "feedback": pylint_feedback,
         "tests_passed": passed,
-        "tests_total": total
+        "tests_total": total,
+        "test_results": test_results or [],
+        "complete": report_complete(test_results) and bool(pylint_feedback)
     }
 
 
+PYLINT_ARGS = [
+    "--score=y",
+    "--disable=C0114,C0116,C0304,C0103",
+    "--max-line-length=120",
+    # Don't write run statistics to ~/.cache on every lint
+    "--persistent=n"
+]
+
+PYLINT_WORKER = WORKERS_DIR / "pylint_worker.py"
+
+_pylint_pool = None
+_pylint_pool_lock = threading.Lock()
+
+def get_pylint_pool():
+    global _pylint_pool
+    with _pylint_pool_lock:
+        if _pylint_pool is None:
+            _pylint_pool = create_pool(
+                "pylint",
+                [sys.executable, "-u", str(PYLINT_WORKER)],
+                size=Config.PYLINT_POOL_SIZE,
+                max_runs=Config.PYLINT_POOL_MAX_RUNS,
+                queue_timeout=Config.EXECUTION_POOL_QUEUE_TIMEOUT
+            )
+        return _pylint_pool
+
+
+def run_pylint_in_worker(code: str) -> str:
+    try:
+        return get_pylint_pool().run({"code": code, "args": PYLINT_ARGS}, timeout=10)["output"]
+    except Exception as e:
+        print(f"Error during pylint worker run: {e}")
+        return ""
+
+
 def run_pylint(code: str) -> tuple[float, str]:
-    result = run_temp_file(
-        [
-            "pylint", "--score=y",
-            "--disable=C0114,C0116,C0304,C0103",
-            "--max-line-length=120", "temp.py"
-        ],
-        code, ".py", timeout=10
-    )
-    output = result.stdout if result else ""
+    if Config.PYLINT_BACKEND == "worker":
+        output = run_pylint_in_worker(code)
+    else:
+        # pylint only reads the code, so it gets the timeout but not the submission's rlimits
+        result = run_with_input(["pylint"] + PYLINT_ARGS + ["--from-stdin", "submission.py"], code, timeout=10)
+        output = result.stdout if result else ""
     match = re.search(r"rated at ([\d\.]+)/10", output)
     score = float(match.group(1)) if match else 0.0
     return score, output
@@ -158,37 +608,35 @@ def run_pylint(code: str) -> tuple[float, str]:
 
 # ---------------------- JavaScript grading ----------------------
 
-def grade_javascript_attempt(code: str, function_name: str, test_cases_json: str) -> dict:
-    test_cases = json.loads(test_cases_json)
-    test_code = code + "\n\nlet passed = 0;\nlet total = 0;\n\n"
-
-    for i, test in enumerate(test_cases):
-        args = ", ".join(json.dumps(a) for a in test["args"])
-        expected = json.dumps(test["expected"])
-        test_code += f"""
-try {{
-    const result = {function_name}({args});
-    const expected = {expected};
-    total++;
-    if (JSON.stringify(result) === JSON.stringify(expected)) {{
-        passed++;
-        console.log(`Test {i+1}: PASSED`);
-    }} else {{
-        console.log(`Test {i+1}: FAILED - Expected ${{expected}}, got ${{result}}`);
-    }}
-}} catch (e) {{
-    total++;
-    console.log(`Test {i+1}: ERROR - ${{e.message}}`);
-}}
-"""
-    test_code += '\nconsole.log(`RESULTS: ${passed}/${total}`);\n'
-
-    result = run_temp_file(["node", "temp.js"], test_code, ".js")
-    output = result.stdout if result else ""
-    passed, total = extract_test_results(output, len(test_cases))
+JS_HARNESS = WORKERS_DIR / "js_harness.js"
+
+def grade_javascript_attempt(code: str, function_name: str, test_cases_json: str, resource_limits=None,
+                             test_shards: int | None = None, test_generators=None,
+                             reference_solution: str | None = None) -> dict:
+    limits = resolve_limits(resource_limits)
+    options = harness_options(limits)
+
+    def run_harness(harness_input, allowance=0):
+        result = run_with_input(
+            ["node"] + node_args(limits) + [str(JS_HARNESS)], harness_input, timeout=HARNESS_TIMEOUT + allowance,
+            preexec_fn=limit_preexec(with_allowance(limits, allowance), address_space=False)
+        )
+        if not result:
+            return ""
+        observe_usage("javascript", "grading", result.usage)
+        return result.stdout
+
+    test_results, (eslint_score, eslint_feedback) = run_grading_phases(
+        "javascript",
+        lambda: run_harness_tests(
+            run_harness, "javascript", code, function_name, test_cases_json, options, test_shards,
+            test_generators, reference_solution
+        ),
+        lambda: run_eslint(code)
+    )
+    passed, total = summarize_test_results(test_results, test_cases_json, generated_case_count(test_generators))
 
     test_pass_rate = passed / total if total > 0 else 0.0
-    eslint_score, eslint_feedback = run_eslint(code)
     stars = calculate_stars(test_pass_rate, eslint_score)
 
     return {
@@ -197,22 +645,55 @@ try {{
         "stars": stars,
         "feedback": eslint_feedback,
         "tests_passed": passed,
-        "tests_total": total
+        "tests_total": total,
+        "test_results": test_results or [],
+        "complete": report_complete(test_results) and bool(eslint_feedback)
     }
 
 
+ESLINT_RULES = {"semi": "off", "quotes": "off"}
+
+ESLINT_WORKER = WORKERS_DIR / "eslint_worker.js"
+
+_eslint_pool = None
+_eslint_pool_lock = threading.Lock()
+
+def get_eslint_pool():
+    global _eslint_pool
+    with _eslint_pool_lock:
+        if _eslint_pool is None:
+            _eslint_pool = create_pool(
+                "eslint",
+                ["node", str(ESLINT_WORKER)],
+                size=Config.ESLINT_POOL_SIZE,
+                max_runs=Config.ESLINT_POOL_MAX_RUNS,
+                queue_timeout=Config.EXECUTION_POOL_QUEUE_TIMEOUT
+            )
+        return _eslint_pool
+
+
+def run_eslint_in_daemon(code: str) -> str:
+    try:
+        return get_eslint_pool().run({"code": code, "rules": ESLINT_RULES}, timeout=10)["output"]
+    except Exception as e:
+        print(f"Error during eslint daemon run: {e}")
+        return ""
+
+
 def run_eslint(code: str) -> tuple[float, str]:
-    result = run_temp_file(
-        [
-            "npx", "eslint", "--format", "json",
-            "--no-eslintrc",
-            "--rule", "semi: off",
-            "--rule", "quotes: off",
-            "temp.js"
-        ],
-        code, ".js", timeout=10
-    )
-    output = result.stdout if result else ""
+    if Config.ESLINT_BACKEND == "daemon":
+        output = run_eslint_in_daemon(code)
+    else:
+        rule_args = []
+        for rule, level in ESLINT_RULES.items():
+            rule_args += ["--rule", f"{rule}: {level}"]
+        # Like pylint, ESLint only reads the code and is not held to the submission's rlimits
+        result = run_with_input(
+            ["npx", "eslint", "--format", "json", "--no-eslintrc", "--stdin", "--stdin-filename", "submission.js"]
+            + rule_args,
+            code, timeout=10
+        )
+        output = result.stdout if result else ""
     try:
         reports = json.loads(output)
         messages = reports[0].get("messages", [])
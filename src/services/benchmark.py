@@ -0,0 +1,173 @@
+import json
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from config import Config
+from services.code_execution_service import limit_error
+from services.process_runner import run_bounded
+from services.resource_limits import resolve_limits, limit_preexec, node_args
+
+WORKERS_DIR = Path(__file__).resolve().parent.parent / "workers"
+PYTHON_BENCHMARK = WORKERS_DIR / "python_benchmark.py"
+JS_BENCHMARK = WORKERS_DIR / "js_benchmark.js"
+
+
+class BenchmarkUnavailable(Exception):
+    """Raised when no reserved CPU frees up in time; the submission is graded without a benchmark."""
+
+
+def benchmark_cpus() -> list:
+    """CPUs reserved for benchmarks, or [None] where affinity cannot be set."""
+    if not hasattr(os, "sched_setaffinity"):
+        return [None]
+    if Config.GRADING_BENCHMARK_CPUS.strip():
+        return [int(cpu) for cpu in Config.GRADING_BENCHMARK_CPUS.split(",")]
+    return [max(os.sched_getaffinity(0))]
+
+
+_free_cpus = None
+_free_cpus_lock = threading.Lock()
+
+def get_free_cpus() -> queue.Queue:
+    global _free_cpus
+    with _free_cpus_lock:
+        if _free_cpus is None:
+            _free_cpus = queue.Queue()
+            for cpu in benchmark_cpus():
+                _free_cpus.put(cpu)
+        return _free_cpus
+
+
+@contextmanager
+def reserved_cpu():
+    """Holds one of the reserved CPUs for the block, waiting while all are in use.
+
+    Two benchmarks sharing a core would time each other, so each core runs
+    one at a time. Raises BenchmarkUnavailable after waiting
+    Config.GRADING_BENCHMARK_QUEUE_TIMEOUT seconds, since the caller holds an
+    execution slot meanwhile.
+    """
+    free = get_free_cpus()
+    try:
+        cpu = free.get(timeout=Config.GRADING_BENCHMARK_QUEUE_TIMEOUT)
+    except queue.Empty:
+        raise BenchmarkUnavailable("No benchmark CPU became free in time") from None
+    try:
+        yield cpu
+    finally:
+        free.put(cpu)
+
+
+def pinned_preexec(limits: dict, address_space: bool, cpu: int | None):
+    """preexec_fn applying limits and pinning the process to cpu."""
+    apply_limits = limit_preexec(limits, address_space)
+    if cpu is None:
+        return apply_limits
+
+    def preexec():
+        if apply_limits is not None:
+            apply_limits()
+        # A fixed core avoids migrations and keeps both sides on the same cache
+        os.sched_setaffinity(0, {cpu})
+    return preexec
+
+
+def run_benchmark(code: str, language: str, function_name: str, cases: list, limits: dict,
+                  cpu: int | None = None) -> dict | None:
+    """Benchmarks one program in a fresh process pinned to cpu.
+
+    Returns the harness report ({"median_ms", "runs_ms", "peak_memory_bytes"}),
+    {"timed_out": True} if it ran out of time, or None if the program errored
+    or produced no report.
+    """
+    marker = f"__CODESNAP_BENCHMARK_{secrets.token_hex(8)}__"
+    request = json.dumps({
+        "code": code,
+        "function_name": function_name,
+        "cases": cases,
+        "warmup": Config.GRADING_BENCHMARK_WARMUP,
+        "runs": Config.GRADING_BENCHMARK_RUNS,
+        "marker": marker
+    })
+    if language == "python":
+        command = [sys.executable, str(PYTHON_BENCHMARK)]
+    else:
+        command = ["node"] + node_args(limits) + [str(JS_BENCHMARK)]
+    try:
+        result = run_bounded(
+            command, timeout=Config.GRADING_BENCHMARK_TIMEOUT, max_bytes=Config.MAX_OUTPUT_BYTES, input=request,
+            text=True, preexec_fn=pinned_preexec(limits, language == "python", cpu)
+        )
+    except subprocess.TimeoutExpired:
+        return {"timed_out": True}
+    except Exception as e:
+        print(f"Error during benchmark: {e}")
+        return None
+
+    if limit_error(result.returncode):
+        # Killed by the CPU rlimit, which is running out of time too
+        return {"timed_out": True}
+    start = result.stdout.rfind(marker)
+    if start == -1:
+        return None
+    try:
+        report, _ = json.JSONDecoder().raw_decode(result.stdout, start + len(marker))
+    except ValueError:
+        return None
+    if not isinstance(report, dict) or "median_ms" not in report:
+        return None
+    return report
+
+
+def efficiency_score(relative_runtime: float) -> float:
+    """10 for code at least as fast as the reference, falling with how much slower it is."""
+    return round(10 * min(1.0, 1 / relative_runtime), 2) if relative_runtime > 0 else 10.0
+
+
+def benchmark_cases(exercise) -> list:
+    cases = exercise.benchmark_cases or exercise.test_cases or []
+    return json.loads(cases) if isinstance(cases, str) else cases
+
+
+def benchmark_submission(code: str, exercise) -> dict | None:
+    """Times code against exercise.reference_solution on the same reserved CPU.
+
+    Returns relative_runtime (submission median / reference median),
+    peak_memory_bytes, relative_memory and efficiency_score, or None if either
+    side could not be benchmarked. A submission that runs out of time gets a
+    lower bound for its runtime and no memory figures. Raises
+    BenchmarkUnavailable if every reserved CPU stays busy.
+    """
+    language = exercise.language.lower()
+    cases = benchmark_cases(exercise)
+    limits = resolve_limits(exercise.resource_limits)
+    with reserved_cpu() as cpu:
+        reference = run_benchmark(exercise.reference_solution, language, exercise.function_name, cases, limits, cpu)
+        if reference is None or reference.get("timed_out"):
+            print(f"Reference solution of exercise {exercise.id} could not be benchmarked")
+            return None
+        submission = run_benchmark(code, language, exercise.function_name, cases, limits, cpu)
+    if submission is None:
+        return None
+
+    if submission.get("timed_out"):
+        # Not every pass finished in time, so on average they took at least this long
+        passes = Config.GRADING_BENCHMARK_WARMUP + max(1, Config.GRADING_BENCHMARK_RUNS)
+        submission = {"median_ms": Config.GRADING_BENCHMARK_TIMEOUT * 1000 / passes, "peak_memory_bytes": None}
+    # Guard against a reference too fast for the timer to resolve
+    relative_runtime = submission["median_ms"] / max(reference["median_ms"], 0.001)
+    peak = submission.get("peak_memory_bytes")
+    relative_memory = None
+    if peak is not None and reference.get("peak_memory_bytes"):
+        relative_memory = round(peak / reference["peak_memory_bytes"], 3)
+    return {
+        "relative_runtime": round(relative_runtime, 3),
+        "peak_memory_bytes": peak,
+        "relative_memory": relative_memory,
+        "efficiency_score": efficiency_score(relative_runtime)
+    }
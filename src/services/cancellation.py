@@ -0,0 +1,82 @@
+import threading
+from metrics import EXECUTION_CANCELLED
+
+
+class Execution:
+    """A running execution that can be cancelled by killing its process."""
+
+    def __init__(self, user_key: str, session_id: str, execution_id: str):
+        self.user_key = user_key
+        self.session_id = session_id
+        self.execution_id = execution_id
+        self.cancelled = False
+        self._process = None
+        self._lock = threading.Lock()
+
+    def attach(self, process):
+        """Records the process running this execution; kills it if already cancelled."""
+        with self._lock:
+            self._process = process
+            if self.cancelled:
+                _kill(process)
+
+    def cancel(self, reason: str) -> bool:
+        with self._lock:
+            if self.cancelled:
+                return False
+            self.cancelled = True
+            if self._process is not None:
+                _kill(self._process)
+        EXECUTION_CANCELLED.labels(reason=reason).inc()
+        return True
+
+
+def _kill(process):
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+class ExecutionRegistry:
+    """Tracks the latest execution per user and editor session."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_session = {}
+        self._by_id = {}
+
+    def start(self, user_key: str, session_id: str, execution_id: str) -> Execution:
+        """Registers a new execution, cancelling the one it supersedes."""
+        execution = Execution(user_key, session_id, execution_id)
+        with self._lock:
+            previous = self._by_session.get((user_key, session_id))
+            self._by_session[(user_key, session_id)] = execution
+            self._by_id[(user_key, execution_id)] = execution
+        if previous is not None:
+            previous.cancel("superseded")
+        return execution
+
+    def finish(self, execution: Execution):
+        with self._lock:
+            if self._by_session.get((execution.user_key, execution.session_id)) is execution:
+                del self._by_session[(execution.user_key, execution.session_id)]
+            if self._by_id.get((execution.user_key, execution.execution_id)) is execution:
+                del self._by_id[(execution.user_key, execution.execution_id)]
+
+    def cancel(self, user_key: str, execution_id: str) -> bool:
+        """Cancels one of user_key's executions; False if it is not running."""
+        with self._lock:
+            execution = self._by_id.get((user_key, execution_id))
+        return execution is not None and execution.cancel("requested")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_execution_registry() -> ExecutionRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ExecutionRegistry()
+        return _registry
@@ -1,4 +1,58 @@
-import subprocess, tempfile, os, re
+import subprocess, os, re, sys, signal, threading, time, queue, codecs
+from pathlib import Path
+from config import Config
+from metrics import EXECUTION_DURATION
+from services.process_runner import run_bounded, wait_with_usage
+from services.syntax_check import check_syntax, record_spawns_avoided
+from services.execution_cache import (
+    is_deterministic, execution_cache_enabled, execution_cache_key, get_cached_execution, store_execution
+)
+from services.resource_limits import resolve_limits, limit_preexec, node_args, observe_usage
+from services.worker_pool import create_pool
+from services.zygote import get_zygote
+
+WORKERS_DIR = Path(__file__).resolve().parent.parent / "workers"
+
+def pool_command(language: str, limits: dict) -> list[str]:
+    if language == "python":
+        return [sys.executable, "-u", str(WORKERS_DIR / "python_worker.py")]
+    return ["node"] + node_args(limits) + [str(WORKERS_DIR / "node_worker.js")]
+
+def pool_max_runs(language: str) -> int:
+    # A vm context is no security boundary: code that reaches the host process
+    # can patch the worker for the next user, so node workers serve one run.
+    # Python runs are forked from the worker and cannot change it.
+    return Config.EXECUTION_POOL_MAX_RUNS if language == "python" else 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(language: str):
+    """Pool of warm workers for language, under the same rlimits as other runs.
+
+    A worker's rlimits cover its whole life, so the pool recycles it once it
+    has used cpu_seconds of CPU time; its CPU rlimit is twice that, so the run
+    in progress still gets a full cpu_seconds.
+    """
+    with _pools_lock:
+        if language not in _pools:
+            limits = resolve_limits()
+            lifetime = dict(limits, cpu_seconds=limits["cpu_seconds"] * 2)
+            _pools[language] = create_pool(
+                language,
+                pool_command(language, limits),
+                size=Config.EXECUTION_POOL_SIZE,
+                max_runs=pool_max_runs(language),
+                queue_timeout=Config.EXECUTION_POOL_QUEUE_TIMEOUT,
+                preexec_fn=limit_preexec(lifetime, address_space=language == "python"),
+                cpu_budget=limits["cpu_seconds"]
+            )
+        return _pools[language]
+
+def get_execution_backend(language: str) -> str:
+    if language == "python":
+        return Config.PYTHON_EXECUTION_BACKEND
+    return Config.JAVASCRIPT_EXECUTION_BACKEND
 
 def sanitize_error(raw_error: str) -> str:
     sanitized = re.sub(r'([A-Z]:)?[/\\][\w./\\-]+', '<path>', raw_error)
@@ -6,56 +60,266 @@ def sanitize_error(raw_error: str) -> str:
     sanitized = sanitized.replace(os.getcwd(), '<cwd>')
     return "\n".join([line for line in sanitized.splitlines() if line.strip()]).strip()
 
-def execute_code(code: str, language: str):
+CANCELLED_RESULT = {
+    "output": "(no output)",
+    "error": "Execution cancelled",
+    "truncated": False,
+    "cancelled": True,
+    "usage": None
+}
+
+def execute_code(code: str, language: str, execution=None):
+    """Runs code and returns its output and sanitized error.
+
+    execution is an optional services.cancellation.Execution; cancelling it
+    kills a subprocess run, and any cancelled run returns CANCELLED_RESULT.
+    With EXECUTION_CACHE_SIZE set, successful runs of code that passes the
+    determinism screen are memoized (see services/execution_cache.py).
+    """
     if language not in ['python', 'javascript']:
         return {"output": "", "error": f"Unsupported language: {language}"}
+    if execution is not None and execution.cancelled:
+        return dict(CANCELLED_RESULT)
 
-    suffix = ".py" if language == "python" else ".js"
-    runner = ["python"] if language == "python" else ["node"]
+    backend = get_execution_backend(language)
+    cache_key = None
+    if execution_cache_enabled() and is_deterministic(code, language):
+        cache_key = execution_cache_key(code, language, backend)
+        cached = get_cached_execution(cache_key, language)
+        if cached is not None:
+            return cached
 
-    # Create temp file with delete=False to handle Windows file locking
-    tmp = tempfile.NamedTemporaryFile(mode='w', suffix=suffix, delete=False, encoding='utf-8')
-    tmp_name = tmp.name
-    
+    syntax_error = check_syntax(code, language)
+    if syntax_error is not None:
+        # Pool workers are already running, so only the other backends save a process
+        record_spawns_avoided(language, "execute", 0 if backend == "pool" else 1)
+        return {
+            "output": "(no output)",
+            "error": sanitize_error(syntax_error),
+            "truncated": False,
+            "usage": None
+        }
+
+    started = time.monotonic()
     try:
-        # Write and close file before subprocess uses it (Windows requirement)
-        tmp.write(code)
-        tmp.close()
-        
-        # Now run the subprocess
-        result = subprocess.run(
-            runner + [tmp_name],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=5
+        if backend == "pool":
+            result = execute_in_pool(get_pool(language), code)
+        elif backend == "zygote" and language == "python":
+            result = execute_in_pool(get_zygote(), code, limits=resolve_limits())
+        else:
+            result = execute_in_subprocess(code, language, execution)
+        # Pool and zygote runs are not killed, but their result is no longer wanted
+        if execution is not None and execution.cancelled:
+            return dict(CANCELLED_RESULT)
+        if cache_key is not None:
+            store_execution(cache_key, result)
+        return result
+    finally:
+        EXECUTION_DURATION.labels(language=language, backend=backend).observe(time.monotonic() - started)
+
+def interpreter_command(language: str, limits: dict, unbuffered: bool = False) -> list[str]:
+    """Command that runs the program it reads from stdin, so no file is written."""
+    if language == "python":
+        return ["python", "-u", "-"] if unbuffered else ["python", "-"]
+    return ["node"] + node_args(limits) + ["-"]
+
+def execute_in_subprocess(code: str, language: str, execution=None):
+    limits = resolve_limits()
+    try:
+        result = run_bounded(
+            interpreter_command(language, limits),
+            timeout=5,
+            max_bytes=Config.MAX_OUTPUT_BYTES,
+            input=code,
+            preexec_fn=limit_preexec(limits, address_space=language == "python"),
+            on_start=execution.attach if execution is not None else None
         )
+        observe_usage(language, "execute", result.usage)
         
         return {
-            "output": result.stdout.decode('utf-8').strip() or "(no output)",
-            "error": sanitize_error(result.stderr.decode('utf-8').strip()) or None
+            "output": result.stdout.decode('utf-8', errors='replace').strip() or "(no output)",
+            "error": limit_error(result.returncode) or sanitize_error(result.stderr.decode('utf-8', errors='replace').strip()) or None,
+            "truncated": result.truncated,
+            "usage": result.usage
         }
     except subprocess.TimeoutExpired:
         return {
             "output": "(no output)",
-            "error": "Execution timed out"
+            "error": "Execution timed out",
+            "truncated": False,
+            "usage": None
         }
     except Exception as e:
         return {
             "output": "(no output)",
-            "error": f"Execution error: {str(e)}"
+            "error": f"Execution error: {str(e)}",
+            "truncated": False,
+            "usage": None
         }
-    finally:
-        # Clean up: remove temp file
+
+def exit_event(exit_code, error, timed_out=False, truncated=False, cancelled=False, usage=None) -> tuple:
+    """The final ("exit", {...}) event of stream_execution; every path sends the same keys."""
+    return "exit", {
+        "exit_code": exit_code,
+        "error": error,
+        "timed_out": timed_out,
+        "truncated": truncated,
+        "cancelled": cancelled,
+        "usage": usage
+    }
+
+def stream_execution(code: str, language: str, timeout: float = 5, execution=None):
+    """Runs code in a subprocess and yields (event, data) pairs as it runs.
+
+    Yields ("output", {"data": chunk}) for every chunk the program writes to
+    stdout, then one ("exit", {...}) with the exit code, the sanitized stderr
+    and whether the run timed out, was cut off at Config.MAX_OUTPUT_BYTES or
+    was cancelled through execution. Closing the generator kills the program.
+    """
+    if language not in ['python', 'javascript']:
+        yield exit_event(None, f"Unsupported language: {language}")
+        return
+
+    syntax_error = check_syntax(code, language)
+    if syntax_error is not None:
+        record_spawns_avoided(language, "execute", 1)
+        yield exit_event(1, sanitize_error(syntax_error))
+        return
+
+    limits = resolve_limits()
+    process = None
+    started = time.monotonic()
+    try:
+        process = subprocess.Popen(
+            # Unbuffered, so output reaches the client while the program is still running
+            interpreter_command(language, limits, unbuffered=True),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            preexec_fn=limit_preexec(limits, address_space=language == "python")
+        )
+        if execution is not None:
+            execution.attach(process)
+        # Both interpreters read the whole program before running it, so this cannot block on output
         try:
-            if os.path.exists(tmp_name):
-                os.unlink(tmp_name)
-        except PermissionError:
-            # On Windows, file might still be locked
-            # Try again after a short delay
-            import time
-            time.sleep(0.1)
+            with process.stdin:
+                process.stdin.write(code.encode('utf-8'))
+        except OSError:
+            pass
+        chunks = queue.Queue()
+        stderr_chunks = []
+        overflow = threading.Event()
+
+        def on_overflow():
+            overflow.set()
+            process.kill()
+
+        readers = [
+            threading.Thread(target=_pump, args=(process.stdout, chunks.put, on_overflow), daemon=True),
+            threading.Thread(target=_pump, args=(process.stderr, stderr_chunks.append, on_overflow), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        deadline = started + timeout
+        timed_out = False
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
             try:
-                if os.path.exists(tmp_name):
-                    os.unlink(tmp_name)
-            except:
-                pass
\ No newline at end of file
+                chunk = chunks.get(timeout=remaining)
+            except queue.Empty:
+                timed_out = True
+                break
+            if chunk is None:
+                break
+            text = decoder.decode(chunk)
+            if text:
+                yield "output", {"data": text}
+
+        if timed_out:
+            process.kill()
+        exit_code, usage = wait_with_usage(process, None)
+        for reader in readers:
+            reader.join(timeout=1)
+        observe_usage(language, "execute", usage)
+
+        cancelled = execution is not None and execution.cancelled
+        if cancelled:
+            error = "Execution cancelled"
+        elif timed_out:
+            error = "Execution timed out"
+        else:
+            stderr = b"".join(chunk for chunk in stderr_chunks if chunk).decode('utf-8', errors='replace')
+            error = limit_error(exit_code) or sanitize_error(stderr.strip()) or None
+        yield exit_event(exit_code, error, timed_out, overflow.is_set(), cancelled, usage)
+    except Exception as e:
+        yield exit_event(None, f"Execution error: {str(e)}", cancelled=execution is not None and execution.cancelled)
+    finally:
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+        EXECUTION_DURATION.labels(language=language, backend="stream").observe(time.monotonic() - started)
+
+def limit_error(returncode) -> str | None:
+    """Explains exits caused by the CPU rlimit, which leave nothing on stderr."""
+    if hasattr(signal, "SIGXCPU") and returncode == -signal.SIGXCPU:
+        return "CPU time limit exceeded"
+    return None
+
+def _pump(pipe, put, on_overflow):
+    """Forwards chunks from pipe as they arrive, then None at end of file.
+
+    Stops after Config.MAX_OUTPUT_BYTES and calls on_overflow.
+    """
+    remaining = Config.MAX_OUTPUT_BYTES
+    with pipe:
+        for chunk in iter(lambda: os.read(pipe.fileno(), 4096), b""):
+            put(chunk[:remaining])
+            remaining -= len(chunk)
+            if remaining < 0:
+                on_overflow()
+                break
+    put(None)
+
+def worker_result(result: dict) -> dict:
+    """Converts a worker's response into an execute_code result."""
+    if result.get("timed_out"):
+        return {
+            "output": "(no output)",
+            "error": "Execution timed out",
+            "truncated": False,
+            "usage": None
+        }
+    return {
+        "output": result["output"].strip() or "(no output)",
+        "error": sanitize_error(result["error"].strip()) or None,
+        "truncated": result.get("truncated", False),
+        "usage": result.get("usage")
+    }
+
+def execute_in_pool(pool, code: str, limits: dict | None = None):
+    payload = {"code": code, "timeout_ms": 5000, "max_output_bytes": Config.MAX_OUTPUT_BYTES}
+    if limits is not None:
+        # The zygote applies these in the child it forks for this run; pools apply theirs per worker
+        payload["limits"] = limits
+    try:
+        # The worker enforces the 5 s budget itself; the pool timeout is a backstop
+        return worker_result(pool.run(payload, timeout=6))
+    except TimeoutError:
+        return {
+            "output": "(no output)",
+            "error": "Execution timed out",
+            "truncated": False,
+            "usage": None
+        }
+    except Exception as e:
+        return {
+            "output": "(no output)",
+            "error": f"Execution error: {str(e)}",
+            "truncated": False,
+            "usage": None
+        }
@@ -0,0 +1,140 @@
+import ast
+import hashlib
+import re
+import subprocess
+import sys
+import threading
+from config import Config
+from metrics import EXECUTION_CACHE_HITS, EXECUTION_CACHE_MISSES, EXECUTION_CACHE_SIZE
+from services.grading_cache import normalize_code
+from services.lru_cache import LRUCache
+
+_cache = LRUCache(Config.EXECUTION_CACHE_SIZE, ttl=Config.EXECUTION_CACHE_TTL)
+
+# Modules whose functions give the same output for the same input on every run
+PURE_PYTHON_MODULES = {
+    "abc", "bisect", "collections", "copy", "dataclasses", "decimal", "enum", "fractions",
+    "functools", "heapq", "itertools", "json", "math", "operator", "re", "statistics",
+    "string", "textwrap", "typing",
+}
+
+# Builtins that read input, touch files or expose hash seeds and addresses
+IMPURE_PYTHON_NAMES = {
+    "input", "open", "hash", "id", "set", "frozenset", "eval", "exec", "compile",
+    "__import__", "globals", "locals", "vars", "breakpoint",
+}
+
+# Dict views whose set operations (d.keys() | other) return sets
+DICT_VIEW_METHODS = {"keys", "items"}
+SET_OPERATORS = (ast.BitOr, ast.BitAnd, ast.BitXor, ast.Sub)
+
+# Intl and the locale methods format by the host's locale and ICU data
+IMPURE_JAVASCRIPT = re.compile(
+    r"\b(Math\s*\.\s*random|Date|performance|process|require|import|crypto|eval|Function|globalThis"
+    r"|setTimeout|setInterval|setImmediate|WeakRef|FinalizationRegistry|Intl|toLocale\w*|localeCompare)\b"
+)
+
+# Default reprs such as <object at 0x7f...> differ between runs
+ADDRESS = re.compile(r"\bat 0x[0-9a-fA-F]+")
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def is_dict_view(node: ast.AST, view_names: set) -> bool:
+    if isinstance(node, ast.Name):
+        return node.id in view_names
+    return (
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+        and node.func.attr in DICT_VIEW_METHODS and not node.args
+    )
+
+
+def is_deterministic_python(code: str) -> bool:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+    # Names bound to a dict view, e.g. keys = d.keys()
+    view_names = {
+        target.id
+        for node in ast.walk(tree) if isinstance(node, ast.Assign) and is_dict_view(node.value, set())
+        for target in node.targets if isinstance(target, ast.Name)
+    }
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            if any(alias.name.split(".")[0] not in PURE_PYTHON_MODULES for alias in node.names):
+                return False
+        elif isinstance(node, ast.ImportFrom):
+            if node.level or (node.module or "").split(".")[0] not in PURE_PYTHON_MODULES:
+                return False
+        elif isinstance(node, ast.Name) and node.id in IMPURE_PYTHON_NAMES:
+            return False
+        elif isinstance(node, (ast.Set, ast.SetComp)):
+            # String hashing is salted per process, so set order is not stable
+            return False
+        elif isinstance(node, (ast.BinOp, ast.AugAssign)) and isinstance(node.op, SET_OPERATORS):
+            operands = (node.left, node.right) if isinstance(node, ast.BinOp) else (node.target, node.value)
+            if any(is_dict_view(operand, view_names) for operand in operands):
+                return False
+    return True
+
+
+def is_deterministic(code: str, language: str) -> bool:
+    """Static screen: True only for code that cannot read stdin, clocks, randomness or the system."""
+    if language == "python":
+        return is_deterministic_python(code)
+    if language == "javascript":
+        return IMPURE_JAVASCRIPT.search(code) is None
+    return False
+
+
+def runtime_version(language: str, backend: str) -> str:
+    """Version of the interpreter the backend runs code with."""
+    if language == "python" and backend in ("pool", "zygote"):
+        # These backends run code in sys.executable
+        return sys.version.split()[0]
+    with _versions_lock:
+        if language not in _versions:
+            command = ["python" if language == "python" else "node", "--version"]
+            try:
+                result = subprocess.run(command, capture_output=True, text=True, timeout=5)
+                _versions[language] = (result.stdout or result.stderr).strip() or "unknown"
+            except (OSError, subprocess.SubprocessError):
+                _versions[language] = "unknown"
+        return _versions[language]
+
+
+def execution_cache_key(code: str, language: str, backend: str) -> str:
+    digest = hashlib.sha256()
+    for part in (normalize_code(code), language, runtime_version(language, backend)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def execution_cache_enabled() -> bool:
+    return _cache.max_size > 0
+
+
+def get_cached_execution(key: str, language: str):
+    entry = _cache.get(key)
+    if entry is None:
+        EXECUTION_CACHE_MISSES.labels(language=language).inc()
+        return None
+    EXECUTION_CACHE_HITS.labels(language=language).inc()
+    return dict(entry)
+
+
+def store_execution(key: str, result: dict) -> bool:
+    """Caches result if the run succeeded within its limits; returns whether it was stored."""
+    if result.get("error") or result.get("truncated") or ADDRESS.search(result.get("output") or ""):
+        return False
+    _cache.put(key, dict(result))
+    EXECUTION_CACHE_SIZE.set(len(_cache))
+    return True
+
+
+def clear_execution_cache():
+    _cache.clear()
+    EXECUTION_CACHE_SIZE.set(0)
@@ -0,0 +1,153 @@
+import atexit
+import secrets
+import sys
+import threading
+import time
+from config import Config
+from metrics import EXECUTION_SESSIONS, EXECUTION_SESSIONS_CLOSED
+from services.code_execution_service import WORKERS_DIR, worker_result, limit_error
+from services.resource_limits import resolve_limits, limit_preexec, node_args
+from services.worker_pool import Worker, WorkerError
+
+LANGUAGES = ("python", "javascript")
+
+
+class SessionLimitReached(Exception):
+    """Raised when this node already holds Config.EXECUTION_MAX_SESSIONS sessions."""
+
+
+def session_command(language: str, limits: dict) -> list[str]:
+    if language == "python":
+        return [sys.executable, "-u", str(WORKERS_DIR / "python_worker.py"), "--session"]
+    return ["node"] + node_args(limits) + [str(WORKERS_DIR / "node_worker.js"), "--session"]
+
+
+def ended_result(error: str) -> dict:
+    return {"output": "(no output)", "error": error, "truncated": False}
+
+
+class ExecutionSession:
+    """One user's interpreter, kept alive so state carries over between runs.
+
+    The interpreter runs under the same rlimits and output cap as execute_code,
+    with the rlimits covering the session as a whole. A run that crashes the
+    interpreter or outlives its timeout ends the session.
+    """
+
+    def __init__(self, user_key: str, language: str):
+        self.session_id = secrets.token_hex(16)
+        self.user_key = user_key
+        self.language = language
+        self.closed = False
+        self.close_reason = None
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+        limits = resolve_limits()
+        self.worker = Worker(
+            session_command(language, limits),
+            preexec_fn=limit_preexec(limits, address_space=language == "python")
+        )
+
+    def execute(self, code: str, timeout: float = 5) -> dict:
+        with self._lock:
+            if self.closed:
+                return ended_result("Session closed")
+            self.last_used = time.monotonic()
+            payload = {"code": code, "timeout_ms": int(timeout * 1000), "max_output_bytes": Config.MAX_OUTPUT_BYTES}
+            try:
+                # Node enforces the timeout itself and keeps the session; Python is killed by the backstop
+                return worker_result(self.worker.request(payload, timeout + 1))
+            except TimeoutError:
+                self._end("timeout")
+                return ended_result("Execution timed out; the session has ended")
+            except WorkerError:
+                error = limit_error(self.worker.process.returncode) or "The interpreter exited"
+                self._end("crashed")
+                return ended_result(f"{error}; the session has ended")
+            finally:
+                self.last_used = time.monotonic()
+
+    def close(self, reason: str) -> bool:
+        """Stops the interpreter; False if the session had already ended."""
+        with self._lock:
+            return self._end(reason)
+
+    def _end(self, reason: str) -> bool:
+        if self.closed:
+            return False
+        self.closed = True
+        self.close_reason = reason
+        self.worker.kill()
+        EXECUTION_SESSIONS_CLOSED.labels(reason=reason).inc()
+        return True
+
+
+class SessionManager:
+    """Open interactive sessions on this node, capped at max_sessions."""
+
+    def __init__(self, max_sessions: int, idle_timeout: float):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def open(self, user_key: str, language: str) -> ExecutionSession:
+        if language not in LANGUAGES:
+            raise ValueError(f"Unsupported language: {language}")
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise SessionLimitReached("Too many interactive sessions are open, try again later")
+            session = ExecutionSession(user_key, language)
+            self._sessions[session.session_id] = session
+            self._update_gauge()
+        return session
+
+    def close(self, session: ExecutionSession, reason: str = "client"):
+        session.close(reason)
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+            self._update_gauge()
+
+    def reap_idle(self) -> int:
+        """Closes sessions idle for longer than idle_timeout; returns how many."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [session for session in self._sessions.values() if session.last_used < cutoff]
+        for session in idle:
+            self.close(session, "idle")
+        return len(idle)
+
+    def shutdown(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            self.close(session, "shutdown")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _update_gauge(self):
+        for language in LANGUAGES:
+            EXECUTION_SESSIONS.labels(language=language).set(
+                sum(1 for session in self._sessions.values() if session.language == language)
+            )
+
+
+def _reap_forever(manager: SessionManager):
+    while True:
+        time.sleep(max(1.0, manager.idle_timeout / 4))
+        manager.reap_idle()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_session_manager() -> SessionManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SessionManager(Config.EXECUTION_MAX_SESSIONS, Config.EXECUTION_SESSION_IDLE_TIMEOUT)
+            atexit.register(_manager.shutdown)
+            threading.Thread(target=_reap_forever, args=(_manager,), name="session-reaper", daemon=True).start()
+        return _manager
@@ -1,7 +1,15 @@
 from sqlalchemy.orm import Session
 from models.exercise import Exercise
+from services.grading_cache import invalidate_exercise
+from services.generated_cases import discard_cases
 import json
 
+# Changing any of these changes how existing submissions grade
+GRADING_FIELDS = {
+    "test_cases", "function_name", "language", "resource_limits", "reference_solution", "benchmark_cases",
+    "test_generators"
+}
+
 def get_all_exercises(db: Session):
     exercises = db.query(Exercise).all()
     return [exercise_to_dict(e) for e in exercises]
@@ -20,7 +28,11 @@ def create_exercise(db: Session, data: dict):
             function_name=data.get("function_name", ""),
             test_cases=json.dumps(data.get("test_cases", [])),
             reference_solution=data.get("reference_solution", ""),
-            starter_code=data.get("starter_code", "")
+            starter_code=data.get("starter_code", ""),
+            resource_limits=data.get("resource_limits"),
+            test_shards=data.get("test_shards"),
+            benchmark_cases=data.get("benchmark_cases"),
+            test_generators=data.get("test_generators")
         )
         db.add(new_exercise)
         db.commit()
@@ -34,6 +46,7 @@ def update_exercise(db: Session, exercise_id: int, data: dict):
     if not exercise:
         return None
 
+    old_generators = exercise.test_generators
     for key, value in data.items():
         if hasattr(exercise, key):
             if key == "test_cases" and isinstance(value, list):
@@ -42,14 +55,22 @@ def update_exercise(db: Session, exercise_id: int, data: dict):
                 setattr(exercise, key, value)
     db.commit()
     db.refresh(exercise)
+
+    if GRADING_FIELDS & data.keys():
+        invalidate_exercise(exercise.id)
+    if "test_generators" in data:
+        discard_cases(old_generators, exercise.test_generators)
     return exercise_to_dict(exercise)
 
 def delete_exercise(db: Session, exercise_id: int):
     exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
     if not exercise:
         return False
+    generators = exercise.test_generators
     db.delete(exercise)
     db.commit()
+    invalidate_exercise(exercise_id)
+    discard_cases(generators)
     return True
 
 def exercise_to_dict(exercise: Exercise):
@@ -62,4 +83,6 @@ def exercise_to_dict(exercise: Exercise):
         "function_name": exercise.function_name,
         "test_cases": json.loads(exercise.test_cases) if exercise.test_cases else [],
         "reference_solution": exercise.reference_solution,
+        "resource_limits": exercise.resource_limits,
+        "test_shards": exercise.test_shards,
     }
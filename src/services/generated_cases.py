@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+from config import Config
+from services.lru_cache import LRUCache
+from workers.case_generators import generate_cases
+
+# Expected result digests of generated cases, computed once per spec from the
+# reference solution rather than stored with the exercise
+_cache = LRUCache(Config.GRADING_GENERATOR_CACHE_SIZE)
+
+# One lock per spec key, so writing one spec's cases never holds up another's
+_spec_locks = {}
+_spec_locks_lock = threading.Lock()
+
+
+class GradingUnavailable(Exception):
+    """Raised when generated cases cannot be checked, e.g. the reference solution is missing or fails.
+
+    A problem with the exercise, not the submission, so it must not be graded as failed tests.
+    """
+
+
+def load_generators(test_generators) -> list:
+    if isinstance(test_generators, str):
+        test_generators = json.loads(test_generators) if test_generators else []
+    return test_generators or []
+
+
+def generated_case_count(test_generators) -> int:
+    return sum(spec.get("count", 1) for spec in load_generators(test_generators))
+
+
+def spec_key(spec: dict) -> str:
+    canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def spec_lock(key: str) -> threading.Lock:
+    with _spec_locks_lock:
+        return _spec_locks.setdefault(key, threading.Lock())
+
+
+def cases_path(key: str) -> str:
+    return os.path.join(Config.GRADING_GENERATOR_DIR, key + ".jsonl")
+
+
+def materialize_cases(spec: dict) -> str:
+    """Path of a file holding the cases spec generates, one JSON argument list per line.
+
+    Written on first use and kept until discard_cases drops the spec, so the
+    slow pure-Python expansion runs once per spec instead of inside every
+    harness, where it would eat into the submission's time budget. Both
+    harnesses read it, which the shared PRNG makes valid for either language.
+    """
+    key = spec_key(spec)
+    path = cases_path(key)
+    with spec_lock(key):
+        if not os.path.exists(path):
+            os.makedirs(Config.GRADING_GENERATOR_DIR, exist_ok=True)
+            partial = f"{path}.{os.getpid()}.tmp"
+            with open(partial, "w", encoding="utf-8") as f:
+                for args in generate_cases(spec):
+                    f.write(json.dumps(args, separators=(",", ":")) + "\n")
+            # Atomic, so other processes never read a half-written file
+            os.replace(partial, path)
+    return path
+
+
+def discard_cases(test_generators, keep_generators=None) -> int:
+    """Deletes the cases files of specs in test_generators that keep_generators no longer has.
+
+    Called when an exercise's generators change or it is deleted, since the
+    files are otherwise kept for good. Returns how many files were removed.
+    """
+    keep = {spec_key(spec) for spec in load_generators(keep_generators)}
+    removed = 0
+    for key in {spec_key(spec) for spec in load_generators(test_generators)} - keep:
+        with spec_lock(key):
+            try:
+                os.remove(cases_path(key))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        with _spec_locks_lock:
+            _spec_locks.pop(key, None)
+    return removed
+
+
+def expected_digests_key(language: str, function_name: str, reference_solution: str, spec: dict) -> str:
+    """Key covering everything the digests depend on, the seed included."""
+    canonical = json.dumps([language, function_name, reference_solution, spec], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def expected_digests(language: str, function_name: str, reference_solution: str, entry: dict,
+                     run_reference) -> list:
+    """Result digests of the reference solution on each case of entry ({"spec", "path"}).
+
+    run_reference(entry) runs the harness in digests mode and returns the list,
+    or None on failure. Raises GradingUnavailable unless every case has a
+    digest; complete lists are cached.
+    """
+    key = expected_digests_key(language, function_name, reference_solution, entry["spec"])
+    digests = _cache.get(key)
+    if digests is not None:
+        return digests
+    digests = run_reference(entry)
+    if digests is None or None in digests:
+        raise GradingUnavailable("The reference solution failed on generated test cases")
+    _cache.put(key, digests)
+    return digests
+
+
+def prepare_generated(test_generators, language: str, function_name: str, reference_solution: str | None,
+                      run_reference) -> list:
+    """The harness's generators entries: each spec, its cases file and the digests its cases must match."""
+    generators = load_generators(test_generators)
+    if generators and not reference_solution:
+        raise GradingUnavailable("Generated test cases need a reference solution")
+    generated = []
+    for spec in generators:
+        entry = {"spec": spec, "path": materialize_cases(spec)}
+        entry["expected"] = expected_digests(language, function_name, reference_solution, entry, run_reference)
+        generated.append(entry)
+    return generated
+
+
+def clear_generated_cases():
+    _cache.clear()
@@ -0,0 +1,57 @@
+import hashlib
+import json
+from config import Config
+from metrics import GRADING_CACHE_HITS, GRADING_CACHE_MISSES, GRADING_CACHE_SIZE
+from services.lru_cache import LRUCache
+
+_cache = LRUCache(Config.GRADING_CACHE_SIZE)
+
+
+def normalize_code(code: str) -> str:
+    # Only line endings are normalized: trailing whitespace and blank lines
+    # affect the pylint score, so they must stay part of the key
+    return code.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def canonical_test_cases(test_cases) -> str:
+    if isinstance(test_cases, str):
+        test_cases = json.loads(test_cases) if test_cases else []
+    return json.dumps(test_cases, sort_keys=True, separators=(",", ":"))
+
+
+def grading_cache_key(code: str, language: str, function_name: str, test_cases, resource_limits=None,
+                      test_generators=None) -> str:
+    digest = hashlib.sha256()
+    limits = json.dumps(resource_limits or {}, sort_keys=True)
+    parts = [normalize_code(code), language, function_name or "", canonical_test_cases(test_cases), limits]
+    if test_generators:
+        parts.append(canonical_test_cases(test_generators))
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_cached_grade(key: str):
+    entry = _cache.get(key)
+    if entry is None:
+        GRADING_CACHE_MISSES.inc()
+        return None
+    GRADING_CACHE_HITS.inc()
+    return dict(entry["result"])
+
+
+def store_grade(key: str, exercise_id: int, result: dict):
+    _cache.put(key, {"exercise_id": exercise_id, "result": dict(result)})
+    GRADING_CACHE_SIZE.set(len(_cache))
+
+
+def invalidate_exercise(exercise_id: int) -> int:
+    removed = _cache.discard_where(lambda entry: entry["exercise_id"] == exercise_id)
+    GRADING_CACHE_SIZE.set(len(_cache))
+    return removed
+
+
+def clear_grading_cache():
+    _cache.clear()
+    GRADING_CACHE_SIZE.set(0)
@@ -0,0 +1,88 @@
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from config import Config
+from database.db import get_db_session
+from metrics import GRADING_QUEUE_DEPTH, GRADING_LATENCY
+from models.attempt import Attempt
+from services.attempt_service import grade_attempt_by_id, unclaimed, ATTEMPT_PENDING
+
+
+class GradingQueueFull(Exception):
+    """Raised when the grading backlog is at capacity."""
+
+
+class GradingQueue:
+    """Bounded queue of attempt ids graded by a fixed set of daemon threads."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"grading-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, attempt_id: int, block: bool = False):
+        try:
+            self._queue.put((attempt_id, time.monotonic()), block=block)
+        except queue.Full:
+            raise GradingQueueFull("Grading queue is full, try again later")
+        GRADING_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            attempt_id, enqueued_at = self._queue.get()
+            GRADING_QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                status = grade_attempt_by_id(attempt_id)
+            except Exception as e:
+                print(f"Grading worker error for attempt {attempt_id}: {e}")
+                status = "failed"
+            finally:
+                self._queue.task_done()
+            GRADING_LATENCY.labels(status=status).observe(time.monotonic() - enqueued_at)
+
+
+_grading_queue = None
+_grading_queue_lock = threading.Lock()
+
+def get_grading_queue() -> GradingQueue:
+    global _grading_queue
+    with _grading_queue_lock:
+        if _grading_queue is None:
+            _grading_queue = GradingQueue(Config.GRADING_WORKERS, Config.GRADING_QUEUE_SIZE)
+        return _grading_queue
+
+
+def _enqueue_pending(attempt_ids: list):
+    for attempt_id in attempt_ids:
+        get_grading_queue().submit(attempt_id, block=True)
+
+
+def resume_pending_attempts() -> int:
+    """Queues every attempt still pending, e.g. after a restart; returns how many.
+
+    Attempts another process is grading are left to it, and each queued one
+    is claimed before grading, so processes resuming together grade each
+    attempt once. They are queued from a background thread that waits for
+    room, so a backlog larger than the queue neither blocks startup nor is
+    dropped.
+    """
+    db = get_db_session()
+    try:
+        attempt_ids = [attempt_id for (attempt_id,) in db.query(Attempt.id).filter(
+            Attempt.status == ATTEMPT_PENDING, unclaimed(datetime.now(timezone.utc))
+        ).order_by(Attempt.id)]
+    except Exception as e:
+        print(f"Could not resume pending attempts: {e}")
+        return 0
+    finally:
+        db.close()
+    if attempt_ids:
+        threading.Thread(target=_enqueue_pending, args=(attempt_ids,), name="grading-resume", daemon=True).start()
+    return len(attempt_ids)
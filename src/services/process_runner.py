@@ -0,0 +1,119 @@
+import os
+import subprocess
+import threading
+from services.resource_limits import usage_from_rusage
+
+
+class BoundedResult:
+    """Outcome of run_bounded; stdout and stderr hold at most max_bytes each.
+
+    usage holds the peak RSS and CPU time of the process, or None where
+    os.wait4 is unavailable.
+    """
+
+    def __init__(self, args, returncode, stdout, stderr, truncated, usage=None):
+        self.args = args
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.truncated = truncated
+        self.usage = usage
+
+
+def run_bounded(command: list[str], timeout: float, max_bytes: int, input=None, text=False,
+                preexec_fn=None, on_start=None) -> BoundedResult:
+    """Like subprocess.run with PIPEs, but never buffers more than max_bytes per stream.
+
+    Both streams are read incrementally. Once either one exceeds max_bytes the
+    process is killed and the result is marked truncated. Raises
+    subprocess.TimeoutExpired if the process outlives timeout. on_start, if
+    given, is called with the Popen object once the process is running.
+    """
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        preexec_fn=preexec_fn
+    )
+    if on_start is not None:
+        on_start(process)
+    overflow = threading.Event()
+    captured = {}
+
+    def read(name, pipe):
+        chunks = []
+        size = 0
+        with pipe:
+            for chunk in iter(lambda: pipe.read1(65536), b""):
+                chunks.append(chunk[:max_bytes - size])
+                size += len(chunk)
+                if size > max_bytes:
+                    overflow.set()
+                    process.kill()
+                    break
+        captured[name] = b"".join(chunks)
+
+    def write(data):
+        try:
+            with process.stdin:
+                process.stdin.write(data)
+        except OSError:
+            # The process exited or was killed before reading all of its input
+            pass
+
+    threads = [
+        threading.Thread(target=read, args=("stdout", process.stdout), daemon=True),
+        threading.Thread(target=read, args=("stderr", process.stderr), daemon=True),
+    ]
+    if input is not None:
+        data = input.encode("utf-8") if isinstance(input, str) else input
+        threads.append(threading.Thread(target=write, args=(data,), daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        returncode, usage = wait_with_usage(process, timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        for thread in threads:
+            thread.join(timeout=1)
+
+    stdout = captured.get("stdout", b"")
+    stderr = captured.get("stderr", b"")
+    if text:
+        stdout = stdout.decode("utf-8", errors="replace")
+        stderr = stderr.decode("utf-8", errors="replace")
+    return BoundedResult(command, returncode, stdout, stderr, overflow.is_set(), usage)
+
+
+def wait_with_usage(process: subprocess.Popen, timeout: float | None):
+    """Waits for process, returning its exit code and resource usage."""
+    if not hasattr(os, "wait4"):
+        return process.wait(timeout=timeout), None
+
+    # Reap the child ourselves, since only wait4 reports its rusage
+    outcome = {}
+
+    def reap():
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            # Popen.poll() (called by kill()) reaped it first; its usage is lost
+            process.wait()
+            outcome["usage"] = None
+            return
+        process.returncode = os.waitstatus_to_exitcode(status)
+        outcome["usage"] = usage_from_rusage(rusage)
+
+    reaper = threading.Thread(target=reap, daemon=True)
+    reaper.start()
+    reaper.join(timeout)
+    if reaper.is_alive():
+        process.kill()
+        reaper.join()
+        raise subprocess.TimeoutExpired(process.args, timeout)
+    return process.returncode, outcome["usage"]
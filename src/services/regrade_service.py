@@ -0,0 +1,297 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import repeat
+from types import SimpleNamespace
+from sqlalchemy import func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import Config
+from database.db import get_db_session
+from metrics import REGRADED_ATTEMPTS
+from models.attempt import Attempt
+from models.exercise import Exercise
+from models.regrade_job import RegradeJob
+from services.attempt_service import grade_submission, ATTEMPT_GRADED
+
+REGRADE_PENDING = "pending"
+REGRADE_RUNNING = "running"
+REGRADE_COMPLETED = "completed"
+REGRADE_FAILED = "failed"
+ACTIVE_STATUSES = (REGRADE_PENDING, REGRADE_RUNNING)
+
+# Exercise attributes grading reads; copied into the pool's processes
+EXERCISE_FIELDS = (
+    "id", "language", "function_name", "test_cases", "resource_limits", "test_shards", "test_generators",
+    "reference_solution", "benchmark_cases"
+)
+
+
+class RegradeInProgress(Exception):
+    """Raised when an exercise already has an unfinished regrade job."""
+
+    def __init__(self, job: RegradeJob):
+        super().__init__(f"Exercise {job.exercise_id} is already being regraded by job {job.id}")
+        self.job = job
+
+
+def start_regrade(db: Session, exercise_id: int, requested_by: int = None) -> RegradeJob:
+    """Creates a job regrading every attempt at exercise_id so far and queues it.
+
+    Raises RegradeInProgress if the exercise already has an unfinished job; the
+    database's unique index on active jobs decides between concurrent starts.
+    """
+    exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+    if not exercise:
+        raise ValueError(f"Exercise with id {exercise_id} not found")
+
+    attempts = db.query(Attempt).filter(Attempt.exercise_id == exercise_id)
+    job = RegradeJob(
+        exercise_id=exercise_id,
+        requested_by=requested_by,
+        status=REGRADE_PENDING,
+        max_attempt_id=attempts.with_entities(func.max(Attempt.id)).scalar() or 0,
+        total=attempts.count()
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        active = db.query(RegradeJob).filter(
+            RegradeJob.exercise_id == exercise_id, RegradeJob.status.in_(ACTIVE_STATUSES)
+        ).first()
+        if active is None:
+            raise
+        raise RegradeInProgress(active) from None
+    db.refresh(job)
+    get_regrade_runner().submit(job.id)
+    return job
+
+
+def get_regrade_job(db: Session, job_id: int):
+    return db.query(RegradeJob).filter(RegradeJob.id == job_id).first()
+
+
+def regrade_job_to_dict(job: RegradeJob) -> dict:
+    return {
+        "id": job.id,
+        "exercise_id": job.exercise_id,
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "failed": job.failed,
+        "progress": round(job.processed / job.total, 3) if job.total else 1.0,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+def regrade_attempts(exercise_fields: dict, attempts: list) -> list:
+    """Grades (attempt id, code) pairs; runs in a pool process.
+
+    Returns an Attempt update mapping per attempt, or None where grading raised,
+    which leaves that attempt's previous grade in place.
+    """
+    exercise = SimpleNamespace(**exercise_fields)
+    mappings = []
+    for attempt_id, code in attempts:
+        try:
+            result = grade_submission(code, exercise)
+        except Exception as e:
+            print(f"Regrading attempt {attempt_id} failed: {type(e).__name__}: {e}")
+            mappings.append(None)
+            continue
+        mappings.append({
+            "id": attempt_id,
+            "score": result["style_score"],
+            "stars": result["stars"],
+            "relative_runtime": result.get("relative_runtime"),
+            "peak_memory_bytes": result.get("peak_memory_bytes"),
+            "efficiency_score": result.get("efficiency_score"),
+            "status": ATTEMPT_GRADED,
+            "graded_at": datetime.now(timezone.utc)
+        })
+    return mappings
+
+
+def claim_job(db: Session, job_id: int) -> bool:
+    """Atomically takes a job that is pending or whose runner stopped renewing its lease."""
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=Config.REGRADE_LEASE_SECONDS)
+    claimed = db.execute(
+        update(RegradeJob)
+        .where(RegradeJob.id == job_id, RegradeJob.status.in_(ACTIVE_STATUSES))
+        .where(or_(RegradeJob.heartbeat_at.is_(None), RegradeJob.heartbeat_at < stale))
+        .values(status=REGRADE_RUNNING, heartbeat_at=now)
+    ).rowcount == 1
+    db.commit()
+    return claimed
+
+
+def renew_lease(job_id: int, stop: threading.Event):
+    """Renews a running job's heartbeat every third of the lease until stop is set.
+
+    Runs on its own thread, so a batch that takes longer than the lease does
+    not let another process claim the job while it is still being graded.
+    """
+    interval = max(1.0, Config.REGRADE_LEASE_SECONDS / 3)
+    while not stop.wait(interval):
+        db = get_db_session()
+        try:
+            db.execute(
+                update(RegradeJob)
+                .where(RegradeJob.id == job_id, RegradeJob.status == REGRADE_RUNNING)
+                .values(heartbeat_at=datetime.now(timezone.utc))
+            )
+            db.commit()
+        except Exception as e:
+            print(f"Could not renew the lease of regrade job {job_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+
+def split_batch(batch: list, parts: int) -> list[list]:
+    """Splits a batch into at most parts interleaved chunks, one per pool process."""
+    return [chunk for chunk in (batch[i::max(1, parts)] for i in range(max(1, parts))) if chunk]
+
+
+def run_regrade_job(job_id: int, executor) -> str | None:
+    """Regrades a claimed job's remaining attempts in batches on executor.
+
+    Attempts are read in id order after the job's cursor, so each batch is a
+    bounded keyset query. A batch's grades, the cursor and the counters are
+    committed together, so a job resumed after a restart repeats at most the
+    batch that was in flight. The lease is renewed in the background while
+    the job runs. Returns the final status, or None if the job could not be
+    claimed.
+    """
+    db = get_db_session()
+    stop_renewing = threading.Event()
+    try:
+        if not claim_job(db, job_id):
+            return None
+        threading.Thread(
+            target=renew_lease, args=(job_id, stop_renewing), name=f"regrade-lease-{job_id}", daemon=True
+        ).start()
+        job = get_regrade_job(db, job_id)
+        job.started_at = job.started_at or datetime.now(timezone.utc)
+        db.commit()
+        fields = {name: getattr(job.exercise, name) for name in EXERCISE_FIELDS}
+        parts = max(1, Config.REGRADE_WORKERS)
+        try:
+            while True:
+                batch = db.query(Attempt.id, Attempt.code_submitted).filter(
+                    Attempt.exercise_id == job.exercise_id,
+                    Attempt.id > job.last_attempt_id,
+                    Attempt.id <= job.max_attempt_id
+                ).order_by(Attempt.id).limit(Config.REGRADE_BATCH_SIZE).all()
+                if not batch:
+                    break
+                chunks = split_batch([tuple(row) for row in batch], parts)
+                results = [m for chunk in executor.map(regrade_attempts, repeat(fields), chunks) for m in chunk]
+                mappings = [mapping for mapping in results if mapping is not None]
+                db.bulk_update_mappings(Attempt, mappings)
+                job.last_attempt_id = batch[-1].id
+                job.processed += len(batch)
+                job.failed += len(batch) - len(mappings)
+                job.heartbeat_at = datetime.now(timezone.utc)
+                db.commit()
+                REGRADED_ATTEMPTS.labels(outcome="graded").inc(len(mappings))
+                REGRADED_ATTEMPTS.labels(outcome="failed").inc(len(batch) - len(mappings))
+            job.status = REGRADE_COMPLETED
+        except Exception as e:
+            print(f"Regrade job {job_id} failed: {type(e).__name__}: {e}")
+            db.rollback()
+            job.status = REGRADE_FAILED
+            job.error = f"{type(e).__name__}: {e}"
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        return job.status
+    finally:
+        stop_renewing.set()
+        db.close()
+
+
+def create_regrade_executor() -> ProcessPoolExecutor:
+    # Spawned rather than forked: the server process has threads that hold locks.
+    # Spawned processes import the main module as __mp_main__, which is why
+    # app.py skips its startup work under that name.
+    return ProcessPoolExecutor(
+        max_workers=max(1, Config.REGRADE_WORKERS), mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+class RegradeRunner:
+    """Runs queued regrade jobs one at a time on a daemon thread, each with a fresh process pool.
+
+    A job another process holds the lease on is retried once the lease could
+    have expired, so a job is never lost to a runner that died.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="regrade-runner", daemon=True)
+        self._thread.start()
+
+    def submit(self, job_id: int):
+        self._queue.put(job_id)
+
+    def retry_later(self, job_id: int):
+        timer = threading.Timer(Config.REGRADE_LEASE_SECONDS, self.submit, (job_id,))
+        timer.daemon = True
+        timer.start()
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                with create_regrade_executor() as executor:
+                    status = run_regrade_job(job_id, executor)
+                if status is None and self._still_active(job_id):
+                    self.retry_later(job_id)
+            except Exception as e:
+                print(f"Regrade runner error for job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _still_active(self, job_id: int) -> bool:
+        db = get_db_session()
+        try:
+            job = get_regrade_job(db, job_id)
+            return job is not None and job.status in ACTIVE_STATUSES
+        finally:
+            db.close()
+
+
+_regrade_runner = None
+_regrade_runner_lock = threading.Lock()
+
+def get_regrade_runner() -> RegradeRunner:
+    global _regrade_runner
+    with _regrade_runner_lock:
+        if _regrade_runner is None:
+            _regrade_runner = RegradeRunner()
+        return _regrade_runner
+
+
+def resume_regrade_jobs() -> int:
+    """Queues every unfinished regrade job, e.g. after a restart; returns how many."""
+    db = get_db_session()
+    try:
+        job_ids = [job_id for (job_id,) in db.query(RegradeJob.id).filter(
+            RegradeJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(RegradeJob.id)]
+    except Exception as e:
+        print(f"Could not resume regrade jobs: {e}")
+        return 0
+    finally:
+        db.close()
+    for job_id in job_ids:
+        get_regrade_runner().submit(job_id)
+    return len(job_ids)
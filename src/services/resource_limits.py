@@ -0,0 +1,68 @@
+import json
+import sys
+from config import Config
+from metrics import EXECUTION_PEAK_RSS, EXECUTION_CPU_TIME
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LIMIT_KEYS = ("memory_mb", "cpu_seconds", "max_processes")
+
+
+def resolve_limits(overrides=None) -> dict:
+    """Returns the configured limits with any per-exercise overrides applied."""
+    limits = {
+        "memory_mb": Config.EXECUTION_MEMORY_LIMIT_MB,
+        "cpu_seconds": Config.EXECUTION_CPU_LIMIT_SECONDS,
+        "max_processes": Config.EXECUTION_PROCESS_LIMIT,
+    }
+    if isinstance(overrides, str):
+        overrides = json.loads(overrides) if overrides else None
+    for key in LIMIT_KEYS:
+        if overrides and overrides.get(key) is not None:
+            limits[key] = int(overrides[key])
+    return limits
+
+
+def apply_limits(limits: dict, address_space: bool = True):
+    """Sets rlimits on the current process; meant to run in the child before exec."""
+    if limits["cpu_seconds"]:
+        # The hard limit leaves a second to handle SIGXCPU before SIGKILL
+        resource.setrlimit(resource.RLIMIT_CPU, (limits["cpu_seconds"], limits["cpu_seconds"] + 1))
+    if limits["memory_mb"] and address_space:
+        memory = limits["memory_mb"] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    if limits["max_processes"]:
+        resource.setrlimit(resource.RLIMIT_NPROC, (limits["max_processes"], limits["max_processes"]))
+
+
+def limit_preexec(limits: dict | None, address_space: bool = True):
+    """Returns a preexec_fn applying limits, or None where rlimits are unavailable."""
+    if limits is None or resource is None:
+        return None
+    return lambda: apply_limits(limits, address_space)
+
+
+def node_args(limits: dict | None) -> list[str]:
+    # V8 reserves far more address space than it uses, so RLIMIT_AS would
+    # stop node from starting; its heap is capped instead
+    if limits and limits["memory_mb"]:
+        return [f"--max-old-space-size={limits['memory_mb']}"]
+    return []
+
+
+def usage_from_rusage(rusage) -> dict:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    return {
+        "peak_rss_bytes": peak_rss,
+        "cpu_seconds": round(rusage.ru_utime + rusage.ru_stime, 4),
+    }
+
+
+def observe_usage(language: str, kind: str, usage: dict | None):
+    if usage:
+        EXECUTION_PEAK_RSS.labels(language=language, kind=kind).observe(usage["peak_rss_bytes"])
+        EXECUTION_CPU_TIME.labels(language=language, kind=kind).observe(usage["cpu_seconds"])
@@ -0,0 +1,67 @@
+import sys
+import threading
+import traceback
+import warnings
+from pathlib import Path
+from config import Config
+from metrics import SYNTAX_PRECHECK_SPAWNS_AVOIDED
+from services.worker_pool import create_pool
+
+SYNTAX_WORKER = Path(__file__).resolve().parent.parent / "workers" / "syntax_worker.js"
+
+_js_checker = None
+_js_checker_lock = threading.Lock()
+
+def get_js_checker():
+    global _js_checker
+    with _js_checker_lock:
+        if _js_checker is None:
+            _js_checker = create_pool(
+                "javascript-syntax",
+                ["node", str(SYNTAX_WORKER)],
+                size=1,
+                max_runs=Config.ESLINT_POOL_MAX_RUNS,
+                queue_timeout=Config.EXECUTION_POOL_QUEUE_TIMEOUT
+            )
+        return _js_checker
+
+
+def check_python_syntax(code: str) -> str | None:
+    try:
+        with warnings.catch_warnings():
+            # e.g. invalid escape sequences; they are the interpreter's business
+            warnings.simplefilter("ignore")
+            compile(code, "<string>", "exec", dont_inherit=True)
+    except (SyntaxError, ValueError) as e:
+        return "".join(traceback.format_exception_only(type(e), e))
+    except Exception:
+        # RecursionError, MemoryError: let the real run decide
+        return None
+    return None
+
+
+def check_javascript_syntax(code: str) -> str | None:
+    try:
+        return get_js_checker().run({"code": code}, timeout=5)["error"]
+    except Exception as e:
+        print(f"Error during syntax check: {e}")
+        return None
+
+
+def check_syntax(code: str, language: str) -> str | None:
+    """Parses code without running it; returns the syntax error report, or None.
+
+    None also means the check could not be made, so callers fall back to a
+    real run, which reports the error the usual way.
+    """
+    if not Config.SYNTAX_PRECHECK:
+        return None
+    if language == "python":
+        return check_python_syntax(code)
+    if language == "javascript":
+        return check_javascript_syntax(code)
+    return None
+
+
+def record_spawns_avoided(language: str, kind: str, count: int):
+    SYNTAX_PRECHECK_SPAWNS_AVOIDED.labels(language=language, kind=kind).inc(count)
@@ -0,0 +1,240 @@
+import atexit
+import itertools
+import json
+import os
+import queue
+import select
+import signal
+import subprocess
+import threading
+import time
+import psutil
+from metrics import (
+    EXECUTION_POOL_SIZE,
+    EXECUTION_POOL_BUSY,
+    EXECUTION_POOL_MAX_RUNS,
+    EXECUTION_POOL_RECYCLES,
+    EXECUTION_POOL_QUEUE_WAIT
+)
+
+
+class WorkerError(Exception):
+    """Raised when a pooled worker dies or returns an unreadable response."""
+
+
+class WorkerDesync(WorkerError):
+    """Raised when a response does not belong to the request, e.g. one forged by the code run.
+
+    The worker's pipe can no longer be trusted, so it must be retired.
+    """
+
+
+_request_ids = itertools.count(1)
+
+
+class Worker:
+    """A single long-lived process speaking newline-delimited JSON over its pipes.
+
+    Every request carries a request_id the worker echoes in its response. A
+    response with another id, or with more output already waiting behind it,
+    means something other than the worker loop wrote to the pipe.
+    """
+
+    def __init__(self, command: list[str], preexec_fn=None):
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+            preexec_fn=preexec_fn
+        )
+        self.runs = 0
+        self._pending = b""
+
+    def _read_line(self) -> bytes:
+        """Reads one response line straight from the pipe; what follows it stays in _pending."""
+        fd = self.process.stdout.fileno()
+        while b"\n" not in self._pending:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return b""
+            self._pending += chunk
+        line, self._pending = self._pending.split(b"\n", 1)
+        return line
+
+    def _output_waiting(self) -> bool:
+        if self._pending:
+            return True
+        readable, _, _ = select.select([self.process.stdout], [], [], 0)
+        return bool(readable)
+
+    def request(self, payload: dict, timeout: float) -> dict:
+        timed_out = threading.Event()
+        request_id = next(_request_ids)
+
+        def expire():
+            timed_out.set()
+            self.kill()
+
+        timer = threading.Timer(timeout, expire)
+        timer.start()
+        try:
+            self.process.stdin.write((json.dumps(dict(payload, request_id=request_id)) + "\n").encode("utf-8"))
+            self.process.stdin.flush()
+            line = self._read_line()
+        except (BrokenPipeError, OSError, ValueError):
+            line = b""
+        finally:
+            timer.cancel()
+
+        self.runs += 1
+        if timed_out.is_set():
+            raise TimeoutError(f"Worker did not answer within {timeout}s")
+        if not line:
+            raise WorkerError(self.exit_reason())
+        try:
+            response = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise WorkerDesync(f"Malformed worker response: {e}")
+        if not isinstance(response, dict) or response.pop("request_id", None) != request_id:
+            raise WorkerDesync("Worker response does not match the request")
+        if self._output_waiting():
+            raise WorkerDesync("Worker wrote more than one response")
+        return response
+
+    def exit_reason(self) -> str:
+        try:
+            returncode = self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            returncode = None
+        # The CPU rlimit kills with SIGXCPU and leaves nothing on stderr
+        if hasattr(signal, "SIGXCPU") and returncode == -signal.SIGXCPU:
+            return "CPU time limit exceeded"
+        return "Worker exited unexpectedly"
+
+    def cpu_seconds(self) -> float:
+        """CPU time the worker and the children it has reaped have used over its lifetime."""
+        try:
+            times = psutil.Process(self.process.pid).cpu_times()
+        except psutil.Error:
+            return 0.0
+        return times.user + times.system + times.children_user + times.children_system
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class WorkerPool:
+    """Fixed-size pool of pre-started workers, recycled after max_runs or on failure.
+
+    Workers start with preexec_fn, e.g. to apply rlimits, which then cover a
+    worker's whole life. With cpu_budget set, a worker that has used that much
+    CPU time is recycled.
+    """
+
+    def __init__(self, name: str, command: list[str], size: int, max_runs: int, queue_timeout: float = 10.0,
+                 preexec_fn=None, cpu_budget: float | None = None):
+        self.name = name
+        self.command = command
+        self.size = size
+        self.max_runs = max_runs
+        self.queue_timeout = queue_timeout
+        self.preexec_fn = preexec_fn
+        self.cpu_budget = cpu_budget
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+        EXECUTION_POOL_SIZE.labels(pool=name).set(size)
+        EXECUTION_POOL_MAX_RUNS.labels(pool=name).set(max_runs)
+
+    def _spawn(self) -> Worker:
+        worker = Worker(self.command, preexec_fn=self.preexec_fn)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _retire(self, worker: Worker, reason: str):
+        EXECUTION_POOL_RECYCLES.labels(pool=self.name, reason=reason).inc()
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+        if not self._closed:
+            self._idle.put(self._spawn())
+
+    def _acquire(self) -> Worker:
+        started = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No {self.name} worker available within {self.queue_timeout}s")
+        finally:
+            EXECUTION_POOL_QUEUE_WAIT.labels(pool=self.name).observe(time.monotonic() - started)
+
+        if not worker.alive():
+            self._retire(worker, "crashed")
+            return self._acquire()
+        return worker
+
+    def run(self, payload: dict, timeout: float) -> dict:
+        """Send payload to an idle worker and return its response.
+
+        Raises TimeoutError if no worker frees up or the run exceeds timeout,
+        and WorkerError if the worker dies mid-run.
+        """
+        worker = self._acquire()
+        busy = EXECUTION_POOL_BUSY.labels(pool=self.name)
+        busy.inc()
+        try:
+            response = worker.request(payload, timeout)
+        except TimeoutError:
+            self._retire(worker, "timeout")
+            raise
+        except WorkerDesync:
+            self._retire(worker, "desync")
+            raise
+        except WorkerError:
+            self._retire(worker, "crashed")
+            raise
+        finally:
+            busy.dec()
+
+        if response.pop("recycle", False):
+            # The run left state behind that the next user's run could see
+            self._retire(worker, "dirty")
+        elif worker.runs >= self.max_runs:
+            self._retire(worker, "max_runs")
+        elif self.cpu_budget and worker.cpu_seconds() >= self.cpu_budget:
+            self._retire(worker, "cpu_limit")
+        else:
+            self._idle.put(worker)
+        return response
+
+    def shutdown(self):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.kill()
+        EXECUTION_POOL_SIZE.labels(pool=self.name).set(0)
+
+
+def create_pool(name: str, command: list[str], size: int, max_runs: int, queue_timeout: float = 10.0,
+                preexec_fn=None, cpu_budget: float | None = None) -> WorkerPool:
+    pool = WorkerPool(name, command, size, max_runs, queue_timeout, preexec_fn, cpu_budget)
+    atexit.register(pool.shutdown)
+    return pool
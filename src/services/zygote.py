@@ -0,0 +1,101 @@
+import atexit
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from services.worker_pool import WorkerError
+
+ZYGOTE_SCRIPT = Path(__file__).resolve().parent.parent / "workers" / "python_zygote.py"
+
+
+class Zygote:
+    """Client for the Python fork server; exposes the same run() as WorkerPool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+        self._socket_dir = None
+        self.socket_path = None
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                return
+            self._cleanup()
+            self._socket_dir = tempfile.mkdtemp(prefix="codesnap-zygote-")
+            self.socket_path = os.path.join(self._socket_dir, "zygote.sock")
+            self._process = subprocess.Popen(
+                [sys.executable, "-u", str(ZYGOTE_SCRIPT), self.socket_path],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+            if self._process.stdout.readline().strip() != "ready":
+                raise WorkerError("Zygote failed to start")
+
+    def run(self, payload: dict, timeout: float) -> dict:
+        """Fork a fresh child from the zygote, run payload in it and return its response.
+
+        Raises TimeoutError if the child does not answer within timeout, and
+        WorkerError if it dies without answering.
+        """
+        self._ensure_running()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(self.socket_path)
+            with sock.makefile("rw", encoding="utf-8") as channel:
+                try:
+                    pid = json.loads(channel.readline())["pid"]
+                    channel.write(json.dumps(payload) + "\n")
+                    channel.flush()
+                except (ValueError, KeyError, OSError) as e:
+                    raise WorkerError(f"Zygote child failed to start: {e}")
+
+                try:
+                    line = channel.readline()
+                except socket.timeout:
+                    _kill(pid)
+                    raise TimeoutError(f"Zygote child did not answer within {timeout}s")
+
+        if not line:
+            raise WorkerError("Zygote child exited unexpectedly")
+        return json.loads(line)
+
+    def _cleanup(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        if self._socket_dir is not None:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+        self._process = None
+        self._socket_dir = None
+
+    def shutdown(self):
+        with self._lock:
+            self._cleanup()
+
+
+def _kill(pid: int):
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+_zygote = None
+_zygote_lock = threading.Lock()
+
+def get_zygote() -> Zygote:
+    global _zygote
+    with _zygote_lock:
+        if _zygote is None:
+            _zygote = Zygote()
+            atexit.register(_zygote.shutdown)
+        return _zygote
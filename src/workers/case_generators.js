@@ -0,0 +1,73 @@
+'use strict';
+// Seeded test-case generators for the JavaScript grading harness.
+//
+// Mirrors case_generators.py: the same spec format and the same mulberry32
+// PRNG, so a seed expands to the same cases in either language. Cases are
+// generated one at a time, so only the one being run is in memory.
+
+const crypto = require('crypto');
+
+function mulberry32(seed) {
+  let state = seed | 0;
+  return function random() {
+    state = (state + 0x6d2b79f5) | 0;
+    let t = Math.imul(state ^ (state >>> 15), state | 1);
+    t = (t + Math.imul(t ^ (t >>> 7), t | 61)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function randomInt(random, low, high) {
+  return low + Math.floor(random() * (high - low + 1));
+}
+
+function length(random, spec) {
+  return typeof spec === 'object' ? randomInt(random, spec.min, spec.max) : Number(spec);
+}
+
+function generateValue(random, spec) {
+  switch (spec.type) {
+    case 'int':
+      return randomInt(random, spec.min, spec.max);
+    case 'float':
+      return spec.min + random() * (spec.max - spec.min);
+    case 'string': {
+      const alphabet = spec.alphabet || 'abcdefghijklmnopqrstuvwxyz';
+      let text = '';
+      for (let i = length(random, spec.length); i > 0; i--) {
+        text += alphabet[randomInt(random, 0, alphabet.length - 1)];
+      }
+      return text;
+    }
+    case 'list': {
+      const items = [];
+      for (let i = length(random, spec.length); i > 0; i--) {
+        items.push(generateValue(random, spec.of));
+      }
+      return items;
+    }
+    case 'value':
+      return spec.value;
+    default:
+      throw new Error(`Unknown generator type: ${spec.type}`);
+  }
+}
+
+function* generateCases(spec) {
+  const random = mulberry32(spec.seed || 0);
+  const count = spec.count ?? 1;
+  for (let i = 0; i < count; i++) {
+    yield (spec.args || []).map((arg) => generateValue(random, arg));
+  }
+}
+
+function caseCount(generators) {
+  return (generators || []).reduce((total, spec) => total + (spec.count ?? 1), 0);
+}
+
+function resultDigest(value) {
+  const canonical = JSON.stringify(value);
+  return crypto.createHash('sha256').update(canonical === undefined ? 'undefined' : canonical).digest('hex');
+}
+
+module.exports = { mulberry32, generateCases, caseCount, resultDigest };
@@ -0,0 +1,76 @@
+"""Seeded test-case generators, shared by the grading harness and the server.
+
+A generator spec produces spec["count"] cases from spec["seed"]:
+
+    {"seed": 7, "count": 3, "args": [{"type": "list", "length": 1000000,
+                                       "of": {"type": "int", "min": -1000, "max": 1000}}]}
+
+Argument specs are {"type": "int", "min", "max"}, {"type": "float", "min",
+"max"}, {"type": "string", "length", "alphabet"}, {"type": "list", "length",
+"of"} and {"type": "value", "value"}; a length is a number or an int spec.
+Values are drawn with mulberry32, implemented identically in
+case_generators.js, so a seed expands to the same cases in either language.
+Cases are generated one at a time, so only the one being run is in memory.
+"""
+import hashlib
+import json
+
+UINT32 = 0xFFFFFFFF
+
+
+def _imul(a: int, b: int) -> int:
+    return (a * b) & UINT32
+
+
+class Mulberry32:
+    def __init__(self, seed: int):
+        self.state = seed & UINT32
+
+    def random(self) -> float:
+        """Next float in [0, 1), exactly as the JavaScript version computes it."""
+        self.state = (self.state + 0x6D2B79F5) & UINT32
+        t = self.state
+        t = _imul(t ^ (t >> 15), t | 1)
+        t = ((t + _imul(t ^ (t >> 7), t | 61)) & UINT32) ^ t
+        return ((t ^ (t >> 14)) & UINT32) / 4294967296
+
+
+def _int(rng: Mulberry32, low: int, high: int) -> int:
+    return low + int(rng.random() * (high - low + 1))
+
+
+def _length(rng: Mulberry32, length) -> int:
+    return _int(rng, length["min"], length["max"]) if isinstance(length, dict) else int(length)
+
+
+def generate_value(rng: Mulberry32, spec: dict):
+    kind = spec["type"]
+    if kind == "int":
+        return _int(rng, spec["min"], spec["max"])
+    if kind == "float":
+        return spec["min"] + rng.random() * (spec["max"] - spec["min"])
+    if kind == "string":
+        alphabet = spec.get("alphabet", "abcdefghijklmnopqrstuvwxyz")
+        return "".join(alphabet[_int(rng, 0, len(alphabet) - 1)] for _ in range(_length(rng, spec["length"])))
+    if kind == "list":
+        return [generate_value(rng, spec["of"]) for _ in range(_length(rng, spec["length"]))]
+    if kind == "value":
+        return spec["value"]
+    raise ValueError(f"Unknown generator type: {kind}")
+
+
+def generate_cases(spec: dict):
+    """Yields the argument list of each case spec describes, in order."""
+    rng = Mulberry32(spec.get("seed", 0))
+    for _ in range(spec.get("count", 1)):
+        yield [generate_value(rng, arg) for arg in spec.get("args", [])]
+
+
+def case_count(generators: list | None) -> int:
+    return sum(spec.get("count", 1) for spec in generators or [])
+
+
+def result_digest(value) -> str:
+    """Digest of a return value, compared instead of storing large expected values."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
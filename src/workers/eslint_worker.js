@@ -0,0 +1,57 @@
+'use strict';
+// Long-lived ESLint worker, in the spirit of eslint_d.
+//
+// Loads ESLint once and keeps one linter instance per rule set. Reads one
+// JSON request per line on stdin ({code, rules}) and answers with one JSON
+// line holding the same report `eslint --format json` prints.
+
+const readline = require('readline');
+
+function loadESLint() {
+  // Prefer the project's own ESLint, like npx would
+  try {
+    return require(require.resolve('eslint', { paths: [process.cwd()] }));
+  } catch (err) {
+    return require('eslint');
+  }
+}
+
+const { ESLint } = loadESLint();
+const usesFlatConfig = parseInt(ESLint.version, 10) >= 9;
+const linters = new Map();
+
+function getLinter(rules) {
+  const key = JSON.stringify(rules);
+  if (!linters.has(key)) {
+    // Equivalent of `--no-eslintrc --rule ...` on the command line
+    const options = usesFlatConfig
+      ? { overrideConfigFile: true, overrideConfig: { rules } }
+      : { useEslintrc: false, overrideConfig: { rules } };
+    const eslint = new ESLint(options);
+    linters.set(key, { eslint, formatter: eslint.loadFormatter('json') });
+  }
+  return linters.get(key);
+}
+
+async function lint(code, rules) {
+  const { eslint, formatter } = getLinter(rules);
+  const results = await eslint.lintText(code);
+  return (await formatter).format(results);
+}
+
+async function main() {
+  const lines = readline.createInterface({ input: process.stdin, terminal: false });
+  for await (const line of lines) {
+    const request = JSON.parse(line);
+    let response;
+    try {
+      response = { output: await lint(request.code, request.rules || {}) };
+    } catch (err) {
+      response = { output: '', error: String(err && err.message ? err.message : err) };
+    }
+    response.request_id = request.request_id;
+    process.stdout.write(JSON.stringify(response) + '\n');
+  }
+}
+
+main();
@@ -0,0 +1,58 @@
+'use strict';
+// Benchmark harness for JavaScript submissions and reference solutions.
+//
+// Reads {code, function_name, cases, warmup, runs, marker} as JSON on stdin.
+// Calls the function on every case warmup times untimed, then times runs
+// passes over all cases and prints a JSON trailer after marker with the
+// median pass time, every pass time and how far the passes raised peak RSS.
+// Arguments are copied before each pass starts, so in-place mutation neither
+// leaks between passes nor counts towards the time.
+
+const { loadFunction, exceptionName } = require('./js_harness');
+
+// Loading the submission may not take longer than this
+const LOAD_TIMEOUT_MS = 5000;
+
+function timePass(fn, cases) {
+  const calls = cases.map((test) => structuredClone(test.args));
+  const started = performance.now();
+  for (const args of calls) {
+    fn(...args);
+  }
+  return performance.now() - started;
+}
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  const middle = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[middle] : (sorted[middle - 1] + sorted[middle]) / 2;
+}
+
+function benchmark(code, functionName, cases, warmup, runs) {
+  try {
+    const fn = loadFunction(code, functionName, LOAD_TIMEOUT_MS);
+    const rssBefore = process.resourceUsage().maxRSS;
+    for (let i = 0; i < warmup; i++) {
+      timePass(fn, cases);
+    }
+    const timings = [];
+    for (let i = 0; i < Math.max(1, runs); i++) {
+      timings.push(timePass(fn, cases));
+    }
+    // maxRSS is in kilobytes
+    const peak = (process.resourceUsage().maxRSS - rssBefore) * 1024;
+    return { median_ms: median(timings), runs_ms: timings, peak_memory_bytes: peak };
+  } catch (err) {
+    return { error: exceptionName(err) };
+  }
+}
+
+function main() {
+  const request = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+  const report = benchmark(
+    request.code, request.function_name, request.cases, request.warmup ?? 1, request.runs ?? 5
+  );
+  process.stdout.write('\n' + request.marker + JSON.stringify(report) + '\n');
+}
+
+main();
@@ -0,0 +1,200 @@
+'use strict';
+// Fixed grading harness for JavaScript submissions.
+//
+// Reads {code, function_name, test_cases, marker, options} as JSON on stdin,
+// runs the submission once, calls the function for every test case and prints
+// a JSON trailer after marker with status, exception type and elapsed time for
+// each case.
+//
+// Each case runs under its own deadline (options.case_timeout_ms) and all of
+// them share options.budget_ms. A case past its deadline is recorded as
+// "timeout"; with options.on_timeout === 'abort', or once the budget is spent,
+// the remaining cases are recorded as "skipped" without running.
+//
+// request.generators adds generated cases after test_cases, and
+// request.mode === 'digests' reports reference digests instead, as described
+// in python_harness.py.
+
+const fs = require('fs');
+const vm = require('vm');
+const { caseCount, generateCases, resultDigest } = require('./case_generators');
+
+const DEFAULT_OPTIONS = { case_timeout_ms: 1000, budget_ms: 4000, on_timeout: 'continue' };
+// Calls the function inside a script, the unit vm can interrupt on a timeout
+const CALL = new vm.Script('globalThis.__codesnapCall()', { filename: 'harness-call.js' });
+
+function readStdin() {
+  return require('fs').readFileSync(0, 'utf8');
+}
+
+function isTimeout(err) {
+  return Boolean(err && err.code === 'ERR_SCRIPT_EXECUTION_TIMEOUT');
+}
+
+function loadFunction(code, functionName, timeoutMs) {
+  // Give the submission the same globals a CommonJS entry script would see
+  globalThis.require = require;
+  globalThis.module = { exports: {} };
+  globalThis.exports = globalThis.module.exports;
+  vm.runInThisContext(code, { filename: 'submission.js', timeout: Math.max(1, Math.floor(timeoutMs)) });
+  // Top-level function, let and const bindings are all visible to a later script
+  return vm.runInThisContext(functionName);
+}
+
+function exceptionName(err) {
+  return (err && err.constructor && err.constructor.name) || typeof err;
+}
+
+function runCase(fn, test, timeoutMs) {
+  const started = performance.now();
+  let elapsedMs = null;
+  let result;
+  try {
+    globalThis.__codesnapCall = () => fn(...test.args);
+    const value = CALL.runInThisContext({ timeout: Math.max(1, Math.floor(timeoutMs)) });
+    elapsedMs = performance.now() - started;
+    const passed = 'digest' in test
+      ? resultDigest(value) === test.digest
+      : JSON.stringify(value) === JSON.stringify(test.expected);
+    result = { status: passed ? 'passed' : 'failed', exception: null };
+  } catch (err) {
+    result = isTimeout(err)
+      ? { status: 'timeout', exception: null }
+      : { status: 'error', exception: exceptionName(err) };
+  }
+  result.elapsed_ms = elapsedMs !== null ? elapsedMs : performance.now() - started;
+  return result;
+}
+
+function* readLines(path) {
+  const fd = fs.openSync(path, 'r');
+  const chunk = Buffer.alloc(1 << 20);
+  let pending = '';
+  try {
+    let read;
+    while ((read = fs.readSync(fd, chunk, 0, chunk.length, null)) > 0) {
+      const lines = (pending + chunk.toString('utf8', 0, read)).split('\n');
+      pending = lines.pop();
+      yield* lines;
+    }
+  } finally {
+    fs.closeSync(fd);
+  }
+  if (pending) {
+    yield pending;
+  }
+}
+
+// Argument lists of a generators entry's cases, read from its file when it has one
+function* caseArgs(entry) {
+  if (!entry.path) {
+    yield* generateCases(entry.spec);
+    return;
+  }
+  for (const line of readLines(entry.path)) {
+    if (line) {
+      yield JSON.parse(line);
+    }
+  }
+}
+
+function* iterCases(testCases, generated) {
+  yield* testCases;
+  for (const entry of generated) {
+    let index = 0;
+    for (const args of caseArgs(entry)) {
+      yield { args, digest: entry.expected[index] };
+      index++;
+    }
+  }
+}
+
+function runTests(code, functionName, testCases, options, generated) {
+  options = { ...DEFAULT_OPTIONS, ...(options || {}) };
+  generated = generated || [];
+  const total = testCases.length + caseCount(generated.map((entry) => entry.spec));
+  let budgetEnds = performance.now() + options.budget_ms;
+  const repeat = (result) => Array.from({ length: total }, () => ({ ...result }));
+  let fn;
+  try {
+    fn = loadFunction(code, functionName, options.budget_ms);
+  } catch (err) {
+    if (isTimeout(err)) {
+      // Top-level code used up the whole budget
+      return repeat({ status: 'timeout', exception: null, elapsed_ms: 0 });
+    }
+    // The submission itself failed, so every case errors the same way
+    return repeat({ status: 'error', exception: exceptionName(err), elapsed_ms: 0 });
+  }
+
+  const results = [];
+  const cases = iterCases(testCases, generated);
+  for (;;) {
+    const loading = performance.now();
+    const next = cases.next();
+    if (next.done) {
+      break;
+    }
+    // Reading a generated case is the grader's work, not the submission's
+    budgetEnds += performance.now() - loading;
+    const remaining = budgetEnds - performance.now();
+    if (remaining <= 0) {
+      break;
+    }
+    const started = performance.now();
+    const result = runCase(fn, next.value, Math.min(options.case_timeout_ms, remaining));
+    // Only the call counts against the budget, not digesting its result
+    budgetEnds += Math.max(0, performance.now() - started - result.elapsed_ms);
+    results.push(result);
+    if (result.status === 'timeout' && options.on_timeout === 'abort') {
+      break;
+    }
+  }
+  // Cases left after stopping are not run, or generated
+  while (results.length < total) {
+    results.push({ status: 'skipped', exception: null, elapsed_ms: 0 });
+  }
+  return results;
+}
+
+function referenceDigests(code, functionName, generated, options) {
+  options = { ...DEFAULT_OPTIONS, ...(options || {}) };
+  let fn;
+  try {
+    fn = loadFunction(code, functionName, options.budget_ms);
+  } catch (err) {
+    return generated.map((entry) => new Array(caseCount([entry.spec])).fill(null));
+  }
+  return generated.map((entry) => {
+    const digests = [];
+    for (const args of caseArgs(entry)) {
+      try {
+        globalThis.__codesnapCall = () => fn(...args);
+        digests.push(resultDigest(CALL.runInThisContext({ timeout: Math.max(1, Math.floor(options.case_timeout_ms)) })));
+      } catch (err) {
+        digests.push(null);
+      }
+    }
+    return digests;
+  });
+}
+
+function main() {
+  const request = JSON.parse(readStdin());
+  const generated = request.generators || [];
+  let report;
+  if (request.mode === 'digests') {
+    report = { digests: referenceDigests(request.code, request.function_name, generated, request.options) };
+  } else {
+    report = {
+      tests: runTests(request.code, request.function_name, request.test_cases || [], request.options, generated)
+    };
+  }
+  process.stdout.write('\n' + request.marker + JSON.stringify(report) + '\n');
+}
+
+if (require.main === module) {
+  main();
+}
+
+module.exports = { loadFunction, exceptionName };
@@ -0,0 +1,187 @@
+'use strict';
+// Long-lived Node.js worker for the execution pool.
+//
+// Reads one JSON request per line on stdin, runs the code in a fresh vm
+// context with its own timeout and writes one JSON line back with the
+// captured stdout and stderr. With --session, every request runs in the same
+// context instead, so globals defined by one run stay visible to the next.
+//
+// The vm context only keeps honest snippets apart; code can still reach the
+// host process through any function's constructor, so the pool serves one
+// run per worker (see pool_max_runs in services/code_execution_service.py).
+
+const readline = require('readline');
+const util = require('util');
+const vm = require('vm');
+
+const SCRIPT_NAME = 'main.js';
+// Thrown into the script once it has written more than its output cap
+const OUTPUT_LIMIT = new Error('Output limit exceeded');
+// Modules snippets may require. Anything reaching process, the filesystem or
+// child processes would let a snippet write to the protocol pipe.
+const ALLOWED_MODULES = new Set(['assert', 'buffer', 'events', 'path', 'querystring', 'string_decoder', 'url', 'util']);
+
+function sandboxRequire(name) {
+  const bare = String(name).replace(/^node:/, '');
+  if (!ALLOWED_MODULES.has(bare)) {
+    const err = new Error(`Cannot find module '${name}'`);
+    err.code = 'MODULE_NOT_FOUND';
+    // Start the stack at the snippet's call, not inside this worker
+    Error.captureStackTrace(err, sandboxRequire);
+    throw err;
+  }
+  return require(bare);
+}
+
+let current = null;
+let sessionContext = null;
+
+function formatError(err) {
+  if (err && typeof err.stack === 'string') {
+    let lines = err.stack.split('\n');
+    if (lines[0].startsWith(__filename)) {
+      // vm points errors thrown by the worker's own helpers at their source; drop that excerpt
+      lines = lines.slice(lines.indexOf('') + 1);
+    }
+    // Keep only the frames that point into the submitted script
+    const kept = lines.filter((line, i) => i === 0 || !line.trim().startsWith('at ') || line.includes(SCRIPT_NAME));
+    return kept.join('\n') + '\n';
+  }
+  return `Uncaught ${util.inspect(err)}\n`;
+}
+
+function emit(run, name, text) {
+  if (run.truncated) throw OUTPUT_LIMIT;
+  const size = Buffer.byteLength(text);
+  const room = run.maxBytes - run.bytes[name];
+  if (size > room) {
+    run[name].push(Buffer.from(text).subarray(0, room).toString());
+    run.truncated = true;
+    run.failed = true;
+    throw OUTPUT_LIMIT;
+  }
+  run.bytes[name] += size;
+  run[name].push(text);
+}
+
+// runOf() names the run that output and timers belong to: the one the
+// context was made for, or in a session whichever run is current.
+function createSandbox(runOf) {
+  const write = (name) => (...args) => emit(runOf(), name, util.format(...args) + '\n');
+  const stream = (name) => ({
+    write: (chunk) => {
+      emit(runOf(), name, String(chunk));
+      return true;
+    },
+  });
+  const track = (schedule, once) => (fn, ms, ...args) => {
+    const run = runOf();
+    const handle = schedule(() => {
+      if (once) run.timers.delete(handle);
+      try {
+        fn(...args);
+      } catch (err) {
+        if (err !== OUTPUT_LIMIT) run.stderr.push(formatError(err));
+        run.failed = true;
+      }
+    }, ms);
+    run.timers.add(handle);
+    return handle;
+  };
+  const untrack = (clear) => (handle) => {
+    runOf().timers.delete(handle);
+    clear(handle);
+  };
+
+  return vm.createContext({
+    console: {
+      log: write('stdout'),
+      info: write('stdout'),
+      debug: write('stdout'),
+      error: write('stderr'),
+      warn: write('stderr'),
+    },
+    require: sandboxRequire,
+    // Enough of process for snippets that write output directly
+    process: { stdout: stream('stdout'), stderr: stream('stderr'), argv: ['node', SCRIPT_NAME], env: {} },
+    setTimeout: track(setTimeout, true),
+    setInterval: track(setInterval, false),
+    clearTimeout: untrack(clearTimeout),
+    clearInterval: untrack(clearInterval),
+  });
+}
+
+function waitForTimers(run, deadline) {
+  return new Promise((resolve) => {
+    const poll = () => {
+      if (run.timers.size === 0 || run.failed) return resolve(true);
+      if (Date.now() >= deadline) return resolve(false);
+      setTimeout(poll, 1);
+    };
+    setImmediate(poll);
+  });
+}
+
+async function runSnippet(code, timeoutMs, maxBytes = Infinity) {
+  const run = {
+    stdout: [],
+    stderr: [],
+    bytes: { stdout: 0, stderr: 0 },
+    maxBytes,
+    truncated: false,
+    timers: new Set(),
+    failed: false,
+  };
+  const deadline = Date.now() + timeoutMs;
+  let timedOut = false;
+  current = run;
+
+  try {
+    const context = sessionContext || createSandbox(() => run);
+    vm.runInContext(code, context, { filename: SCRIPT_NAME, timeout: timeoutMs });
+    timedOut = !(await waitForTimers(run, deadline));
+  } catch (err) {
+    if (err && err.code === 'ERR_SCRIPT_EXECUTION_TIMEOUT') {
+      timedOut = true;
+    } else if (err !== OUTPUT_LIMIT) {
+      run.stderr.push(formatError(err));
+    }
+  } finally {
+    run.timers.forEach((handle) => clearTimeout(handle));
+    current = null;
+  }
+
+  return {
+    output: run.stdout.join(''),
+    error: run.stderr.join(''),
+    timed_out: timedOut,
+    truncated: run.truncated,
+  };
+}
+
+process.on('unhandledRejection', (reason) => {
+  if (current) {
+    if (reason !== OUTPUT_LIMIT) current.stderr.push(formatError(reason));
+    current.failed = true;
+  }
+});
+
+async function main() {
+  if (process.argv.includes('--session')) {
+    sessionContext = createSandbox(() => current);
+  }
+  const lines = readline.createInterface({ input: process.stdin, terminal: false });
+  for await (const line of lines) {
+    const request = JSON.parse(line);
+    const response = await runSnippet(request.code, request.timeout_ms || 5000, request.max_output_bytes || Infinity);
+    // Echoed so the pool can tell this response from one the snippet forged
+    response.request_id = request.request_id;
+    process.stdout.write(JSON.stringify(response) + '\n');
+  }
+}
+
+if (require.main === module) {
+  main();
+}
+
+module.exports = { runSnippet };
@@ -0,0 +1,44 @@
+"""Long-lived pylint worker.
+
+Keeps pylint and astroid's module cache loaded between requests. Each request
+carries source code and the pylint options to use; the worker lints it and
+answers with the same report text the pylint CLI would print.
+
+pylint only lints files, so the worker keeps one scratch file for the
+submission, on tmpfs (/dev/shm) where available, and overwrites it per run.
+The worker runs in the scratch directory and lints the file by its relative
+name, so messages read "submission.py:3:4:" exactly as with --from-stdin.
+"""
+import atexit
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import astroid
+from pylint.lint import Run
+from pylint.reporters.text import TextReporter
+
+from python_worker import serve
+
+
+SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="codesnap-pylint-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None))
+SUBMISSION = "submission.py"
+
+
+def lint_source(code: str, args: list[str]) -> str:
+    (SCRATCH_DIR / SUBMISSION).write_text(code, encoding="utf-8")
+    output = io.StringIO()
+    try:
+        Run(args + [SUBMISSION], reporter=TextReporter(output), exit=False)
+    finally:
+        # Stdlib modules stay cached; the submission itself must not
+        astroid.MANAGER.astroid_cache.pop(Path(SUBMISSION).stem, None)
+    return output.getvalue()
+
+
+if __name__ == "__main__":
+    atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+    os.chdir(SCRATCH_DIR)
+    serve(lambda request: {"output": lint_source(request["code"], request["args"])})
@@ -0,0 +1,61 @@
+"""Benchmark harness for Python submissions and reference solutions.
+
+Reads {"code", "function_name", "cases", "warmup", "runs", "marker"} as JSON
+on stdin. Calls the function on every case warmup times untimed, then times
+runs passes over all cases and prints a JSON trailer after marker with the
+median pass time, every pass time and the peak memory one pass allocates.
+Arguments are copied before each pass starts, so in-place mutation neither
+leaks between passes nor counts towards the time.
+"""
+import copy
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from python_harness import load_function
+
+
+def time_pass(function, cases: list) -> float:
+    calls = [copy.deepcopy(case["args"]) for case in cases]
+    started = time.perf_counter()
+    for args in calls:
+        function(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def peak_memory(function, cases: list) -> int:
+    calls = [copy.deepcopy(case["args"]) for case in cases]
+    tracemalloc.start()
+    try:
+        for args in calls:
+            function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(code: str, function_name: str, cases: list, warmup: int, runs: int) -> dict:
+    try:
+        function = load_function(code, function_name)
+        for _ in range(warmup):
+            time_pass(function, cases)
+        timings = [time_pass(function, cases) for _ in range(max(1, runs))]
+        peak = peak_memory(function, cases)
+    except Exception as e:
+        return {"error": type(e).__name__}
+    return {"median_ms": statistics.median(timings), "runs_ms": timings, "peak_memory_bytes": peak}
+
+
+def main():
+    request = json.loads(sys.stdin.read())
+    report = benchmark(
+        request["code"], request["function_name"], request["cases"], request.get("warmup", 1), request.get("runs", 5)
+    )
+    sys.stdout.write("\n" + request["marker"] + json.dumps(report) + "\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
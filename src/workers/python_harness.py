@@ -0,0 +1,189 @@
+"""Fixed grading harness for Python submissions.
+
+Reads {"code", "function_name", "test_cases", "marker", "options"} as JSON on
+stdin, runs the submission once, calls the function for every test case and
+prints a JSON trailer after marker with status, exception type and elapsed
+time for each case. Being a regular module, it is compiled once and cached as
+bytecode.
+
+Each case runs under its own deadline (options["case_timeout_ms"]) and all of
+them share options["budget_ms"]. A case past its deadline is recorded as
+"timeout"; with options["on_timeout"] == "abort", or once the budget is spent,
+the remaining cases are recorded as "skipped" without running.
+
+request["generators"] adds generated cases after test_cases: a list of
+{"spec", "path", "expected"}, where spec is a case_generators spec, path a
+file the server wrote its cases to (one JSON argument list per line; without
+it they are generated here) and expected the result digest of each case.
+Reading a case and digesting its result are the grader's work, so their time
+extends the budget rather than using it up. With request["mode"] ==
+"digests" the code is a reference solution and the trailer is {"digests"}:
+the result digest of every generated case, per spec, or None where the
+reference raised or timed out.
+"""
+import json
+import signal
+import sys
+import time
+from contextlib import contextmanager
+from case_generators import case_count, generate_cases, result_digest
+
+DEFAULT_OPTIONS = {"case_timeout_ms": 1000, "budget_ms": 4000, "on_timeout": "continue"}
+
+
+class CaseTimeout(BaseException):
+    """Raised into the submission when its deadline passes.
+
+    A BaseException, so `except Exception` in the submission does not stop it.
+    """
+
+
+def _expire(signum, frame):
+    raise CaseTimeout()
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Raises CaseTimeout in the block after seconds; a no-op where setitimer is missing."""
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+    previous = signal.signal(signal.SIGALRM, _expire)
+    # Keep firing every 50 ms in case the submission swallows the first one
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 0.001), 0.05)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def load_function(code: str, function_name: str):
+    namespace = {"__name__": "__main__"}
+    exec(compile(code, "<submission>", "exec"), namespace)
+    if function_name not in namespace:
+        raise NameError(f"name '{function_name}' is not defined")
+    return namespace[function_name]
+
+
+def run_case(function, test: dict, timeout: float) -> dict:
+    started = time.perf_counter()
+    elapsed_ms = None
+    try:
+        with deadline(timeout):
+            value = function(*test["args"])
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if "digest" in test:
+            passed = result_digest(value) == test["digest"]
+        else:
+            passed = value == test["expected"]
+        if passed:
+            result = {"status": "passed", "exception": None}
+        else:
+            result = {"status": "failed", "exception": None}
+    except CaseTimeout:
+        result = {"status": "timeout", "exception": None}
+    except Exception as e:
+        result = {"status": "error", "exception": type(e).__name__}
+    result["elapsed_ms"] = elapsed_ms if elapsed_ms is not None else (time.perf_counter() - started) * 1000
+    return result
+
+
+def case_args(entry: dict):
+    """Yields the argument list of each case of a generators entry, read from its file when it has one."""
+    if not entry.get("path"):
+        yield from generate_cases(entry["spec"])
+        return
+    with open(entry["path"], encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def iter_cases(test_cases: list, generated: list):
+    """Yields the static cases, then each generated one as it is needed."""
+    yield from test_cases
+    for entry in generated:
+        expected = entry["expected"]
+        for index, args in enumerate(case_args(entry)):
+            yield {"args": args, "digest": expected[index]}
+
+
+def run_tests(code: str, function_name: str, test_cases: list, options: dict | None = None,
+              generated: list | None = None) -> list:
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    generated = generated or []
+    total = len(test_cases) + case_count([entry["spec"] for entry in generated])
+    budget_ends = time.perf_counter() + options["budget_ms"] / 1000
+    try:
+        with deadline(options["budget_ms"] / 1000):
+            function = load_function(code, function_name)
+    except CaseTimeout:
+        # Module-level code used up the whole budget
+        return [{"status": "timeout", "exception": None, "elapsed_ms": 0.0} for _ in range(total)]
+    except Exception as e:
+        # The submission itself failed, so every case errors the same way
+        return [{"status": "error", "exception": type(e).__name__, "elapsed_ms": 0.0} for _ in range(total)]
+
+    results = []
+    cases = iter_cases(test_cases, generated)
+    while True:
+        loading = time.perf_counter()
+        test = next(cases, None)
+        if test is None:
+            break
+        budget_ends += time.perf_counter() - loading
+        remaining = budget_ends - time.perf_counter()
+        if remaining <= 0:
+            break
+        started = time.perf_counter()
+        result = run_case(function, test, min(options["case_timeout_ms"] / 1000, remaining))
+        # Only the call counts against the budget, not digesting its result
+        budget_ends += max(0.0, time.perf_counter() - started - result["elapsed_ms"] / 1000)
+        results.append(result)
+        if result["status"] == "timeout" and options["on_timeout"] == "abort":
+            break
+    # Cases left after stopping are not run, or generated
+    results.extend({"status": "skipped", "exception": None, "elapsed_ms": 0.0} for _ in range(total - len(results)))
+    return results
+
+
+def reference_digests(code: str, function_name: str, generated: list, options: dict | None = None) -> list:
+    """Result digest of every case of each generators entry, None where code raised or timed out."""
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    try:
+        with deadline(options["budget_ms"] / 1000):
+            function = load_function(code, function_name)
+    except (CaseTimeout, Exception):
+        return [[None] * case_count([entry["spec"]]) for entry in generated]
+
+    digests = []
+    for entry in generated:
+        spec_digests = []
+        for args in case_args(entry):
+            try:
+                with deadline(options["case_timeout_ms"] / 1000):
+                    value = function(*args)
+                spec_digests.append(result_digest(value))
+            except (CaseTimeout, Exception):
+                spec_digests.append(None)
+        digests.append(spec_digests)
+    return digests
+
+
+def main():
+    request = json.loads(sys.stdin.read())
+    generated = request.get("generators") or []
+    if request.get("mode") == "digests":
+        report = {"digests": reference_digests(
+            request["code"], request["function_name"], generated, request.get("options")
+        )}
+    else:
+        report = {"tests": run_tests(
+            request["code"], request["function_name"], request.get("test_cases") or [], request.get("options"), generated
+        )}
+    sys.stdout.write("\n" + request["marker"] + json.dumps(report) + "\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Long-lived Python worker for the execution pool.
+
+Reads one JSON request per line on stdin, runs the submitted code in a fresh
+namespace and writes one JSON line back with the captured stdout and stderr.
+With --session, every request runs in the same namespace instead, so names
+defined by one run stay visible to the next.
+
+Outside a session, each run happens in a child forked from the worker, as in
+python_zygote.py, so whatever it patches, imports or starts is gone before
+the next user's run.
+"""
+import builtins
+import io
+import json
+import os
+import random
+import select
+import signal
+import sys
+import time
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+
+
+class OutputLimitExceeded(BaseException):
+    """Raised into the running code once it has written more than its output cap.
+
+    A BaseException, so `except Exception` in the code being run does not stop it.
+    """
+
+
+class CappedWriter(io.StringIO):
+    """StringIO that keeps at most max_bytes of UTF-8 output."""
+
+    def __init__(self, max_bytes: int | None = None):
+        super().__init__()
+        self.remaining = max_bytes
+        self.overflowed = False
+
+    def write(self, text: str) -> int:
+        if self.remaining is None:
+            return super().write(text)
+        data = text.encode("utf-8", errors="replace")
+        if len(data) > self.remaining:
+            super().write(data[:self.remaining].decode("utf-8", errors="ignore"))
+            self.remaining = 0
+            self.overflowed = True
+            raise OutputLimitExceeded()
+        self.remaining -= len(data)
+        return super().write(text)
+
+
+# Loaded up front so forked runs do not pay for importing them
+PRELOADED_MODULES = (
+    "bisect", "collections", "datetime", "decimal", "fractions", "functools", "heapq", "itertools", "json",
+    "math", "random", "re", "statistics", "string", "time", "typing", "_strptime"
+)
+# Kept by serve so forked runs can close them, and never reach the pool's pipes
+_protocol_fds = []
+
+
+def new_namespace() -> dict:
+    # A copy, so rebinding a builtin from the code run does not outlive the run
+    return {"__name__": "__main__", "__builtins__": dict(vars(builtins))}
+
+
+def exit_error(status: int) -> str:
+    """Explains a forked run that died without reporting."""
+    if os.WIFSIGNALED(status) and hasattr(signal, "SIGXCPU") and os.WTERMSIG(status) == signal.SIGXCPU:
+        return "CPU time limit exceeded"
+    return "Execution crashed"
+
+
+def run_forked(request: dict) -> dict:
+    """run_snippet in a child forked from this worker, so nothing the run changes outlives it.
+
+    The child starts from the warm worker with its modules loaded and exits
+    after the run; the worker kills it once timeout_ms passes.
+    """
+    timeout = request.get("timeout_ms", 5000) / 1000
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            for fd in _protocol_fds:
+                os.close(fd)
+            # Children would otherwise share the worker's PRNG state
+            random.seed()
+            # Ends the run should the worker be killed before it can
+            signal.alarm(int(timeout) + 2)
+            dumps = json.dumps
+            result = run_snippet(request["code"], request.get("stdin", ""), request.get("max_output_bytes"))
+            with os.fdopen(write_fd, "w", encoding="utf-8") as channel:
+                channel.write(dumps(result))
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    deadline = time.monotonic() + timeout
+    chunks = []
+    timed_out = False
+    with os.fdopen(read_fd, "rb") as channel:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([channel], [], [], remaining)[0]:
+                timed_out = True
+                break
+            chunk = os.read(channel.fileno(), 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+    if timed_out:
+        return {"output": "", "error": "", "truncated": False, "timed_out": True}
+    try:
+        return json.loads(b"".join(chunks))
+    except ValueError:
+        return {"output": "", "error": exit_error(status), "truncated": False}
+
+
+def run_isolated(request: dict) -> dict:
+    """Runs a pooled request without letting it affect later ones."""
+    if hasattr(os, "fork"):
+        return run_forked(request)
+    # Without fork, the worker itself is not reused after the run
+    result = run_snippet(request["code"], request.get("stdin", ""), request.get("max_output_bytes"))
+    result["recycle"] = True
+    return result
+
+
+def run_snippet(code: str, stdin: str = "", max_output_bytes: int | None = None, namespace: dict | None = None) -> dict:
+    stdout = CappedWriter(max_output_bytes)
+    stderr = CappedWriter(max_output_bytes)
+    if namespace is None:
+        namespace = new_namespace()
+    sys.stdin = io.StringIO(stdin)
+
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            try:
+                exec(compile(code, "<string>", "exec"), namespace)
+            except OutputLimitExceeded:
+                pass
+            except SystemExit as e:
+                # Mirror the interpreter: only non-integer exit codes are printed
+                if e.code is not None and not isinstance(e.code, int):
+                    print(e.code, file=stderr)
+            except BaseException as e:
+                # Drop our own frame so the traceback starts at the student's code
+                traceback.print_exception(type(e), e, e.__traceback__.tb_next, file=stderr)
+        except OutputLimitExceeded:
+            # Reporting the error overflowed stderr
+            pass
+
+    return {"output": stdout.getvalue(), "error": stderr.getvalue(), "truncated": stdout.overflowed or stderr.overflowed}
+
+
+def serve(handler):
+    """Answers JSON requests from stdin with handler(request), one line each."""
+    # Keep private copies of the protocol pipes and point fds 0/1 at /dev/null,
+    # so the code being handled cannot read requests or corrupt responses.
+    channel_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    channel_out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    _protocol_fds[:] = [channel_in.fileno(), channel_out.fileno()]
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = io.StringIO()
+
+    # Bound once, so code that patches the json module cannot break the replies
+    loads, dumps = json.loads, json.dumps
+    for line in channel_in:
+        request = loads(line)
+        response = handler(request)
+        # Echoed so the pool can tell this response from one the handled code forged
+        response["request_id"] = request.get("request_id")
+        channel_out.write(dumps(response) + "\n")
+        channel_out.flush()
+
+
+if __name__ == "__main__":
+    if "--session" in sys.argv[1:]:
+        session = new_namespace()
+        serve(lambda request: run_snippet(
+            request["code"], request.get("stdin", ""), request.get("max_output_bytes"), namespace=session
+        ))
+    else:
+        for module_name in PRELOADED_MODULES:
+            __import__(module_name)
+        serve(run_isolated)
@@ -0,0 +1,102 @@
+"""Fork server ("zygote") for Python code execution.
+
+Imports the stdlib modules students commonly use once, then accepts
+connections on a Unix socket and forks a child per connection. The child
+reports its pid, reads one JSON request, runs it with run_snippet and writes
+one JSON response before exiting, so each run starts from a warm but
+pristine copy of this process.
+"""
+import json
+import os
+import random
+import resource
+import signal
+import socket
+import sys
+
+# Preloaded so forked children get them without paying the import cost
+import bisect  # noqa: F401
+import collections  # noqa: F401
+import dataclasses  # noqa: F401
+import datetime  # noqa: F401
+import decimal  # noqa: F401
+import fractions  # noqa: F401
+import functools  # noqa: F401
+import heapq  # noqa: F401
+import itertools  # noqa: F401
+import math  # noqa: F401
+import re  # noqa: F401
+import statistics  # noqa: F401
+import string  # noqa: F401
+import traceback  # noqa: F401
+import typing  # noqa: F401
+
+import python_harness  # noqa: F401
+from python_worker import run_snippet
+
+
+def apply_limits(limits: dict):
+    """Applies the rlimits the server resolved for this run (see services/resource_limits.py)."""
+    if limits.get("cpu_seconds"):
+        # Forked children start with zero CPU time, so the limit covers just this run
+        resource.setrlimit(resource.RLIMIT_CPU, (limits["cpu_seconds"], limits["cpu_seconds"] + 1))
+    if limits.get("memory_mb"):
+        memory = limits["memory_mb"] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    if limits.get("max_processes"):
+        resource.setrlimit(resource.RLIMIT_NPROC, (limits["max_processes"], limits["max_processes"]))
+
+
+def usage() -> dict:
+    used = resource.getrusage(resource.RUSAGE_SELF)
+    peak_rss = used.ru_maxrss if sys.platform == "darwin" else used.ru_maxrss * 1024
+    return {"peak_rss_bytes": peak_rss, "cpu_seconds": round(used.ru_utime + used.ru_stime, 4)}
+
+
+def handle_connection(conn: socket.socket):
+    # Children would otherwise share the zygote's PRNG state
+    random.seed()
+    with conn, conn.makefile("rw", encoding="utf-8") as channel:
+        channel.write(json.dumps({"pid": os.getpid()}) + "\n")
+        channel.flush()
+        line = channel.readline()
+        if not line:
+            return
+        request = json.loads(line)
+        if request.get("limits"):
+            apply_limits(request["limits"])
+        response = run_snippet(request["code"], request.get("stdin", ""), request.get("max_output_bytes"))
+        response["usage"] = usage()
+        channel.write(json.dumps(response) + "\n")
+        channel.flush()
+
+
+def serve(socket_path: str):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+
+    # Let the kernel reap finished children
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    print("ready", flush=True)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = open(os.devnull)
+
+    while True:
+        conn, _ = server.accept()
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            try:
+                handle_connection(conn)
+            finally:
+                os._exit(0)
+        conn.close()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1])
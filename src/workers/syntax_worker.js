@@ -0,0 +1,54 @@
+'use strict';
+// Long-lived JavaScript syntax checker.
+//
+// Reads one JSON request per line on stdin ({code}) and compiles it the way
+// `node -` compiles its input, as a script, without running anything. Answers
+// with one JSON line: {error: null} or {error} holding the same header node
+// prints for a SyntaxError (location, source line, caret and message).
+
+const readline = require('readline');
+const vm = require('vm');
+
+const SCRIPT_NAME = 'main.js';
+// Errors on which node retries its input as an ES module (import, export,
+// import.meta, top-level await); the real run decides those
+const ESM_SYNTAX_ERRORS = [
+  'Cannot use import statement outside a module',
+  "Unexpected token 'export'",
+  "Cannot use 'import.meta' outside a module",
+  'await is only valid in async functions and the top level bodies of modules',
+];
+
+function checkSyntax(code) {
+  try {
+    new vm.Script(code, { filename: SCRIPT_NAME });
+    return null;
+  } catch (err) {
+    if (!(err instanceof SyntaxError)) throw err;
+    if (ESM_SYNTAX_ERRORS.includes(err.message)) return null;
+    // Drop the stack frames, which point into node's own vm module
+    const lines = err.stack.split('\n');
+    return lines.filter((line) => !line.trim().startsWith('at ')).join('\n').trim();
+  }
+}
+
+async function main() {
+  const lines = readline.createInterface({ input: process.stdin, terminal: false });
+  for await (const line of lines) {
+    const request = JSON.parse(line);
+    let response;
+    try {
+      response = { error: checkSyntax(request.code) };
+    } catch (err) {
+      response = { error: null, failed: String(err && err.message ? err.message : err) };
+    }
+    response.request_id = request.request_id;
+    process.stdout.write(JSON.stringify(response) + '\n');
+  }
+}
+
+if (require.main === module) {
+  main();
+}
+
+module.exports = { checkSyntax };
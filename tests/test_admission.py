@@ -0,0 +1,131 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import threading
+import time
+import pytest
+from services.admission import AdmissionController, AdmissionRejected, PRIORITY_GRADING, PRIORITY_INTERACTIVE
+
+
+class TestAdmissionController:
+    def test_admits_up_to_limit(self):
+        controller = AdmissionController(max_in_flight=2, max_queued=0, max_wait=0.1)
+        controller.acquire()
+        controller.acquire()
+
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.acquire()
+        assert exc.value.retry_after == 1
+
+    def test_release_frees_slot(self):
+        controller = AdmissionController(max_in_flight=1, max_queued=0, max_wait=0.1)
+        with controller.slot():
+            pass
+        with controller.slot():
+            pass
+
+    def test_queued_request_gets_released_slot(self):
+        controller = AdmissionController(max_in_flight=1, max_queued=1, max_wait=5)
+        controller.acquire()
+        admitted = threading.Event()
+
+        def wait_for_slot():
+            controller.acquire()
+            admitted.set()
+
+        waiter = threading.Thread(target=wait_for_slot)
+        waiter.start()
+        time.sleep(0.05)
+        assert not admitted.is_set()
+
+        controller.release()
+        waiter.join(timeout=5)
+        assert admitted.is_set()
+
+    def test_queue_wait_times_out(self):
+        controller = AdmissionController(max_in_flight=1, max_queued=1, max_wait=0.2)
+        controller.acquire()
+
+        started = time.monotonic()
+        with pytest.raises(AdmissionRejected):
+            controller.acquire()
+        assert time.monotonic() - started >= 0.2
+
+    def test_full_queue_fails_fast(self):
+        controller = AdmissionController(max_in_flight=1, max_queued=1, max_wait=5)
+        controller.acquire()
+        waiter = threading.Thread(target=controller.acquire, daemon=True)
+        waiter.start()
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        with pytest.raises(AdmissionRejected):
+            controller.acquire()
+        assert time.monotonic() - started < 1
+        controller.release()
+        waiter.join(timeout=5)
+
+
+class TestFairShare:
+    def start_waiter(self, controller, order, user_key, priority=PRIORITY_INTERACTIVE):
+        def wait_for_slot():
+            controller.acquire(user_key, priority)
+            order.append(user_key)
+
+        thread = threading.Thread(target=wait_for_slot, daemon=True)
+        thread.start()
+        time.sleep(0.05)
+        return thread
+
+    def release_all(self, controller, order, count):
+        for expected in range(1, count + 1):
+            controller.release()
+            deadline = time.monotonic() + 5
+            while len(order) < expected and time.monotonic() < deadline:
+                time.sleep(0.005)
+
+    def test_round_robin_between_users(self):
+        controller = AdmissionController(max_in_flight=1, max_queued=10, max_wait=5)
+        controller.acquire("busy")
+        order = []
+        for user_key in ["alice", "alice", "alice", "bob", "carol"]:
+            self.start_waiter(controller, order, user_key)
+
+        self.release_all(controller, order, 5)
+
+        assert order == ["alice", "bob", "carol", "alice", "alice"]
+
+    def test_grading_goes_first(self):
+        controller = AdmissionController(max_in_flight=1, max_queued=10, max_wait=5)
+        controller.acquire("busy")
+        order = []
+        self.start_waiter(controller, order, "alice")
+        self.start_waiter(controller, order, "bob", PRIORITY_GRADING)
+
+        self.release_all(controller, order, 2)
+
+        assert order == ["bob", "alice"]
+
+    def test_grading_is_not_bounded_by_interactive_queue(self):
+        controller = AdmissionController(max_in_flight=1, max_queued=0, max_wait=0.1)
+        controller.acquire("busy")
+        order = []
+        self.start_waiter(controller, order, "bob", PRIORITY_GRADING)
+
+        with pytest.raises(AdmissionRejected):
+            controller.acquire("alice")
+        self.release_all(controller, order, 1)
+
+        assert order == ["bob"]
+
+    def test_timed_out_waiter_leaves_queue(self):
+        controller = AdmissionController(max_in_flight=1, max_queued=10, max_wait=0.1)
+        controller.acquire("busy")
+        with pytest.raises(AdmissionRejected):
+            controller.acquire("alice")
+
+        controller.release()
+        with controller.slot("bob"):
+            pass
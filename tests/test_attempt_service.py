@@ -1,24 +1,47 @@
+import shutil
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# The harnesses import their sibling modules the way they are run, from the workers directory
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "workers"))
 import pytest
 import json
+import os
+import subprocess
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch, MagicMock
 from services.attempt_service import (
     create_attempt,
+    store_attempt,
+    grade_attempt_by_id,
     grade_submission,
-    run_temp_file,
-    extract_test_results,
+    run_with_input,
+    extract_test_report,
+    summarize_test_results,
+    build_harness_input,
+    harness_options,
+    report_complete,
+    split_test_cases,
+    run_test_shards,
     calculate_stars,
     grade_python_attempt,
     run_pylint,
     grade_javascript_attempt,
     run_eslint
 )
+from config import Config
 from models.exercise import Exercise
 from models.attempt import Attempt
 
+MARKER = "__CODESNAP_RESULTS_test__"
+
+
+def harness_output(*statuses):
+    tests = [{"status": status, "exception": None, "elapsed_ms": 0.1} for status in statuses]
+    return "student output\n" + MARKER + json.dumps({"tests": tests})
+
+
 class TestAttemptService:
     def test_create_attempt_exercise_not_found(self, test_db):
         with pytest.raises(ValueError, match="Exercise with id 99999 not found"):
@@ -36,6 +59,69 @@ class TestAttemptService:
         assert attempt.score == 8
         assert attempt.stars == 2
 
+    def test_store_attempt_is_pending(self, test_db, sample_user, sample_exercise):
+        attempt = store_attempt(test_db, sample_user.id, sample_exercise.id, "def test(): pass")
+
+        assert attempt.id is not None
+        assert attempt.status == "pending"
+        assert attempt.graded_at is None
+
+    @patch('services.attempt_service.grade_submission')
+    def test_grade_attempt_by_id_success(self, mock_grade, test_db, sample_user, sample_exercise):
+        mock_grade.return_value = {"style_score": 7, "stars": 2}
+        attempt = store_attempt(test_db, sample_user.id, sample_exercise.id, "def test(): pass")
+
+        status = grade_attempt_by_id(attempt.id)
+
+        test_db.refresh(attempt)
+        assert status == "graded"
+        assert attempt.status == "graded"
+        assert attempt.score == 7
+        assert attempt.stars == 2
+        assert attempt.graded_at is not None
+
+    @patch('services.attempt_service.grade_submission')
+    def test_grade_attempt_by_id_failure(self, mock_grade, test_db, sample_user, sample_exercise):
+        mock_grade.side_effect = ValueError("Unsupported language: ruby")
+        attempt = store_attempt(test_db, sample_user.id, sample_exercise.id, "code")
+
+        status = grade_attempt_by_id(attempt.id)
+
+        test_db.refresh(attempt)
+        assert status == "failed"
+        assert attempt.status == "failed"
+
+    def test_grade_attempt_by_id_missing(self, test_db):
+        assert grade_attempt_by_id(99999) == "failed"
+
+    @patch('services.attempt_service.grade_submission')
+    def test_grade_attempt_by_id_grades_once(self, mock_grade, test_db, sample_user, sample_exercise):
+        mock_grade.return_value = {"style_score": 7, "stars": 2}
+        attempt = store_attempt(test_db, sample_user.id, sample_exercise.id, "def test(): pass")
+
+        assert grade_attempt_by_id(attempt.id) == "graded"
+        assert grade_attempt_by_id(attempt.id) == "skipped"
+        mock_grade.assert_called_once()
+
+    @patch('services.attempt_service.grade_submission')
+    def test_grade_attempt_by_id_skips_attempt_claimed_elsewhere(self, mock_grade, test_db, sample_user,
+                                                                 sample_exercise):
+        attempt = store_attempt(test_db, sample_user.id, sample_exercise.id, "def test(): pass")
+        attempt.claimed_at = datetime.now(timezone.utc)
+        test_db.commit()
+
+        assert grade_attempt_by_id(attempt.id) == "skipped"
+        mock_grade.assert_not_called()
+
+    @patch('services.attempt_service.grade_submission')
+    def test_grade_attempt_by_id_takes_over_stale_claim(self, mock_grade, test_db, sample_user, sample_exercise):
+        mock_grade.return_value = {"style_score": 7, "stars": 2}
+        attempt = store_attempt(test_db, sample_user.id, sample_exercise.id, "def test(): pass")
+        attempt.claimed_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        test_db.commit()
+
+        assert grade_attempt_by_id(attempt.id) == "graded"
+
     def test_grade_submission_python(self, test_db, sample_exercise):
         sample_exercise.language = "python"
         
@@ -64,33 +150,66 @@ class TestAttemptService:
         with pytest.raises(ValueError, match="Unsupported language: ruby"):
             grade_submission("code", sample_exercise)
 
-    def test_extract_test_results_success(self):
-        output = "Test 1: PASSED\nTest 2: FAILED\nRESULTS: 3/5"
-        passed, total = extract_test_results(output, 5)
-        
+    def test_extract_test_report_success(self):
+        tests = [{"status": "passed", "exception": None, "elapsed_ms": 0.1}] * 3 + \
+                [{"status": "failed", "exception": None, "elapsed_ms": 0.1},
+                 {"status": "error", "exception": "TypeError", "elapsed_ms": 0.1}]
+        output = "student output\n" + MARKER + json.dumps({"tests": tests})
+        results = extract_test_report(output, MARKER)
+        passed, total = summarize_test_results(results, "[]")
+
         assert passed == 3
         assert total == 5
+        assert results[4]["exception"] == "TypeError"
 
-    def test_extract_test_results_no_results(self):
-        output = "Some other output"
-        passed, total = extract_test_results(output, 5)
-        
-        assert passed == 0
-        assert total == 5
+    def test_extract_test_report_ignores_student_results_lines(self):
+        output = "RESULTS: 5/5\n" + MARKER + json.dumps({"tests": [{"status": "failed"}]})
+        passed, total = summarize_test_results(extract_test_report(output, MARKER), "[]")
 
-    def test_extract_test_results_empty_output(self):
-        passed, total = extract_test_results("", 5)
-        
         assert passed == 0
-        assert total == 5
+        assert total == 1
+
+    def test_extract_test_report_uses_last_trailer(self):
+        fake = MARKER + json.dumps({"tests": [{"status": "passed"}]})
+        real = MARKER + json.dumps({"tests": [{"status": "failed"}]})
+        results = extract_test_report(fake + "\n" + real + "\nprinted at exit\n", MARKER)
+
+        assert results == [{"status": "failed"}]
+
+    def test_extract_test_report_no_trailer(self):
+        assert extract_test_report("Some other output", MARKER) is None
+
+    def test_extract_test_report_empty_output(self):
+        assert extract_test_report("", MARKER) is None
+
+    def test_extract_test_report_invalid_format(self):
+        assert extract_test_report(MARKER + "invalid", MARKER) is None
+
+    def test_summarize_test_results_without_report_fails_every_case(self):
+        passed, total = summarize_test_results(None, json.dumps([{"args": [], "expected": 1}] * 5))
 
-    def test_extract_test_results_invalid_format(self):
-        output = "RESULTS: invalid"
-        passed, total = extract_test_results(output, 5)
-        
         assert passed == 0
         assert total == 5
 
+    def test_build_harness_input_embeds_test_cases_verbatim(self):
+        test_cases_json = '[{"args": [1, 2],   "expected": 3}]'
+        harness_input = build_harness_input("def add(a, b): return a + b", "add", test_cases_json, MARKER)
+
+        assert harness_input.endswith(test_cases_json + "}")
+        request = json.loads(harness_input)
+        assert request["function_name"] == "add"
+        assert request["marker"] == MARKER
+        assert request["test_cases"] == [{"args": [1, 2], "expected": 3}]
+
+    def test_harness_budget_fits_cpu_limit(self):
+        assert harness_options({"cpu_seconds": 2})["budget_ms"] == 1600
+        assert harness_options({"cpu_seconds": 0})["budget_ms"] == 4000
+
+    def test_timed_out_reports_are_incomplete(self):
+        assert report_complete([{"status": "passed"}, {"status": "failed"}])
+        assert not report_complete([{"status": "passed"}, {"status": "timeout"}])
+        assert not report_complete(None)
+
     def test_calculate_stars_all_tests_failed(self):
         stars = calculate_stars(0.5, 10.0)
         assert stars == 0
@@ -107,38 +226,41 @@ class TestAttemptService:
         stars = calculate_stars(1.0, 5.0)
         assert stars == 1
 
-    @patch('subprocess.run')
-    def test_run_temp_file_success(self, mock_run):
+    @patch('services.attempt_service.run_bounded')
+    def test_run_with_input_success(self, mock_run):
         mock_run.return_value = MagicMock(
             stdout="output",
             stderr="",
             returncode=0
         )
-        
-        result = run_temp_file(["python", "temp.py"], "print('test')", ".py")
-        
+
+        result = run_with_input(["python", "-"], "print('test')")
+
         assert result is not None
         assert result.stdout == "output"
+        assert mock_run.call_args[0][0] == ["python", "-"]
+        assert mock_run.call_args[1]["input"] == "print('test')"
 
-    @patch('subprocess.run')
-    def test_run_temp_file_timeout(self, mock_run):
+    @patch('services.attempt_service.run_bounded')
+    def test_run_with_input_timeout(self, mock_run):
         import subprocess
         mock_run.side_effect = subprocess.TimeoutExpired("cmd", 5)
-        
-        result = run_temp_file(["python", "temp.py"], "while True: pass", ".py")
+
+        result = run_with_input(["python", "-"], "while True: pass")
         assert result is None
 
-    @patch('subprocess.run')
-    def test_run_temp_file_exception(self, mock_run):
+    @patch('services.attempt_service.run_bounded')
+    def test_run_with_input_exception(self, mock_run):
         mock_run.side_effect = Exception("Test error")
-        
-        result = run_temp_file(["python", "temp.py"], "code", ".py")
+
+        result = run_with_input(["python", "-"], "code")
         assert result is None
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.new_results_marker', new=lambda: MARKER)
+    @patch('services.attempt_service.run_python_source')
     @patch('services.attempt_service.run_pylint')
     def test_grade_python_attempt_all_pass(self, mock_pylint, mock_run):
-        mock_run.return_value = MagicMock(stdout="Test 1: PASSED\nRESULTS: 1/1")
+        mock_run.return_value = harness_output("passed")
         mock_pylint.return_value = (10.0, "Perfect!")
         
         test_cases = [{"args": [1, 2], "expected": 3}]
@@ -150,10 +272,11 @@ class TestAttemptService:
         assert result["style_score"] == 10.0
         assert result["stars"] == 3
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.new_results_marker', new=lambda: MARKER)
+    @patch('services.attempt_service.run_python_source')
     @patch('services.attempt_service.run_pylint')
     def test_grade_python_attempt_partial_pass(self, mock_pylint, mock_run):
-        mock_run.return_value = MagicMock(stdout="Test 1: PASSED\nTest 2: FAILED\nRESULTS: 1/2")
+        mock_run.return_value = harness_output("passed", "failed")
         mock_pylint.return_value = (8.0, "Good")
         
         test_cases = [{"args": [1], "expected": 1}, {"args": [2], "expected": 2}]
@@ -164,10 +287,11 @@ class TestAttemptService:
         assert result["test_pass_rate"] == 0.5
         assert result["stars"] == 0
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.new_results_marker', new=lambda: MARKER)
+    @patch('services.attempt_service.run_python_source')
     @patch('services.attempt_service.run_pylint')
     def test_grade_python_attempt_no_output(self, mock_pylint, mock_run):
-        mock_run.return_value = None
+        mock_run.return_value = ""
         mock_pylint.return_value = (0.0, "")
         
         test_cases = [{"args": [], "expected": 1}]
@@ -176,7 +300,7 @@ class TestAttemptService:
         assert result["tests_passed"] == 0
         assert result["stars"] == 0
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.run_with_input')
     def test_run_pylint_success(self, mock_run):
         mock_run.return_value = MagicMock(stdout="Your code has been rated at 8.5/10")
         
@@ -184,8 +308,13 @@ class TestAttemptService:
         
         assert score == 8.5
         assert "8.5/10" in feedback
+        command = mock_run.call_args[0][0]
+        assert command[-2:] == ["--from-stdin", "submission.py"]
+        assert mock_run.call_args[0][1] == "def test(): pass"
+        # The linter is not held to the submission's rlimits
+        assert mock_run.call_args.kwargs.get("preexec_fn") is None
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.run_with_input')
     def test_run_pylint_no_score(self, mock_run):
         mock_run.return_value = MagicMock(stdout="No score found")
         
@@ -193,7 +322,7 @@ class TestAttemptService:
         
         assert score == 0.0
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.run_with_input')
     def test_run_pylint_none_result(self, mock_run):
         mock_run.return_value = None
         
@@ -202,10 +331,75 @@ class TestAttemptService:
         assert score == 0.0
         assert feedback == ""
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.get_pylint_pool')
+    @patch('services.attempt_service.Config')
+    def test_run_pylint_worker_backend(self, mock_config, mock_get_pool):
+        mock_config.PYLINT_BACKEND = "worker"
+        mock_get_pool.return_value.run.return_value = {"output": "Your code has been rated at 9.25/10"}
+
+        score, feedback = run_pylint("def test(): pass")
+
+        assert score == 9.25
+        assert "9.25/10" in feedback
+        payload = mock_get_pool.return_value.run.call_args[0][0]
+        assert payload["code"] == "def test(): pass"
+        assert "--max-line-length=120" in payload["args"]
+
+    @patch('services.attempt_service.get_pylint_pool')
+    @patch('services.attempt_service.Config')
+    def test_run_pylint_worker_failure(self, mock_config, mock_get_pool):
+        mock_config.PYLINT_BACKEND = "worker"
+        mock_get_pool.return_value.run.side_effect = TimeoutError()
+
+        score, feedback = run_pylint("code")
+
+        assert score == 0.0
+        assert feedback == ""
+
+    def test_pylint_worker_matches_cli_report(self):
+        pytest.importorskip("pylint")
+        from services.worker_pool import WorkerPool
+        from services.attempt_service import PYLINT_ARGS, PYLINT_WORKER
+
+        pool = WorkerPool("test-pylint", [sys.executable, "-u", str(PYLINT_WORKER)], size=1, max_runs=10)
+        try:
+            code = "import os\ndef f(x):\n  return x\n"
+            first = pool.run({"code": code, "args": PYLINT_ARGS}, timeout=30)["output"]
+            second = pool.run({"code": code, "args": PYLINT_ARGS}, timeout=30)["output"]
+        finally:
+            pool.shutdown()
+
+        assert "Unused import os" in first
+        assert "Your code has been rated at" in first
+        assert "previous run" not in second
+        assert first.splitlines()[-2] == second.splitlines()[-2]
+
+    def test_pylint_worker_output_is_byte_for_byte_the_cli_output(self, tmp_path):
+        pytest.importorskip("pylint")
+        from services.worker_pool import WorkerPool
+        from services.attempt_service import PYLINT_ARGS, PYLINT_WORKER
+
+        code = "import os\ndef f(x):\n  if x:\n    return x\n"
+        cli = subprocess.run(
+            [sys.executable, "-m", "pylint"] + PYLINT_ARGS + ["--from-stdin", "submission.py"], input=code,
+            capture_output=True, text=True, cwd=tmp_path, timeout=60,
+            # No stats from earlier runs, which would add "previous run" to the score line
+            env=dict(os.environ, PYLINTHOME=str(tmp_path))
+        ).stdout
+        pool = WorkerPool("test-pylint", [sys.executable, "-u", str(PYLINT_WORKER)], size=1, max_runs=10)
+        try:
+            worker = pool.run({"code": code, "args": PYLINT_ARGS}, timeout=30)["output"]
+        finally:
+            pool.shutdown()
+
+        assert "submission.py:1:0: W0611" in cli
+        assert worker == cli
+
+    @patch('services.attempt_service.new_results_marker', new=lambda: MARKER)
+    @patch('services.attempt_service.run_with_input')
     @patch('services.attempt_service.run_eslint')
     def test_grade_javascript_attempt_all_pass(self, mock_eslint, mock_run):
-        mock_run.return_value = MagicMock(stdout="Test 1: PASSED\nRESULTS: 1/1")
+        mock_run.return_value = MagicMock(stdout=harness_output("passed"), usage=None)
         mock_eslint.return_value = (10.0, "{}")
         
         test_cases = [{"args": [1, 2], "expected": 3}]
@@ -216,10 +410,11 @@ class TestAttemptService:
         assert result["test_pass_rate"] == 1.0
         assert result["stars"] == 3
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.new_results_marker', new=lambda: MARKER)
+    @patch('services.attempt_service.run_with_input')
     @patch('services.attempt_service.run_eslint')
     def test_grade_javascript_attempt_partial_pass(self, mock_eslint, mock_run):
-        mock_run.return_value = MagicMock(stdout="Test 1: PASSED\nTest 2: FAILED\nRESULTS: 1/2")
+        mock_run.return_value = MagicMock(stdout=harness_output("passed", "failed"), usage=None)
         mock_eslint.return_value = (7.0, "{}")
         
         test_cases = [{"args": [1], "expected": 1}, {"args": [2], "expected": 2}]
@@ -229,7 +424,7 @@ class TestAttemptService:
         assert result["tests_total"] == 2
         assert result["stars"] == 0
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.run_with_input')
     def test_run_eslint_success(self, mock_run):
         eslint_output = json.dumps([{
             "messages": [
@@ -243,8 +438,9 @@ class TestAttemptService:
         
         assert score == 8.0
         assert feedback == eslint_output
+        assert mock_run.call_args.kwargs.get("preexec_fn") is None
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.run_with_input')
     def test_run_eslint_many_errors(self, mock_run):
         """Test running eslint with many errors."""
         eslint_output = json.dumps([{
@@ -256,7 +452,7 @@ class TestAttemptService:
         
         assert score == 0.0
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.run_with_input')
     def test_run_eslint_invalid_json(self, mock_run):
         """Test running eslint with invalid JSON."""
         mock_run.return_value = MagicMock(stdout="Invalid JSON")
@@ -265,11 +461,263 @@ class TestAttemptService:
         
         assert score == 0.0
 
-    @patch('services.attempt_service.run_temp_file')
+    @patch('services.attempt_service.run_with_input')
     def test_run_eslint_none_result(self, mock_run):
         mock_run.return_value = None
         
         score, feedback = run_eslint("code")
         
         assert score == 0.0
-        assert feedback == ""
\ No newline at end of file
+        assert feedback == ""
+    @patch('services.attempt_service.run_with_input')
+    def test_run_eslint_cli_rule_overrides(self, mock_run):
+        mock_run.return_value = MagicMock(stdout=json.dumps([{"messages": []}]))
+
+        run_eslint("function test() {}")
+
+        command = mock_run.call_args[0][0]
+        assert command[:5] == ["npx", "eslint", "--format", "json", "--no-eslintrc"]
+        assert command[5:8] == ["--stdin", "--stdin-filename", "submission.js"]
+        assert command[8:] == ["--rule", "semi: off", "--rule", "quotes: off"]
+        assert mock_run.call_args[0][1] == "function test() {}"
+
+    @patch('services.attempt_service.get_eslint_pool')
+    @patch('services.attempt_service.Config')
+    def test_run_eslint_daemon_backend(self, mock_config, mock_get_pool):
+        mock_config.ESLINT_BACKEND = "daemon"
+        eslint_output = json.dumps([{"messages": [{"severity": 2}, {"severity": 1}]}])
+        mock_get_pool.return_value.run.return_value = {"output": eslint_output}
+
+        score, feedback = run_eslint("function test() {}")
+
+        assert score == 8.0
+        assert feedback == eslint_output
+        payload = mock_get_pool.return_value.run.call_args[0][0]
+        assert payload["rules"] == {"semi": "off", "quotes": "off"}
+
+    @patch('services.attempt_service.get_eslint_pool')
+    @patch('services.attempt_service.Config')
+    def test_run_eslint_daemon_failure_uses_fallback_score(self, mock_config, mock_get_pool):
+        mock_config.ESLINT_BACKEND = "daemon"
+        mock_get_pool.return_value.run.side_effect = TimeoutError()
+
+        score, feedback = run_eslint("function test() {}")
+
+        assert score == 0.0
+        assert feedback == ""
+
+    def test_grading_phases_run_concurrently(self):
+        import threading
+        from services.attempt_service import run_grading_phases
+
+        both_started = threading.Barrier(2, timeout=5)
+
+        def run_tests():
+            both_started.wait()
+            return "RESULTS: 1/1"
+
+        def run_lint():
+            both_started.wait()
+            return (9.0, "feedback")
+
+        output, lint = run_grading_phases("python", run_tests, run_lint)
+
+        assert output == "RESULTS: 1/1"
+        assert lint == (9.0, "feedback")
+
+    def test_grading_phase_errors_propagate(self):
+        from services.attempt_service import run_grading_phases
+
+        def run_lint():
+            raise RuntimeError("linter crashed")
+
+        with pytest.raises(RuntimeError, match="linter crashed"):
+            run_grading_phases("python", lambda: "", run_lint)
+
+    @patch('services.attempt_service.run_pylint')
+    def test_grade_python_attempt_reports_per_test_results(self, mock_pylint):
+        mock_pylint.return_value = (10.0, "Perfect!")
+        code = "def add(a, b):\n    print('RESULTS: 99/99')\n    return a + b\n"
+        test_cases = [
+            {"args": [1, 2], "expected": 3},
+            {"args": [2, 2], "expected": 5},
+            {"args": ["a", 1], "expected": 0}
+        ]
+
+        result = grade_python_attempt(code, "add", json.dumps(test_cases))
+
+        assert result["tests_passed"] == 1
+        assert result["tests_total"] == 3
+        assert [t["status"] for t in result["test_results"]] == ["passed", "failed", "error"]
+        assert result["test_results"][2]["exception"] == "TypeError"
+        assert all(t["elapsed_ms"] >= 0 for t in result["test_results"])
+
+    @patch('services.attempt_service.run_pylint')
+    def test_grade_python_attempt_submission_fails_to_load(self, mock_pylint):
+        mock_pylint.return_value = (10.0, "Perfect!")
+        test_cases = [{"args": [1], "expected": 1}, {"args": [2], "expected": 2}]
+
+        result = grade_python_attempt("def broken(:\n", "broken", json.dumps(test_cases))
+
+        assert result["tests_passed"] == 0
+        assert result["tests_total"] == 2
+        assert [t["exception"] for t in result["test_results"]] == ["SyntaxError", "SyntaxError"]
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+    @patch('services.attempt_service.run_eslint')
+    def test_grade_javascript_attempt_reports_per_test_results(self, mock_eslint):
+        mock_eslint.return_value = (10.0, "[]")
+        code = "function add(a, b) {\n  console.log('RESULTS: 99/99');\n  return a + b;\n}\n"
+        test_cases = [
+            {"args": [1, 2], "expected": 3},
+            {"args": [[1], [2]], "expected": [1, 2]},
+            {"args": [2, 2], "expected": 5}
+        ]
+
+        result = grade_javascript_attempt(code, "add", json.dumps(test_cases))
+
+        assert result["tests_passed"] == 1
+        assert result["tests_total"] == 3
+        assert [t["status"] for t in result["test_results"]] == ["passed", "failed", "failed"]
+
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_grade_submission_passes_exercise_limits(self, mock_grade, test_db, sample_exercise):
+        mock_grade.return_value = {"complete": False}
+        sample_exercise.resource_limits = {"memory_mb": 512}
+
+        grade_submission("def test(): pass", sample_exercise)
+
+        assert mock_grade.call_args[0][3] == {"memory_mb": 512}
+
+    @patch('services.attempt_service.get_admission_controller')
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_grade_submission_takes_grading_slot(self, mock_grade, mock_controller, test_db, sample_exercise):
+        mock_grade.return_value = {"complete": False}
+
+        grade_submission("def test(): pass", sample_exercise, "kc-1")
+
+        mock_controller.return_value.slot.assert_called_once_with("kc-1", "grading")
+
+
+LOOPING_PYTHON = "def f(n):\n    while n < 0:\n        pass\n    return n * 2\n"
+LOOPING_JAVASCRIPT = "function f(n) { while (n < 0) {} return n * 2; }"
+CASES = [{"args": [1], "expected": 2}, {"args": [-1], "expected": 0}, {"args": [3], "expected": 6}]
+
+
+def run_js_harness(options):
+    import subprocess
+    from services.attempt_service import JS_HARNESS
+    harness_input = build_harness_input(LOOPING_JAVASCRIPT, "f", json.dumps(CASES), MARKER, options)
+    result = subprocess.run(["node", str(JS_HARNESS)], input=harness_input, capture_output=True, text=True, timeout=10)
+    return extract_test_report(result.stdout, MARKER)
+
+
+class TestHarnessDeadlines:
+    def test_python_timeout_keeps_other_cases(self):
+        from python_harness import run_tests
+        options = {"case_timeout_ms": 200, "budget_ms": 2000, "on_timeout": "continue"}
+
+        results = run_tests(LOOPING_PYTHON, "f", CASES, options)
+
+        assert [r["status"] for r in results] == ["passed", "timeout", "passed"]
+        assert results[1]["elapsed_ms"] >= 200
+
+    def test_python_abort_policy_skips_the_rest(self):
+        from python_harness import run_tests
+        options = {"case_timeout_ms": 200, "budget_ms": 2000, "on_timeout": "abort"}
+
+        results = run_tests(LOOPING_PYTHON, "f", CASES, options)
+
+        assert [r["status"] for r in results] == ["passed", "timeout", "skipped"]
+
+    def test_python_budget_skips_cases_once_spent(self):
+        from python_harness import run_tests
+        options = {"case_timeout_ms": 1000, "budget_ms": 300, "on_timeout": "continue"}
+
+        results = run_tests(LOOPING_PYTHON, "f", CASES, options)
+
+        assert [r["status"] for r in results] == ["passed", "timeout", "skipped"]
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+    def test_javascript_timeout_keeps_other_cases(self):
+        results = run_js_harness({"case_timeout_ms": 200, "budget_ms": 2000, "on_timeout": "continue"})
+
+        assert [r["status"] for r in results] == ["passed", "timeout", "passed"]
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+    def test_javascript_abort_policy_skips_the_rest(self):
+        results = run_js_harness({"case_timeout_ms": 200, "budget_ms": 2000, "on_timeout": "abort"})
+
+        assert [r["status"] for r in results] == ["passed", "timeout", "skipped"]
+
+
+class TestShardedGrading:
+    def test_split_keeps_order_and_covers_every_case(self):
+        cases = [{"args": [i], "expected": i} for i in range(7)]
+
+        chunks = [json.loads(chunk) for chunk in split_test_cases(json.dumps(cases), 3)]
+
+        assert len(chunks) == 3
+        assert [case for chunk in chunks for case in chunk] == cases
+
+    def test_more_shards_than_cases(self):
+        assert len(split_test_cases(json.dumps(CASES), 10)) == len(CASES)
+        assert split_test_cases("[]", 4) == ["[]"]
+
+    def test_failed_shard_fails_the_report(self):
+        def run_shard(shard_json, generated=None):
+            statuses = ["passed"] * len(json.loads(shard_json))
+            return "" if json.loads(shard_json)[0]["args"] == [3] else harness_output(*statuses)
+
+        assert run_test_shards(run_shard, json.dumps(CASES), 3, MARKER) is None
+
+    @patch('services.attempt_service.run_pylint')
+    def test_sharded_run_matches_sequential_run(self, mock_pylint):
+        mock_pylint.return_value = (10.0, "ok")
+        code = "def square(n):\n    if n == 4:\n        raise ValueError(n)\n    return n * n if n != 6 else 0\n"
+        cases = json.dumps([{"args": [i], "expected": i * i} for i in range(9)])
+
+        sequential = grade_python_attempt(code, "square", cases)
+        sharded = grade_python_attempt(code, "square", cases, None, 4)
+
+        strip = lambda results: [(t["status"], t["exception"]) for t in results]
+        assert strip(sharded["test_results"]) == strip(sequential["test_results"])
+        assert sharded["tests_passed"] == sequential["tests_passed"] == 7
+        assert sharded["tests_total"] == 9
+
+    @pytest.mark.parametrize("policy", ["abort", "continue"])
+    @patch('services.attempt_service.run_pylint', MagicMock(return_value=(10.0, "ok")))
+    def test_timeout_policy_does_not_depend_on_shards(self, policy):
+        cases = json.dumps([{"args": [n], "expected": n * 2} for n in (1, -1, 3, 4, -1, 5)])
+
+        with patch.object(Config, "GRADING_TIMEOUT_POLICY", policy), \
+                patch.object(Config, "GRADING_CASE_TIMEOUT_MS", 200):
+            sequential = grade_python_attempt(LOOPING_PYTHON, "f", cases)
+            sharded = grade_python_attempt(LOOPING_PYTHON, "f", cases, None, 3)
+
+        statuses = [t["status"] for t in sequential["test_results"]]
+        assert [t["status"] for t in sharded["test_results"]] == statuses
+        if policy == "abort":
+            assert statuses == ["passed", "timeout"] + ["skipped"] * 4
+        else:
+            assert statuses == ["passed", "timeout", "passed", "passed", "timeout", "passed"]
+
+    def test_shards_share_one_budget(self):
+        def run_shard(shard_json, generated=None):
+            tests = [{"status": "passed", "exception": None, "elapsed_ms": 400.0} for _ in json.loads(shard_json)]
+            return MARKER + json.dumps({"tests": tests})
+        options = {"case_timeout_ms": 1000, "budget_ms": 1000, "on_timeout": "continue"}
+        cases = json.dumps([{"args": [i], "expected": i} for i in range(6)])
+
+        results = run_test_shards(run_shard, cases, 3, MARKER, None, options)
+
+        assert [t["status"] for t in results] == ["passed", "passed", "timeout", "skipped", "skipped", "skipped"]
+
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_grade_submission_passes_exercise_shards(self, mock_grade, test_db, sample_exercise):
+        mock_grade.return_value = {"complete": False}
+        sample_exercise.test_shards = 4
+
+        grade_submission("def test(): pass", sample_exercise)
+
+        assert mock_grade.call_args[0][4] == 4
@@ -0,0 +1,181 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+from services.benchmark import (
+    benchmark_submission, run_benchmark, efficiency_score, pinned_preexec, reserved_cpu, BenchmarkUnavailable
+)
+from services.attempt_service import grade_submission
+
+REFERENCE = "def total(xs):\n    return sum(xs)\n"
+SLOW = "def total(xs):\n    result = 0\n    for x in xs:\n        for _ in range(50):\n            pass\n        result += x\n    return result\n"
+CASES = [{"args": [list(range(2000))]}]
+GRADE = {"test_pass_rate": 1.0, "style_score": 9.0, "stars": 3, "tests_passed": 1, "tests_total": 1, "complete": True}
+
+
+def exercise(language="python", reference=REFERENCE):
+    return SimpleNamespace(
+        id=1, language=language, function_name="total", reference_solution=reference,
+        benchmark_cases=json.dumps(CASES), test_cases=None, resource_limits=None
+    )
+
+
+class TestBenchmark:
+    def test_efficiency_score(self):
+        assert efficiency_score(0.5) == 10.0
+        assert efficiency_score(1.0) == 10.0
+        assert efficiency_score(4.0) == 2.5
+
+    def test_python_report_has_median_and_memory(self):
+        report = run_benchmark(REFERENCE, "python", "total", CASES, {"memory_mb": 0, "cpu_seconds": 5, "max_processes": 0})
+
+        assert report["median_ms"] > 0
+        assert len(report["runs_ms"]) == 5
+        assert report["peak_memory_bytes"] > 0
+
+    def test_slower_submission_scores_lower(self):
+        result = benchmark_submission(SLOW, exercise())
+
+        assert result["relative_runtime"] > 2
+        assert result["efficiency_score"] < 5
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+    def test_javascript_benchmark(self):
+        reference = "function total(xs) { return xs.reduce((a, b) => a + b, 0); }"
+
+        result = benchmark_submission(reference, exercise("javascript", reference))
+
+        assert result["relative_runtime"] > 0
+        assert result["efficiency_score"] > 0
+
+    def test_broken_submission_is_not_benchmarked(self):
+        assert benchmark_submission("def other(): pass", exercise()) is None
+
+    @patch('services.benchmark.run_benchmark')
+    def test_timed_out_submission_gets_lower_bound(self, mock_run):
+        mock_run.side_effect = [{"median_ms": 1.0, "peak_memory_bytes": 100}, {"timed_out": True}]
+
+        result = benchmark_submission(SLOW, exercise())
+
+        assert result["relative_runtime"] > 100
+        assert result["peak_memory_bytes"] is None
+        assert result["efficiency_score"] < 0.1
+
+    @pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="needs sched_setaffinity")
+    def test_processes_are_pinned(self):
+        output = subprocess.run(
+            [sys.executable, "-c", "import os; print(sorted(os.sched_getaffinity(0)))"],
+            capture_output=True, text=True, preexec_fn=pinned_preexec(None, False, min(os.sched_getaffinity(0)))
+        ).stdout
+
+        assert json.loads(output) == [min(os.sched_getaffinity(0))]
+
+    @pytest.mark.parametrize("cpus", ["0", "0,1"])
+    @patch('services.benchmark._free_cpus', None)
+    @patch('services.benchmark.Config')
+    @patch('services.benchmark.run_benchmark')
+    def test_one_benchmark_per_reserved_cpu(self, mock_run, mock_config, cpus):
+        mock_config.GRADING_BENCHMARK_CPUS = cpus
+        mock_config.GRADING_BENCHMARK_QUEUE_TIMEOUT = 10
+        running, overlaps, lock = {}, [], threading.Lock()
+
+        def fake_run(code, language, function_name, cases, limits, cpu):
+            with lock:
+                running[cpu] = running.get(cpu, 0) + 1
+                overlaps.append(running[cpu])
+            time.sleep(0.02)
+            with lock:
+                running[cpu] -= 1
+            return {"median_ms": 1.0, "peak_memory_bytes": 100}
+        mock_run.side_effect = fake_run
+
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda _: benchmark_submission(REFERENCE, exercise()), range(8)))
+
+        assert all(result["relative_runtime"] == 1.0 for result in results)
+        assert max(overlaps) == 1
+        if hasattr(os, "sched_setaffinity"):
+            assert {call.args[5] for call in mock_run.call_args_list} == {int(cpu) for cpu in cpus.split(",")}
+
+    @patch('services.benchmark._free_cpus', None)
+    @patch('services.benchmark.Config')
+    def test_gives_up_waiting_for_a_busy_cpu(self, mock_config):
+        mock_config.GRADING_BENCHMARK_CPUS = "0"
+        mock_config.GRADING_BENCHMARK_QUEUE_TIMEOUT = 0.05
+
+        with reserved_cpu():
+            with pytest.raises(BenchmarkUnavailable):
+                with reserved_cpu():
+                    pass
+        with reserved_cpu() as cpu:
+            assert cpu in (0, None)
+
+
+class TestBenchmarkPhase:
+    @patch('services.attempt_service.benchmark_submission')
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_disabled_by_default(self, mock_grade, mock_benchmark, test_db, sample_exercise):
+        mock_grade.return_value = dict(GRADE, complete=False)
+        sample_exercise.reference_solution = REFERENCE
+
+        grade_submission("def test(): return 'test'", sample_exercise)
+
+        mock_benchmark.assert_not_called()
+
+    @patch('services.attempt_service.Config')
+    @patch('services.attempt_service.benchmark_submission')
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_slow_submission_loses_a_star(self, mock_grade, mock_benchmark, mock_config, test_db, sample_exercise):
+        mock_config.GRADING_BENCHMARK_ENABLED = True
+        mock_config.GRADING_MIN_EFFICIENCY = 5.0
+        mock_grade.return_value = dict(GRADE, complete=False)
+        mock_benchmark.return_value = {
+            "relative_runtime": 4.0, "peak_memory_bytes": 1024, "relative_memory": 1.0, "efficiency_score": 2.5
+        }
+        sample_exercise.reference_solution = REFERENCE
+
+        result = grade_submission("def test(): return 'test'", sample_exercise)
+
+        assert result["relative_runtime"] == 4.0
+        assert result["efficiency_score"] == 2.5
+        assert result["stars"] == 2
+
+    @patch('services.attempt_service.store_grade')
+    @patch('services.attempt_service.Config')
+    @patch('services.attempt_service.benchmark_submission')
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_busy_benchmark_cpus_skip_the_benchmark(self, mock_grade, mock_benchmark, mock_config, mock_store,
+                                                    test_db, sample_exercise):
+        mock_config.GRADING_BENCHMARK_ENABLED = True
+        mock_grade.return_value = dict(GRADE)
+        mock_benchmark.side_effect = BenchmarkUnavailable("busy")
+        sample_exercise.reference_solution = REFERENCE
+
+        result = grade_submission("def test(): return 'test'", sample_exercise)
+
+        assert result["stars"] == 3
+        assert "efficiency_score" not in result
+        mock_store.assert_not_called()
+
+    @patch('services.attempt_service.Config')
+    @patch('services.attempt_service.benchmark_submission')
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_failing_submission_is_not_benchmarked(self, mock_grade, mock_benchmark, mock_config, test_db, sample_exercise):
+        mock_config.GRADING_BENCHMARK_ENABLED = True
+        mock_grade.return_value = dict(GRADE, tests_passed=0, complete=False)
+        sample_exercise.reference_solution = REFERENCE
+
+        grade_submission("def test(): return 'test'", sample_exercise)
+
+        mock_benchmark.assert_not_called()
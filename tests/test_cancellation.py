@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import threading
+import time
+from unittest.mock import MagicMock
+from services.cancellation import ExecutionRegistry
+
+
+class TestExecutionRegistry:
+    def test_new_run_supersedes_previous_in_same_session(self):
+        registry = ExecutionRegistry()
+        first = registry.start("alice", "editor-1", "run-1")
+        process = MagicMock()
+        first.attach(process)
+
+        second = registry.start("alice", "editor-1", "run-2")
+
+        assert first.cancelled is True
+        process.kill.assert_called_once()
+        assert second.cancelled is False
+
+    def test_other_sessions_and_users_are_untouched(self):
+        registry = ExecutionRegistry()
+        first = registry.start("alice", "editor-1", "run-1")
+        registry.start("alice", "editor-2", "run-2")
+        registry.start("bob", "editor-1", "run-3")
+
+        assert first.cancelled is False
+
+    def test_cancel_before_start_kills_on_attach(self):
+        registry = ExecutionRegistry()
+        execution = registry.start("alice", "editor-1", "run-1")
+        assert registry.cancel("alice", "run-1") is True
+
+        process = MagicMock()
+        execution.attach(process)
+        process.kill.assert_called_once()
+
+    def test_cancel_is_scoped_to_user(self):
+        registry = ExecutionRegistry()
+        registry.start("alice", "editor-1", "run-1")
+
+        assert registry.cancel("bob", "run-1") is False
+        assert registry.cancel("alice", "missing") is False
+
+    def test_finished_run_cannot_be_cancelled(self):
+        registry = ExecutionRegistry()
+        execution = registry.start("alice", "editor-1", "run-1")
+        registry.finish(execution)
+
+        assert registry.cancel("alice", "run-1") is False
+
+
+class TestCancelledExecution:
+    def test_cancel_kills_running_subprocess(self):
+        from services.code_execution_service import execute_code
+        registry = ExecutionRegistry()
+        execution = registry.start("alice", "editor-1", "run-1")
+        threading.Timer(0.3, registry.cancel, args=("alice", "run-1")).start()
+
+        started = time.monotonic()
+        result = execute_code("import time\ntime.sleep(4)", "python", execution)
+
+        assert result["cancelled"] is True
+        assert result["error"] == "Execution cancelled"
+        assert time.monotonic() - started < 3
+
+    def test_cancelled_stream_reports_cancellation(self):
+        from services.code_execution_service import stream_execution
+        registry = ExecutionRegistry()
+        execution = registry.start("alice", "editor-1", "run-1")
+        threading.Timer(0.3, registry.start, args=("alice", "editor-1", "run-2")).start()
+
+        event, data = list(stream_execution("import time\ntime.sleep(4)", "python", execution=execution))[-1]
+
+        assert event == "exit"
+        assert data["cancelled"] is True
+        assert data["error"] == "Execution cancelled"
@@ -7,76 +7,54 @@ from unittest.mock import patch, MagicMock, mock_open, call
 import subprocess
 
 class TestCodeExecutionService:
-    @patch('services.code_execution_service.os.path.exists')
-    @patch('services.code_execution_service.os.unlink')
-    @patch('services.code_execution_service.subprocess.run')
-    @patch('services.code_execution_service.tempfile.NamedTemporaryFile')
-    def test_execute_python_success(self, mock_tempfile, mock_run, mock_unlink, mock_exists):
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_python_success(self, mock_run):
         from services.code_execution_service import execute_code
         
-        mock_file = MagicMock()
-        mock_file.name = 'test_temp.py'
-        mock_file.__enter__ = MagicMock(return_value=mock_file)
-        mock_file.__exit__ = MagicMock(return_value=False)
-        mock_tempfile.return_value = mock_file
-        
         mock_result = MagicMock()
         mock_result.stdout = b'Hello, World!'
         mock_result.stderr = b''
+        mock_result.truncated = False
+        mock_result.usage = None
         mock_run.return_value = mock_result
         
-        mock_exists.return_value = True
-        
         code = "print('Hello, World!')"
         result = execute_code(code, "python")
         
         assert result["output"] == "Hello, World!"
         assert result["error"] is None
-        mock_file.write.assert_called_once_with(code)
-        mock_file.close.assert_called_once()
-
-    @patch('services.code_execution_service.os.path.exists')
-    @patch('services.code_execution_service.os.unlink')
-    @patch('services.code_execution_service.subprocess.run')
-    @patch('services.code_execution_service.tempfile.NamedTemporaryFile')
-    def test_execute_python_no_output(self, mock_tempfile, mock_run, mock_unlink, mock_exists):
+        command = mock_run.call_args[0][0]
+        assert command[-1] == "-"
+        assert mock_run.call_args[1]["input"] == code
+
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_python_no_output(self, mock_run):
         from services.code_execution_service import execute_code
         
-        mock_file = MagicMock()
-        mock_file.name = 'test_temp.py'
-        mock_tempfile.return_value = mock_file
-        
         mock_result = MagicMock()
         mock_result.stdout = b''
         mock_result.stderr = b''
+        mock_result.truncated = False
+        mock_result.usage = None
         mock_run.return_value = mock_result
         
-        mock_exists.return_value = True
-        
         code = "x = 5"
         result = execute_code(code, "python")
         
         assert result["output"] == "(no output)"
         assert result["error"] is None
 
-    @patch('services.code_execution_service.os.path.exists')
-    @patch('services.code_execution_service.os.unlink')
-    @patch('services.code_execution_service.subprocess.run')
-    @patch('services.code_execution_service.tempfile.NamedTemporaryFile')
-    def test_execute_python_error(self, mock_tempfile, mock_run, mock_unlink, mock_exists):
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_python_error(self, mock_run):
         from services.code_execution_service import execute_code
         
-        mock_file = MagicMock()
-        mock_file.name = 'test_temp.py'
-        mock_tempfile.return_value = mock_file
-        
         mock_result = MagicMock()
         mock_result.stdout = b''
         mock_result.stderr = b'NameError: name "undefined_variable" is not defined'
+        mock_result.truncated = False
+        mock_result.usage = None
         mock_run.return_value = mock_result
         
-        mock_exists.return_value = True
-        
         code = "print(undefined_variable)"
         result = execute_code(code, "python")
         
@@ -84,96 +62,68 @@ class TestCodeExecutionService:
         assert result["error"] is not None
         assert "NameError" in result["error"]
 
-    @patch('services.code_execution_service.os.path.exists')
-    @patch('services.code_execution_service.os.unlink')
-    @patch('services.code_execution_service.subprocess.run')
-    @patch('services.code_execution_service.tempfile.NamedTemporaryFile')
-    def test_execute_python_syntax_error(self, mock_tempfile, mock_run, mock_unlink, mock_exists):
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_python_syntax_error(self, mock_run):
         from services.code_execution_service import execute_code
         
-        mock_file = MagicMock()
-        mock_file.name = 'test_temp.py'
-        mock_tempfile.return_value = mock_file
-        
         mock_result = MagicMock()
         mock_result.stdout = b''
         mock_result.stderr = b'SyntaxError: unterminated string literal'
+        mock_result.truncated = False
+        mock_result.usage = None
         mock_run.return_value = mock_result
         
-        mock_exists.return_value = True
-        
         code = "print('unclosed string"
         result = execute_code(code, "python")
         
         assert result["error"] is not None
         assert "SyntaxError" in result["error"]
 
-    @patch('services.code_execution_service.os.path.exists')
-    @patch('services.code_execution_service.os.unlink')
-    @patch('services.code_execution_service.subprocess.run')
-    @patch('services.code_execution_service.tempfile.NamedTemporaryFile')
-    def test_execute_javascript_success(self, mock_tempfile, mock_run, mock_unlink, mock_exists):
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_javascript_success(self, mock_run):
         from services.code_execution_service import execute_code
         
-        mock_file = MagicMock()
-        mock_file.name = 'test_temp.js'
-        mock_tempfile.return_value = mock_file
-        
         mock_result = MagicMock()
         mock_result.stdout = b'Hello, World!'
         mock_result.stderr = b''
+        mock_result.truncated = False
+        mock_result.usage = None
         mock_run.return_value = mock_result
         
-        mock_exists.return_value = True
-        
         code = "console.log('Hello, World!');"
         result = execute_code(code, "javascript")
         
         assert result["output"] == "Hello, World!"
         assert result["error"] is None
 
-    @patch('services.code_execution_service.os.path.exists')
-    @patch('services.code_execution_service.os.unlink')
-    @patch('services.code_execution_service.subprocess.run')
-    @patch('services.code_execution_service.tempfile.NamedTemporaryFile')
-    def test_execute_javascript_no_output(self, mock_tempfile, mock_run, mock_unlink, mock_exists):
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_javascript_no_output(self, mock_run):
         from services.code_execution_service import execute_code
         
-        mock_file = MagicMock()
-        mock_file.name = 'test_temp.js'
-        mock_tempfile.return_value = mock_file
-        
         mock_result = MagicMock()
         mock_result.stdout = b''
         mock_result.stderr = b''
+        mock_result.truncated = False
+        mock_result.usage = None
         mock_run.return_value = mock_result
         
-        mock_exists.return_value = True
-        
         code = "var x = 5;"
         result = execute_code(code, "javascript")
         
         assert result["output"] == "(no output)"
         assert result["error"] is None
 
-    @patch('services.code_execution_service.os.path.exists')
-    @patch('services.code_execution_service.os.unlink')
-    @patch('services.code_execution_service.subprocess.run')
-    @patch('services.code_execution_service.tempfile.NamedTemporaryFile')
-    def test_execute_javascript_error(self, mock_tempfile, mock_run, mock_unlink, mock_exists):
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_javascript_error(self, mock_run):
         from services.code_execution_service import execute_code
         
-        mock_file = MagicMock()
-        mock_file.name = 'test_temp.js'
-        mock_tempfile.return_value = mock_file
-        
         mock_result = MagicMock()
         mock_result.stdout = b''
         mock_result.stderr = b'ReferenceError: undefinedVariable is not defined'
+        mock_result.truncated = False
+        mock_result.usage = None
         mock_run.return_value = mock_result
         
-        mock_exists.return_value = True
-        
         code = "console.log(undefinedVariable);"
         result = execute_code(code, "javascript")
         
@@ -189,25 +139,27 @@ class TestCodeExecutionService:
         assert result["output"] == ""
         assert result["error"] == "Unsupported language: ruby"
 
-    @patch('services.code_execution_service.os.path.exists')
-    @patch('services.code_execution_service.os.unlink')
-    @patch('services.code_execution_service.subprocess.run')
-    @patch('services.code_execution_service.tempfile.NamedTemporaryFile')
-    def test_execute_code_timeout(self, mock_tempfile, mock_run, mock_unlink, mock_exists):
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_code_timeout(self, mock_run):
         from services.code_execution_service import execute_code
         
-        mock_file = MagicMock()
-        mock_file.name = 'test_temp.py'
-        mock_tempfile.return_value = mock_file
-        
         mock_run.side_effect = subprocess.TimeoutExpired('python', 5)
-        mock_exists.return_value = True
-        
         code = "while True: pass"
         result = execute_code(code, "python")
         
         assert result["error"] is not None
         assert "timed out" in result["error"].lower()
+        assert result["usage"] is None
+
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_code_exception_has_usage(self, mock_run):
+        from services.code_execution_service import execute_code
+
+        mock_run.side_effect = OSError("no interpreter")
+        result = execute_code("print(1)", "python")
+
+        assert result["error"] == "Execution error: no interpreter"
+        assert result["usage"] is None
 
     def test_sanitize_error_with_paths(self):
         from services.code_execution_service import sanitize_error
@@ -253,4 +205,84 @@ NameError: name 'x' is not defined"""
         sanitized = sanitize_error(error)
         assert "<path>" in sanitized
         assert "/tmp/test.py" not in sanitized
-        assert "NameError" in sanitized
\ No newline at end of file
+        assert "NameError" in sanitized
+
+    @patch.dict('services.code_execution_service._pools', clear=True)
+    @patch('services.code_execution_service.create_pool')
+    def test_pool_workers_start_under_limits(self, mock_create_pool):
+        from services.code_execution_service import get_pool
+        from config import Config
+
+        get_pool("javascript")
+
+        command = mock_create_pool.call_args[0][1]
+        options = mock_create_pool.call_args[1]
+        assert f"--max-old-space-size={Config.EXECUTION_MEMORY_LIMIT_MB}" in command
+        assert options["preexec_fn"] is not None
+        assert options["cpu_budget"] == Config.EXECUTION_CPU_LIMIT_SECONDS
+
+class TestStreamExecution:
+    def test_stream_execution_yields_output_then_exit(self):
+        from services.code_execution_service import stream_execution
+
+        events = list(stream_execution("print('a')\nprint('b')", "python"))
+
+        assert "".join(data["data"] for event, data in events if event == "output") == "a\nb\n"
+        event, data = events[-1]
+        assert event == "exit"
+        assert data["exit_code"] == 0
+        assert data["error"] is None
+        assert data["timed_out"] is False
+        assert data["truncated"] is False
+
+    def test_stream_execution_sanitizes_error(self):
+        from services.code_execution_service import stream_execution
+
+        event, data = list(stream_execution("raise ValueError('boom')", "python"))[-1]
+
+        assert event == "exit"
+        assert data["exit_code"] == 1
+        assert "ValueError: boom" in data["error"]
+        # The program comes in on stdin, so no file path can leak
+        assert 'File "<stdin>"' in data["error"]
+
+    def test_stream_execution_timeout(self):
+        from services.code_execution_service import stream_execution
+
+        events = list(stream_execution("print('started')\nwhile True: pass", "python", timeout=1))
+
+        assert "".join(data["data"] for event, data in events if event == "output") == "started\n"
+        assert events[-1][1]["timed_out"] is True
+        assert events[-1][1]["error"] == "Execution timed out"
+
+    def test_stream_execution_unsupported_language(self):
+        from services.code_execution_service import stream_execution
+
+        events = list(stream_execution("puts 1", "ruby"))
+
+        assert events == [("exit", {
+            "exit_code": None, "error": "Unsupported language: ruby", "timed_out": False, "truncated": False,
+            "cancelled": False, "usage": None
+        })]
+
+    @patch('services.code_execution_service.subprocess.Popen', side_effect=OSError("no interpreter"))
+    def test_stream_execution_failure_has_the_same_exit_shape(self, mock_popen):
+        from services.code_execution_service import stream_execution
+
+        events = list(stream_execution("print(1)", "python"))
+
+        assert events == [("exit", {
+            "exit_code": None, "error": "Execution error: no interpreter", "timed_out": False, "truncated": False,
+            "cancelled": False, "usage": None
+        })]
+
+    @patch('services.code_execution_service.Config')
+    def test_stream_execution_output_cap(self, mock_config):
+        from services.code_execution_service import stream_execution
+        mock_config.MAX_OUTPUT_BYTES = 100
+
+        events = list(stream_execution("while True: print('x' * 10)", "python"))
+
+        assert len("".join(data["data"] for event, data in events if event == "output")) == 100
+        assert events[-1][1]["truncated"] is True
+        assert events[-1][1]["timed_out"] is False
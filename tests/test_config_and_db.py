@@ -53,10 +53,52 @@ class TestDatabase:
         with patch('database.db.get_engine') as mock_get_engine:
             mock_engine = MagicMock()
             mock_get_engine.return_value = mock_engine
-            with patch('database.db.Base.metadata.create_all') as mock_create_all:
+            with patch('database.db.Base.metadata.create_all') as mock_create_all, \
+                    patch('database.db.upgrade_schema') as mock_upgrade:
                 from database.db import init_db
                 init_db()
                 mock_create_all.assert_called_once_with(bind=mock_engine)
+                mock_upgrade.assert_called_once_with(mock_engine)
+
+    def test_upgrade_adds_missing_columns(self, tmp_path):
+        from sqlalchemy import create_engine, inspect, text
+        from database.db import Base, upgrade_schema
+        import models.attempt, models.exercise, models.user, models.regrade_job  # noqa: F401
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            # The attempts table as the first release created it
+            conn.execute(text(
+                "CREATE TABLE user_exercise_attempts (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                "exercise_id INTEGER NOT NULL, code_submitted TEXT NOT NULL, score INTEGER NOT NULL, "
+                "stars INTEGER NOT NULL, attempted_at DATETIME)"
+            ))
+            conn.execute(text(
+                "INSERT INTO user_exercise_attempts VALUES (1, 1, 1, 'pass', 7, 2, NULL)"
+            ))
+
+        upgrade_schema(engine)
+        upgrade_schema(engine)
+
+        columns = {column["name"] for column in inspect(engine).get_columns("user_exercise_attempts")}
+        assert columns == {column.name for column in Base.metadata.tables["user_exercise_attempts"].columns}
+        with engine.connect() as conn:
+            row = conn.execute(text("SELECT status, graded_at, efficiency_score FROM user_exercise_attempts")).one()
+        assert tuple(row) == ("graded", None, None)
+
+    def test_upgrade_adds_missing_indexes(self, tmp_path):
+        from sqlalchemy import create_engine, inspect, text
+        from database.db import Base, upgrade_schema
+        import models.attempt, models.exercise, models.user, models.regrade_job  # noqa: F401
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_regrade_jobs_active_exercise"))
+
+        upgrade_schema(engine)
+        upgrade_schema(engine)
+
+        indexes = {index["name"]: index for index in inspect(engine).get_indexes("regrade_jobs")}
+        assert indexes["ix_regrade_jobs_active_exercise"]["unique"]
 
 
     def test_get_db_session(self):
@@ -108,6 +150,21 @@ class TestApp:
 
         assert app_module.app is not None
 
+    @patch('database.db.get_engine', new=MagicMock())
+    @patch('services.grading_queue.resume_pending_attempts', new=MagicMock())
+    @patch('services.regrade_service.resume_regrade_jobs')
+    @patch('database.db.init_db')
+    def test_spawned_processes_skip_startup_work(self, mock_init_db, mock_resume):
+        import runpy
+        app_path = Path(__file__).parent.parent / "src" / "app.py"
+
+        runpy.run_path(str(app_path), run_name="__mp_main__")
+        assert not mock_init_db.called
+        assert not mock_resume.called
+
+        runpy.run_path(str(app_path), run_name="app")
+        mock_init_db.assert_called_once()
+
     @patch('database.db.get_engine', new=MagicMock())
     @patch('database.db.create_engine', return_value=MagicMock())
     def test_app_blueprints_registered(self, mock_engine):
@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+from unittest.mock import patch
+from services.lru_cache import LRUCache
+from services.execution_cache import (
+    is_deterministic,
+    execution_cache_key,
+    store_execution,
+    get_cached_execution,
+    clear_execution_cache
+)
+from services.code_execution_service import execute_code
+
+RESULT = {"output": "3", "error": None, "truncated": False, "usage": None}
+
+
+@pytest.fixture
+def enabled_cache():
+    with patch('services.execution_cache._cache', LRUCache(max_size=10, ttl=60)):
+        yield
+    clear_execution_cache()
+
+
+class TestDeterminismScreen:
+    @pytest.mark.parametrize("code", [
+        "print(1 + 2)",
+        "import math\nprint(math.sqrt(16))",
+        "from collections import Counter\nprint(Counter('aab'))",
+        "d = {'a': 1}\nprint(list(d.keys()), 5 - 2, 6 | 1)",
+    ])
+    def test_pure_python_is_cacheable(self, code):
+        assert is_deterministic(code, "python")
+
+    @pytest.mark.parametrize("code", [
+        "print(input())",
+        "import random\nprint(random.random())",
+        "from datetime import datetime\nprint(datetime.now())",
+        "print({'a', 'b'})",
+        "print(id(object()))",
+        "print(open('/etc/hostname').read())",
+        "print(",
+        "d = {'a': 1, 'b': 2}\nprint(d.keys() | {'c': 3}.keys())",
+        "d = {'a': 1}\nprint(['b'] - d.keys())",
+        "d = {'a': 1}\nprint(d.items() ^ [('b', 2)])",
+        "d = {'a': 1}\nkeys = d.keys()\nkeys &= ['a']\nprint(keys)",
+    ])
+    def test_impure_python_is_not_cacheable(self, code):
+        assert not is_deterministic(code, "python")
+
+    def test_javascript_screen(self):
+        assert is_deterministic("console.log([1, 2].map(x => x * 2));", "javascript")
+        assert not is_deterministic("console.log(Math.random());", "javascript")
+        assert not is_deterministic("console.log(new Date());", "javascript")
+        assert not is_deterministic("const fs = require('fs');", "javascript")
+
+    @pytest.mark.parametrize("code", [
+        "console.log(new Intl.NumberFormat().format(1234.5));",
+        "console.log((1234.5).toLocaleString());",
+        "console.log('i'.toLocaleUpperCase());",
+        "console.log(['b', 'a'].sort((x, y) => x.localeCompare(y)));",
+    ])
+    def test_locale_dependent_javascript_is_not_cacheable(self, code):
+        assert not is_deterministic(code, "javascript")
+
+
+class TestExecutionCache:
+    def test_key_depends_on_runtime_version(self):
+        with patch('services.execution_cache.runtime_version', return_value="3.10.0"):
+            old = execution_cache_key("print(1)", "python", "subprocess")
+        with patch('services.execution_cache.runtime_version', return_value="3.12.0"):
+            new = execution_cache_key("print(1)", "python", "subprocess")
+        assert old != new
+
+    def test_failed_runs_are_not_stored(self, enabled_cache):
+        assert not store_execution("k1", dict(RESULT, error="Traceback"))
+        assert not store_execution("k2", dict(RESULT, truncated=True))
+        assert not store_execution("k3", dict(RESULT, output="<object object at 0x7f3a2c>"))
+        assert store_execution("k4", RESULT)
+        assert get_cached_execution("k1", "python") is None
+        assert get_cached_execution("k4", "python") == RESULT
+
+    @patch('services.code_execution_service.execute_in_subprocess')
+    def test_disabled_by_default(self, mock_run):
+        mock_run.return_value = dict(RESULT)
+
+        execute_code("print(1 + 2)", "python")
+        execute_code("print(1 + 2)", "python")
+
+        assert mock_run.call_count == 2
+
+    @patch('services.code_execution_service.execute_in_subprocess')
+    def test_identical_snippets_run_once(self, mock_run, enabled_cache):
+        mock_run.return_value = dict(RESULT)
+
+        first = execute_code("print(1 + 2)", "python")
+        second = execute_code("print(1 + 2)", "python")
+
+        assert first == second == RESULT
+        mock_run.assert_called_once()
+
+    @patch('services.code_execution_service.execute_in_subprocess')
+    def test_nondeterministic_snippets_always_run(self, mock_run, enabled_cache):
+        mock_run.return_value = dict(RESULT)
+
+        execute_code("import random\nprint(random.randint(1, 3))", "python")
+        execute_code("import random\nprint(random.randint(1, 3))", "python")
+
+        assert mock_run.call_count == 2
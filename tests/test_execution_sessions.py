@@ -0,0 +1,152 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import json
+import shutil
+import pytest
+from unittest.mock import patch, MagicMock
+from services.execution_sessions import SessionManager, SessionLimitReached
+from routes.sessions import serve_session, register
+
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+
+@pytest.fixture
+def manager():
+    manager = SessionManager(max_sessions=2, idle_timeout=60)
+    yield manager
+    manager.shutdown()
+
+
+class FakeSocket:
+    """Stands in for a flask-sock connection; None entries are receive timeouts."""
+
+    def __init__(self, *messages, on_receive=None):
+        self.incoming = [json.dumps(m) if isinstance(m, dict) else m for m in messages]
+        self.on_receive = on_receive
+        self.sent = []
+
+    def receive(self, timeout=None):
+        if self.on_receive:
+            self.on_receive()
+        return self.incoming.pop(0) if self.incoming else json.dumps({"type": "close"})
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+class TestSessionManager:
+    def test_python_state_persists_between_runs(self, manager):
+        session = manager.open("user", "python")
+
+        first = session.execute("total = 40")
+        result = session.execute("total += 2\nprint(total)")
+
+        assert first["error"] is None
+        assert result["output"] == "42"
+
+    @requires_node
+    def test_javascript_state_persists_between_runs(self, manager):
+        session = manager.open("user", "javascript")
+
+        session.execute("var total = 40;")
+        result = session.execute("console.log(total + 2);")
+
+        assert result["output"] == "42"
+
+    def test_errors_are_sanitized(self, manager):
+        session = manager.open("user", "python")
+
+        result = session.execute("open('/no/such/file')")
+
+        assert "FileNotFoundError" in result["error"]
+        assert "/no/such/file" not in result["error"]
+        assert session.execute("print('still alive')")["output"] == "still alive"
+
+    def test_timeout_ends_session(self, manager):
+        session = manager.open("user", "python")
+
+        result = session.execute("while True: pass", timeout=0.5)
+
+        assert "timed out" in result["error"]
+        assert session.closed
+        assert session.close_reason == "timeout"
+
+    def test_session_cap(self, manager):
+        manager.open("a", "python")
+        manager.open("b", "python")
+
+        with pytest.raises(SessionLimitReached):
+            manager.open("c", "python")
+
+    def test_idle_sessions_are_reaped(self, manager):
+        session = manager.open("user", "python")
+        session.last_used -= 120
+
+        assert manager.reap_idle() == 1
+        assert session.closed
+        assert session.close_reason == "idle"
+        assert len(manager) == 0
+
+
+@patch('routes.sessions.authenticate_token', return_value={"keycloak_id": "user-1"})
+class TestSessionSocket:
+    def test_runs_code_in_one_session(self, mock_auth, manager):
+        ws = FakeSocket(
+            {"type": "start", "token": "t", "language": "python"},
+            {"type": "execute", "code": "x = 2"},
+            {"type": "execute", "code": "print(x * 21)"}
+        )
+
+        with patch('routes.sessions.get_session_manager', return_value=manager):
+            serve_session(ws)
+
+        assert [m["type"] for m in ws.sent] == ["ready", "result", "result"]
+        assert ws.sent[2]["output"] == "42"
+        assert len(manager) == 0
+
+    def test_invalid_token_is_rejected(self, mock_auth, manager):
+        mock_auth.side_effect = ValueError("Invalid token")
+        ws = FakeSocket({"type": "start", "token": "bad", "language": "python"})
+
+        with patch('routes.sessions.get_session_manager', return_value=manager):
+            serve_session(ws)
+
+        assert ws.sent == [{"type": "error", "error": "Invalid token"}]
+        assert len(manager) == 0
+
+    def test_reclaimed_session_is_announced(self, mock_auth, manager):
+        # Every session counts as idle, so the first poll finds it reclaimed
+        manager.idle_timeout = -1
+        ws = FakeSocket({"type": "start", "token": "t", "language": "python"}, None, on_receive=manager.reap_idle)
+
+        with patch('routes.sessions.get_session_manager', return_value=manager):
+            serve_session(ws)
+
+        assert ws.sent[-1] == {"type": "closed", "reason": "idle"}
+
+    def test_session_limit_is_reported(self, mock_auth):
+        full = MagicMock()
+        full.open.side_effect = SessionLimitReached("Too many interactive sessions are open, try again later")
+        ws = FakeSocket({"type": "start", "token": "t", "language": "python"})
+
+        with patch('routes.sessions.get_session_manager', return_value=full):
+            serve_session(ws)
+
+        assert ws.sent[0]["type"] == "error"
+        assert "Too many" in ws.sent[0]["error"]
+
+
+class TestRegister:
+    @patch('routes.sessions.Config')
+    def test_disabled_by_default(self, mock_config):
+        mock_config.EXECUTION_SESSIONS_ENABLED = False
+        assert register(MagicMock()) is False
+
+    @patch('routes.sessions.Sock', None)
+    @patch('routes.sessions.Config')
+    def test_requires_flask_sock(self, mock_config):
+        mock_config.EXECUTION_SESSIONS_ENABLED = True
+        assert register(MagicMock()) is False
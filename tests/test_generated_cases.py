@@ -0,0 +1,209 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "workers"))
+
+import json
+import shutil
+import subprocess
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from case_generators import Mulberry32, generate_cases
+from config import Config
+from services.generated_cases import (
+    expected_digests, clear_generated_cases, generated_case_count, materialize_cases, discard_cases, spec_key,
+    spec_lock, GradingUnavailable
+)
+from services.attempt_service import grade_python_attempt, grade_javascript_attempt, grade_submission
+from services.exercise_service import create_exercise, update_exercise, delete_exercise
+
+SPEC = {"seed": 11, "count": 3, "args": [{"type": "list", "length": {"min": 500, "max": 2000},
+                                            "of": {"type": "int", "min": -10**6, "max": 10**6}}]}
+GENERATORS = [SPEC, dict(SPEC, seed=12, count=2)]
+EXAMPLES = json.dumps([{"args": [[3, 1, 2]], "expected": [1, 2, 3]}])
+REFERENCE = "def sort_numbers(xs):\n    return sorted(xs)\n"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "GRADING_GENERATOR_DIR", str(tmp_path / "generated"))
+    clear_generated_cases()
+    yield
+    clear_generated_cases()
+
+
+class TestCaseGenerators:
+    def test_same_seed_same_cases(self):
+        assert list(generate_cases(SPEC)) == list(generate_cases(SPEC))
+        assert list(generate_cases(SPEC)) != list(generate_cases(dict(SPEC, seed=12)))
+
+    def test_cases_follow_the_spec(self):
+        cases = list(generate_cases(SPEC))
+
+        assert len(cases) == 3
+        for (numbers,) in cases:
+            assert 500 <= len(numbers) <= 2000
+            assert all(-10**6 <= n <= 10**6 for n in numbers)
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+    def test_javascript_generates_the_same_cases(self):
+        workers = Path(__file__).parent.parent / "src" / "workers"
+        script = (
+            "const g = require('./case_generators');"
+            f"process.stdout.write(JSON.stringify([...g.generateCases({json.dumps(SPEC)})]));"
+        )
+
+        output = subprocess.run(["node", "-e", script], cwd=workers, capture_output=True, text=True, timeout=10).stdout
+
+        assert json.loads(output) == list(generate_cases(SPEC))
+
+    def test_prng_matches_reference_values(self):
+        rng = Mulberry32(42)
+        assert [rng.random() for _ in range(2)] == [0.6011037519201636, 0.44829055899754167]
+
+    def test_materialized_once_per_spec(self):
+        path = materialize_cases(SPEC)
+        written = Path(path).stat().st_mtime_ns
+
+        assert [json.loads(line) for line in Path(path).read_text().splitlines()] == list(generate_cases(SPEC))
+        assert materialize_cases(dict(SPEC)) == path
+        assert Path(path).stat().st_mtime_ns == written
+        assert materialize_cases(dict(SPEC, seed=12)) != path
+
+    def test_one_spec_does_not_wait_for_another(self):
+        other = dict(SPEC, seed=12)
+        done = threading.Event()
+
+        with spec_lock(spec_key(SPEC)):
+            threading.Thread(target=lambda: (materialize_cases(other), done.set()), daemon=True).start()
+            assert done.wait(timeout=10)
+
+    def test_discard_removes_only_dropped_specs(self):
+        old, kept = materialize_cases(SPEC), materialize_cases(dict(SPEC, seed=12))
+
+        assert discard_cases(GENERATORS, [dict(SPEC, seed=12)]) == 1
+
+        assert not Path(old).exists()
+        assert Path(kept).exists()
+        assert materialize_cases(SPEC) == old
+        assert Path(old).exists()
+
+    def test_changing_an_exercise_seed_deletes_its_cases(self, test_db, sample_exercise):
+        update_exercise(test_db, sample_exercise.id, {"test_generators": [SPEC]})
+        old = materialize_cases(SPEC)
+
+        update_exercise(test_db, sample_exercise.id, {"test_generators": [dict(SPEC, seed=12)]})
+
+        assert not Path(old).exists()
+
+    def test_deleting_an_exercise_deletes_its_cases(self, test_db, sample_exercise):
+        update_exercise(test_db, sample_exercise.id, {"test_generators": [SPEC]})
+        path = materialize_cases(SPEC)
+
+        delete_exercise(test_db, sample_exercise.id)
+
+        assert not Path(path).exists()
+
+
+class TestExpectedDigests:
+    def test_reference_runs_once_per_seed(self):
+        run_reference = MagicMock(return_value=["a", "b", "c"])
+
+        first = expected_digests("python", "f", REFERENCE, {"spec": SPEC}, run_reference)
+        second = expected_digests("python", "f", REFERENCE, {"spec": SPEC}, run_reference)
+        expected_digests("python", "f", REFERENCE, {"spec": dict(SPEC, seed=12)}, run_reference)
+
+        assert first == second == ["a", "b", "c"]
+        assert run_reference.call_count == 2
+
+    def test_incomplete_digests_are_an_error_and_not_cached(self):
+        run_reference = MagicMock(return_value=["a", None, "c"])
+
+        for _ in range(2):
+            with pytest.raises(GradingUnavailable):
+                expected_digests("python", "f", REFERENCE, {"spec": SPEC}, run_reference)
+
+        assert run_reference.call_count == 2
+
+
+@patch('services.attempt_service.run_pylint', MagicMock(return_value=(10.0, "ok")))
+class TestGeneratedGrading:
+    def test_correct_submission_passes_generated_cases(self):
+        code = "def sort_numbers(xs):\n    xs.sort()\n    return xs\n"
+
+        result = grade_python_attempt(code, "sort_numbers", EXAMPLES, None, None, GENERATORS, REFERENCE)
+
+        assert result["tests_total"] == 1 + generated_case_count(GENERATORS) == 6
+        assert result["tests_passed"] == 6
+        assert result["complete"]
+
+    def test_wrong_submission_fails_only_generated_cases(self):
+        code = "def sort_numbers(xs):\n    return sorted(xs)[:3]\n"
+
+        result = grade_python_attempt(code, "sort_numbers", EXAMPLES, None, None, GENERATORS, REFERENCE)
+
+        assert [t["status"] for t in result["test_results"]] == ["passed"] + ["failed"] * 5
+
+    def test_without_reference_grading_is_unavailable(self):
+        with pytest.raises(GradingUnavailable):
+            grade_python_attempt(REFERENCE, "sort_numbers", EXAMPLES, None, None, GENERATORS, None)
+
+    def test_failing_reference_is_not_a_failed_submission(self):
+        with pytest.raises(GradingUnavailable):
+            grade_python_attempt(
+                REFERENCE, "sort_numbers", EXAMPLES, None, None, GENERATORS, "def sort_numbers(xs):\n    1 / 0\n"
+            )
+
+    def test_million_element_cases_fit_the_budget(self):
+        spec = {"seed": 5, "count": 2, "args": [{"type": "list", "length": 1_000_000,
+                                                  "of": {"type": "int", "min": -10**6, "max": 10**6}}]}
+
+        result = grade_python_attempt(REFERENCE, "sort_numbers", EXAMPLES, None, None, [spec], REFERENCE)
+
+        assert [t["status"] for t in result["test_results"]] == ["passed"] * 3
+
+    def test_sharded_run_matches_sequential_run(self):
+        code = "def sort_numbers(xs):\n    return sorted(xs) if len(xs) > 1000 else xs\n"
+
+        sequential = grade_python_attempt(code, "sort_numbers", EXAMPLES, None, None, GENERATORS, REFERENCE)
+        sharded = grade_python_attempt(code, "sort_numbers", EXAMPLES, None, 3, GENERATORS, REFERENCE)
+
+        assert [t["status"] for t in sharded["test_results"]] == [t["status"] for t in sequential["test_results"]]
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+    @patch('services.attempt_service.run_eslint', MagicMock(return_value=(10.0, "ok")))
+    def test_javascript_generated_cases(self):
+        reference = "function sortNumbers(xs) { return [...xs].sort((a, b) => a - b); }"
+        examples = json.dumps([{"args": [[3, 1, 2]], "expected": [1, 2, 3]}])
+
+        correct = grade_javascript_attempt(reference, "sortNumbers", examples, None, None, GENERATORS, reference)
+        wrong = grade_javascript_attempt(
+            "function sortNumbers(xs) { return [...xs].sort(); }", "sortNumbers", examples, None, None,
+            GENERATORS, reference
+        )
+
+        assert correct["tests_passed"] == 6
+        assert wrong["tests_passed"] == 1
+
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_grade_submission_passes_generators(self, mock_grade, test_db, sample_exercise):
+        mock_grade.return_value = {"complete": False}
+        sample_exercise.test_generators = GENERATORS
+        sample_exercise.reference_solution = REFERENCE
+
+        grade_submission("def test(): pass", sample_exercise)
+
+        assert mock_grade.call_args[0][5:] == (GENERATORS, REFERENCE)
+
+
+class TestGeneratedExercises:
+    def test_api_returns_only_the_examples(self, test_db):
+        exercise = create_exercise(test_db, {
+            "name": "Sort", "function_name": "sort_numbers", "test_cases": json.loads(EXAMPLES),
+            "reference_solution": REFERENCE, "test_generators": GENERATORS
+        })
+
+        assert exercise["test_cases"] == json.loads(EXAMPLES)
+        assert "test_generators" not in exercise
@@ -0,0 +1,116 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import json
+import time
+import pytest
+from unittest.mock import patch
+from services.lru_cache import LRUCache
+from services.grading_cache import (
+    grading_cache_key,
+    get_cached_grade,
+    store_grade,
+    invalidate_exercise,
+    clear_grading_cache
+)
+from services.attempt_service import grade_submission
+from services.exercise_service import update_exercise
+
+GRADE = {"style_score": 9.0, "stars": 3, "tests_passed": 1, "tests_total": 1, "complete": True}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_grading_cache()
+    yield
+    clear_grading_cache()
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_entries_expire_after_ttl(self):
+        cache = LRUCache(max_size=2, ttl=0.05)
+        cache.put("a", 1)
+        time.sleep(0.1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_zero_size_disables_cache(self):
+        cache = LRUCache(max_size=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+
+
+class TestGradingCacheKey:
+    def test_line_endings_are_normalized(self):
+        tests = json.dumps([{"args": [1], "expected": 1}])
+        assert grading_cache_key("a = 1\r\nb = 2\r\n", "python", "f", tests) == \
+            grading_cache_key("a = 1\nb = 2\n", "python", "f", tests)
+
+    def test_test_case_formatting_is_ignored(self):
+        assert grading_cache_key("x", "python", "f", '[{"args": [1], "expected": 1}]') == \
+            grading_cache_key("x", "python", "f", '[{"expected":1,"args":[1]}]')
+
+    def test_trailing_whitespace_changes_key(self):
+        assert grading_cache_key("x = 1  \n", "python", "f", "[]") != grading_cache_key("x = 1\n", "python", "f", "[]")
+
+    def test_every_component_changes_key(self):
+        base = grading_cache_key("x", "python", "f", "[]")
+        assert base != grading_cache_key("y", "python", "f", "[]")
+        assert base != grading_cache_key("x", "javascript", "f", "[]")
+        assert base != grading_cache_key("x", "python", "g", "[]")
+        assert base != grading_cache_key("x", "python", "f", '[{"args": [], "expected": 1}]')
+        assert base != grading_cache_key("x", "python", "f", "[]", {"memory_mb": 512})
+
+
+class TestGradingCache:
+    def test_store_and_invalidate(self):
+        store_grade("k1", 1, GRADE)
+        store_grade("k2", 2, GRADE)
+
+        assert invalidate_exercise(1) == 1
+        assert get_cached_grade("k1") is None
+        assert get_cached_grade("k2") == GRADE
+
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_identical_submissions_graded_once(self, mock_grade, test_db, sample_exercise):
+        mock_grade.return_value = dict(GRADE)
+
+        first = grade_submission("def test(): return 'test'", sample_exercise)
+        second = grade_submission("def test(): return 'test'", sample_exercise)
+
+        assert first == second == GRADE
+        mock_grade.assert_called_once()
+
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_incomplete_results_are_not_cached(self, mock_grade, test_db, sample_exercise):
+        mock_grade.return_value = dict(GRADE, complete=False)
+
+        grade_submission("while True: pass", sample_exercise)
+        grade_submission("while True: pass", sample_exercise)
+
+        assert mock_grade.call_count == 2
+
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_update_exercise_invalidates_results(self, mock_grade, test_db, sample_exercise):
+        mock_grade.return_value = dict(GRADE)
+        grade_submission("def test(): return 'test'", sample_exercise)
+
+        update_exercise(test_db, sample_exercise.id, {"test_cases": [{"args": [], "expected": "other"}]})
+        update_exercise(test_db, sample_exercise.id, {"test_cases": [{"args": [], "expected": "test"}]})
+        grade_submission("def test(): return 'test'", sample_exercise)
+
+        assert mock_grade.call_count == 2
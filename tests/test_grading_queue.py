@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import patch
+from models.attempt import Attempt
+from services.grading_queue import GradingQueue, GradingQueueFull, resume_pending_attempts
+
+
+class TestGradingQueue:
+    @patch('services.grading_queue.grade_attempt_by_id')
+    def test_submitted_attempts_are_graded(self, mock_grade):
+        mock_grade.return_value = "graded"
+        grading_queue = GradingQueue(workers=2, max_pending=10)
+
+        for attempt_id in (1, 2, 3):
+            grading_queue.submit(attempt_id)
+        grading_queue._queue.join()
+
+        graded = sorted(call.args[0] for call in mock_grade.call_args_list)
+        assert graded == [1, 2, 3]
+        assert grading_queue.depth() == 0
+
+    @patch('services.grading_queue.grade_attempt_by_id')
+    def test_queue_is_bounded(self, mock_grade):
+        release = threading.Event()
+        started = threading.Event()
+
+        def block(attempt_id):
+            started.set()
+            release.wait(5)
+            return "graded"
+
+        mock_grade.side_effect = block
+        grading_queue = GradingQueue(workers=1, max_pending=1)
+        try:
+            grading_queue.submit(1)
+            started.wait(5)
+            grading_queue.submit(2)
+            with pytest.raises(GradingQueueFull):
+                grading_queue.submit(3)
+        finally:
+            release.set()
+        grading_queue._queue.join()
+
+    @patch('services.grading_queue.grade_attempt_by_id')
+    def test_worker_survives_grading_errors(self, mock_grade):
+        mock_grade.side_effect = [RuntimeError("boom"), "graded"]
+        grading_queue = GradingQueue(workers=1, max_pending=10)
+
+        grading_queue.submit(1)
+        grading_queue.submit(2)
+        grading_queue._queue.join()
+
+        assert mock_grade.call_count == 2
+
+
+class TestResumePendingAttempts:
+    @patch('services.grading_queue.get_grading_queue')
+    def test_pending_attempts_are_queued_again(self, mock_queue, test_db, sample_user, sample_exercise):
+        for status in ("pending", "graded", "pending", "failed"):
+            test_db.add(Attempt(
+                user_id=sample_user.id, exercise_id=sample_exercise.id, code_submitted="x = 1", status=status
+            ))
+        test_db.commit()
+        queued = threading.Semaphore(0)
+        mock_queue.return_value.submit.side_effect = lambda attempt_id, block: queued.release()
+
+        assert resume_pending_attempts() == 2
+        assert queued.acquire(timeout=5) and queued.acquire(timeout=5)
+        pending = [a.id for a in test_db.query(Attempt).filter(Attempt.status == "pending").order_by(Attempt.id)]
+        assert [c.args[0] for c in mock_queue.return_value.submit.call_args_list] == pending
+
+    @patch('services.grading_queue.get_grading_queue')
+    def test_attempts_claimed_elsewhere_are_left_alone(self, mock_queue, test_db, sample_user, sample_exercise):
+        now = datetime.now(timezone.utc)
+        for claimed_at in (None, now, now - timedelta(hours=1)):
+            test_db.add(Attempt(
+                user_id=sample_user.id, exercise_id=sample_exercise.id, code_submitted="x = 1", status="pending",
+                claimed_at=claimed_at
+            ))
+        test_db.commit()
+        queued = threading.Semaphore(0)
+        mock_queue.return_value.submit.side_effect = lambda attempt_id, block: queued.release()
+
+        assert resume_pending_attempts() == 2
+        assert queued.acquire(timeout=5) and queued.acquire(timeout=5)
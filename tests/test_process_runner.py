@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import subprocess
+import time
+import pytest
+from services.process_runner import run_bounded
+
+
+class TestRunBounded:
+    def test_captures_stdout_and_stderr(self):
+        result = run_bounded(
+            [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"],
+            timeout=5, max_bytes=1024
+        )
+
+        assert result.stdout == b"out\n"
+        assert result.stderr == b"err\n"
+        assert result.returncode == 3
+        assert result.truncated is False
+
+    def test_kills_process_over_cap(self):
+        started = time.monotonic()
+        result = run_bounded([sys.executable, "-c", "while True: print('x' * 100)"], timeout=5, max_bytes=1000)
+
+        assert result.truncated is True
+        assert len(result.stdout) == 1000
+        assert result.returncode != 0
+        assert time.monotonic() - started < 5
+
+    def test_stderr_counts_towards_its_own_cap(self):
+        result = run_bounded(
+            [sys.executable, "-c", "import sys\nwhile True: sys.stderr.write('e' * 100)"],
+            timeout=5, max_bytes=500
+        )
+
+        assert result.truncated is True
+        assert result.stderr == b"e" * 500
+        assert result.stdout == b""
+
+    def test_input_and_text_mode(self):
+        result = run_bounded(
+            [sys.executable, "-c", "import sys; print(sys.stdin.read().upper())"],
+            timeout=5, max_bytes=1024, input="héllo", text=True
+        )
+
+        assert result.stdout == "HÉLLO\n"
+
+    def test_timeout_raises(self):
+        with pytest.raises(subprocess.TimeoutExpired):
+            run_bounded([sys.executable, "-c", "import time; time.sleep(10)"], timeout=0.5, max_bytes=1024)
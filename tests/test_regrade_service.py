@@ -0,0 +1,248 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import Flask, request
+from unittest.mock import patch, MagicMock
+from models.attempt import Attempt
+from models.exercise import Exercise
+from models.regrade_job import RegradeJob
+from services.regrade_service import (
+    start_regrade,
+    run_regrade_job,
+    resume_regrade_jobs,
+    regrade_attempts,
+    regrade_job_to_dict,
+    create_regrade_executor,
+    renew_lease,
+    split_batch,
+    RegradeInProgress
+)
+
+GRADE = {"style_score": 9.0, "stars": 3, "efficiency_score": 7.5}
+
+
+@pytest.fixture
+def attempts(test_db, sample_user, sample_exercise):
+    created = []
+    for i in range(5):
+        attempt = Attempt(
+            user_id=sample_user.id, exercise_id=sample_exercise.id, code_submitted=f"# attempt {i}",
+            score=1, stars=0, status="graded"
+        )
+        test_db.add(attempt)
+        created.append(attempt)
+    test_db.commit()
+    return created
+
+
+@pytest.fixture
+def regrade_config():
+    with patch('services.regrade_service.Config') as mock_config:
+        mock_config.REGRADE_BATCH_SIZE = 2
+        mock_config.REGRADE_WORKERS = 2
+        mock_config.REGRADE_LEASE_SECONDS = 300
+        yield mock_config
+
+
+def stored_attempts(test_db):
+    test_db.expire_all()
+    return test_db.query(Attempt).order_by(Attempt.id).all()
+
+
+@patch('services.regrade_service.get_regrade_runner')
+class TestRegradeJobs:
+    def test_start_snapshots_attempts_and_queues(self, mock_runner, test_db, sample_exercise, attempts):
+        job = start_regrade(test_db, sample_exercise.id)
+
+        assert job.status == "pending"
+        assert job.total == 5
+        assert job.max_attempt_id == attempts[-1].id
+        mock_runner.return_value.submit.assert_called_once_with(job.id)
+
+    def test_one_active_job_per_exercise(self, mock_runner, test_db, sample_exercise, attempts):
+        start_regrade(test_db, sample_exercise.id)
+
+        with pytest.raises(RegradeInProgress):
+            start_regrade(test_db, sample_exercise.id)
+
+    def test_active_job_is_unique_in_the_database(self, mock_runner, test_db, sample_exercise):
+        from sqlalchemy.exc import IntegrityError
+        test_db.add(RegradeJob(exercise_id=sample_exercise.id, status="completed"))
+        test_db.add(RegradeJob(exercise_id=sample_exercise.id, status="running"))
+        test_db.commit()
+
+        test_db.add(RegradeJob(exercise_id=sample_exercise.id, status="pending"))
+        with pytest.raises(IntegrityError):
+            test_db.commit()
+        test_db.rollback()
+
+    def test_conflicting_insert_reports_the_active_job(self, mock_runner, test_db, sample_exercise):
+        running = RegradeJob(exercise_id=sample_exercise.id, status="running")
+        test_db.add(running)
+        test_db.commit()
+
+        with pytest.raises(RegradeInProgress) as raised:
+            start_regrade(test_db, sample_exercise.id)
+
+        assert raised.value.job.id == running.id
+        assert test_db.query(RegradeJob).count() == 1
+        mock_runner.return_value.submit.assert_not_called()
+
+    def test_finished_jobs_do_not_block_a_new_one(self, mock_runner, test_db, sample_exercise, attempts):
+        test_db.add(RegradeJob(exercise_id=sample_exercise.id, status="completed"))
+        test_db.commit()
+
+        assert start_regrade(test_db, sample_exercise.id).status == "pending"
+
+    def test_unknown_exercise(self, mock_runner, test_db):
+        with pytest.raises(ValueError):
+            start_regrade(test_db, 999)
+
+    @patch('services.regrade_service.grade_submission', return_value=GRADE)
+    def test_run_writes_grades_back_in_batches(self, mock_grade, mock_runner, test_db, sample_exercise, attempts,
+                                               regrade_config):
+        job = start_regrade(test_db, sample_exercise.id)
+
+        with ThreadPoolExecutor(2) as executor:
+            assert run_regrade_job(job.id, executor) == "completed"
+
+        assert mock_grade.call_count == 5
+        assert [(a.score, a.stars, a.efficiency_score) for a in stored_attempts(test_db)] == [(9, 3, 7.5)] * 5
+        test_db.refresh(job)
+        assert regrade_job_to_dict(job)["progress"] == 1.0
+        assert job.last_attempt_id == attempts[-1].id
+
+    @patch('services.regrade_service.grade_submission')
+    def test_resumes_after_cursor(self, mock_grade, mock_runner, test_db, sample_exercise, attempts, regrade_config):
+        mock_grade.side_effect = [RuntimeError("boom")] + [GRADE] * 3
+        job = RegradeJob(
+            exercise_id=sample_exercise.id, status="running", max_attempt_id=attempts[-1].id,
+            last_attempt_id=attempts[0].id, total=5, processed=1,
+            heartbeat_at=datetime.now(timezone.utc) - timedelta(hours=1)
+        )
+        test_db.add(job)
+        test_db.commit()
+
+        with ThreadPoolExecutor(1) as executor:
+            run_regrade_job(job.id, executor)
+
+        assert mock_grade.call_count == 4
+        assert [a.stars for a in stored_attempts(test_db)] == [0, 0, 3, 3, 3]
+        test_db.refresh(job)
+        assert (job.processed, job.failed, job.status) == (5, 1, "completed")
+
+    def test_job_held_by_another_process_is_not_run(self, mock_runner, test_db, sample_exercise, regrade_config):
+        job = RegradeJob(exercise_id=sample_exercise.id, status="running", heartbeat_at=datetime.now(timezone.utc))
+        test_db.add(job)
+        test_db.commit()
+
+        assert run_regrade_job(job.id, MagicMock()) is None
+
+    def test_resume_queues_unfinished_jobs(self, mock_runner, test_db, sample_exercise):
+        other = Exercise(
+            name="Other Exercise", description="", difficulty=1, starter_code="", language="python",
+            function_name="test", test_cases="[]"
+        )
+        test_db.add(other)
+        test_db.commit()
+        test_db.add(RegradeJob(exercise_id=sample_exercise.id, status="pending"))
+        test_db.add(RegradeJob(exercise_id=other.id, status="running"))
+        test_db.add(RegradeJob(exercise_id=sample_exercise.id, status="completed"))
+        test_db.commit()
+
+        assert resume_regrade_jobs() == 2
+        assert mock_runner.return_value.submit.call_count == 2
+
+
+class TestRegradeWorkers:
+    @patch('services.regrade_service.get_db_session')
+    def test_lease_renewed_while_a_batch_runs(self, mock_session, regrade_config):
+        regrade_config.REGRADE_LEASE_SECONDS = 0
+        stop = threading.Event()
+        renewals = threading.Semaphore(0)
+        mock_session.return_value.commit.side_effect = lambda: renewals.release()
+        renewer = threading.Thread(target=renew_lease, args=(3, stop))
+        renewer.start()
+        try:
+            assert renewals.acquire(timeout=5)
+        finally:
+            stop.set()
+            renewer.join(timeout=5)
+
+        assert not renewer.is_alive()
+        assert mock_session.return_value.execute.called
+
+    def test_split_batch_spreads_attempts(self):
+        assert split_batch([1, 2, 3, 4, 5], 2) == [[1, 3, 5], [2, 4]]
+        assert split_batch([1], 4) == [[1]]
+
+    def test_grades_in_a_separate_process(self):
+        fields = {
+            "id": 1, "language": "python", "function_name": "f", "test_cases": "[{\"args\": [], \"expected\": 1}]",
+            "resource_limits": None, "test_shards": None, "test_generators": None, "reference_solution": None,
+            "benchmark_cases": None
+        }
+        with create_regrade_executor() as executor:
+            mappings = executor.submit(regrade_attempts, fields, [(7, "def f(:\n")]).result(timeout=60)
+
+        assert mappings[0]["id"] == 7
+        assert mappings[0]["stars"] == 0
+        assert mappings[0]["status"] == "graded"
+
+
+@pytest.fixture
+def regrade_app(monkeypatch):
+    monkeypatch.setattr("middleware.keycloak_auth.require_auth", lambda f: f)
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    from routes import exercises
+    app.register_blueprint(exercises.bp, url_prefix='/api/exercises')
+
+    @app.before_request
+    def set_user():
+        request.user_info = {'id': 1, 'roles': request.headers.get('X-Roles', '').split(',')}
+    return app
+
+
+class TestRegradeRoutes:
+    def test_requires_admin(self, regrade_app):
+        response = regrade_app.test_client().post('/api/exercises/1/regrade', headers={'X-Roles': 'user'})
+
+        assert response.status_code == 403
+
+    @patch('routes.exercises.start_regrade')
+    def test_admin_starts_job(self, mock_start, regrade_app):
+        mock_start.return_value = RegradeJob(id=3, exercise_id=1, status="pending", total=4, processed=0, failed=0)
+
+        response = regrade_app.test_client().post('/api/exercises/1/regrade', headers={'X-Roles': 'admin'})
+
+        assert response.status_code == 202
+        assert response.headers['Location'] == '/api/exercises/regrade-jobs/3'
+        assert mock_start.call_args[0][1:] == (1, 1)
+
+    @patch('routes.exercises.start_regrade')
+    def test_conflict_returns_running_job(self, mock_start, regrade_app):
+        running = RegradeJob(id=3, exercise_id=1, status="running", total=4, processed=2, failed=0)
+        mock_start.side_effect = RegradeInProgress(running)
+
+        response = regrade_app.test_client().post('/api/exercises/1/regrade', headers={'X-Roles': 'admin'})
+
+        assert response.status_code == 409
+        assert response.json['job']['progress'] == 0.5
+
+    @patch('routes.exercises.get_regrade_job')
+    def test_progress(self, mock_get, regrade_app):
+        mock_get.return_value = RegradeJob(id=3, exercise_id=1, status="running", total=4, processed=1, failed=0)
+        client = regrade_app.test_client()
+
+        response = client.get('/api/exercises/regrade-jobs/3', headers={'X-Roles': 'admin'})
+
+        assert response.json['progress'] == 0.25
+        mock_get.return_value = None
+        assert client.get('/api/exercises/regrade-jobs/4', headers={'X-Roles': 'admin'}).status_code == 404
@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import signal
+import pytest
+from unittest.mock import patch
+from services.process_runner import run_bounded
+from services.resource_limits import resolve_limits, limit_preexec, node_args
+
+requires_rlimits = pytest.mark.skipif(sys.platform == "win32", reason="rlimits need a POSIX system")
+
+
+class TestResolveLimits:
+    @patch('services.resource_limits.Config')
+    def test_defaults_come_from_config(self, mock_config):
+        mock_config.EXECUTION_MEMORY_LIMIT_MB = 128
+        mock_config.EXECUTION_CPU_LIMIT_SECONDS = 3
+        mock_config.EXECUTION_PROCESS_LIMIT = 0
+
+        assert resolve_limits() == {"memory_mb": 128, "cpu_seconds": 3, "max_processes": 0}
+
+    @patch('services.resource_limits.Config')
+    def test_exercise_overrides(self, mock_config):
+        mock_config.EXECUTION_MEMORY_LIMIT_MB = 128
+        mock_config.EXECUTION_CPU_LIMIT_SECONDS = 3
+        mock_config.EXECUTION_PROCESS_LIMIT = 0
+
+        limits = resolve_limits({"memory_mb": 512, "cpu_seconds": None})
+        assert limits == {"memory_mb": 512, "cpu_seconds": 3, "max_processes": 0}
+        assert resolve_limits('{"max_processes": 8}')["max_processes"] == 8
+
+    def test_node_gets_heap_size(self):
+        assert node_args({"memory_mb": 256, "cpu_seconds": 5, "max_processes": 0}) == ["--max-old-space-size=256"]
+        assert node_args({"memory_mb": 0, "cpu_seconds": 5, "max_processes": 0}) == []
+        assert node_args(None) == []
+
+
+@requires_rlimits
+class TestLimitedRuns:
+    def test_memory_limit(self):
+        limits = {"memory_mb": 256, "cpu_seconds": 5, "max_processes": 0}
+        result = run_bounded(
+            [sys.executable, "-c", "x = bytearray(512 * 1024 * 1024)"],
+            timeout=5, max_bytes=4096, preexec_fn=limit_preexec(limits)
+        )
+
+        assert result.returncode == 1
+        assert b"MemoryError" in result.stderr
+
+    def test_cpu_limit(self):
+        limits = {"memory_mb": 0, "cpu_seconds": 1, "max_processes": 0}
+        result = run_bounded(
+            [sys.executable, "-c", "while True: pass"],
+            timeout=10, max_bytes=4096, preexec_fn=limit_preexec(limits)
+        )
+
+        assert result.returncode == -signal.SIGXCPU
+        assert result.usage["cpu_seconds"] > 0.5
+
+    def test_usage_reported(self):
+        result = run_bounded(
+            [sys.executable, "-c", "x = bytearray(64 * 1024 * 1024); x[::4096] = b'1' * len(x[::4096])"],
+            timeout=5, max_bytes=4096
+        )
+
+        assert result.usage["peak_rss_bytes"] > 64 * 1024 * 1024
+        assert result.usage["cpu_seconds"] > 0
+
+    @patch('services.code_execution_service.resolve_limits')
+    def test_execute_code_reports_cpu_limit(self, mock_resolve):
+        from services.code_execution_service import execute_code
+        mock_resolve.return_value = {"memory_mb": 0, "cpu_seconds": 1, "max_processes": 0}
+
+        result = execute_code("while True: pass", "python")
+
+        assert result["error"] == "CPU time limit exceeded"
+        assert result["usage"]["cpu_seconds"] > 0.5
@@ -54,6 +54,88 @@ class TestCodeExecutionRoutes:
             assert response.status_code == 200
             assert response.json['output'] == 'Hello, World!'
 
+    def test_execute_code_rejected_when_saturated(self, client, bypass_auth):
+        from services.admission import AdmissionRejected
+        with patch('routes.code_execution.get_admission_controller') as mock_controller, \
+                patch('routes.code_execution.execute_code') as mock_execute:
+            mock_controller.return_value.slot.side_effect = AdmissionRejected("busy", retry_after=3)
+            response = client.post('/api/code/execute', json={'code': 'print(1)', 'language': 'python'})
+
+            assert response.status_code == 429
+            assert response.headers['Retry-After'] == '3'
+            mock_execute.assert_not_called()
+
+    def test_execute_code_scheduled_by_user(self, app, bypass_auth):
+        from routes.code_execution import execute_code_route
+        with app.test_request_context('/api/code/execute', method='POST', json={'code': '', 'language': 'python'}), \
+                patch('routes.code_execution.get_admission_controller') as mock_controller, \
+                patch('routes.code_execution.execute_code', return_value={'output': '', 'error': None}):
+            request.user_info = {'keycloak_id': 'kc-42'}
+            execute_code_route()
+
+            mock_controller.return_value.slot.assert_called_once_with('kc-42')
+
+    def test_cancel_execution(self, client, bypass_auth):
+        with patch('routes.code_execution.get_execution_registry') as mock_registry:
+            mock_registry.return_value.cancel.return_value = True
+            response = client.post('/api/code/cancel', json={'executionId': 'run-1'})
+
+            assert response.status_code == 200
+            assert response.json['cancelled'] is True
+
+            mock_registry.return_value.cancel.return_value = False
+            assert client.post('/api/code/cancel', json={'executionId': 'run-1'}).status_code == 404
+            assert client.post('/api/code/cancel', json={}).status_code == 400
+
+    def test_execute_code_registers_execution(self, client, bypass_auth):
+        with patch('routes.code_execution.get_execution_registry') as mock_registry, \
+                patch('routes.code_execution.execute_code', return_value={'output': '', 'error': None}) as mock_execute:
+            client.post('/api/code/execute', json={
+                'code': '', 'language': 'python', 'executionId': 'run-2', 'sessionId': 'tab-1'
+            })
+
+            registry = mock_registry.return_value
+            assert registry.start.call_args[0][1:] == ('tab-1', 'run-2')
+            assert mock_execute.call_args[0][2] is registry.start.return_value
+            registry.finish.assert_called_once_with(registry.start.return_value)
+
+    def test_execute_code_stream_rejected_when_saturated(self, client, bypass_auth):
+        from services.admission import AdmissionRejected
+        with patch('routes.code_execution.get_admission_controller') as mock_controller:
+            mock_controller.return_value.acquire.side_effect = AdmissionRejected("busy", retry_after=2)
+            response = client.post('/api/code/execute/stream', json={'code': 'print(1)', 'language': 'python'})
+
+            assert response.status_code == 429
+            assert response.headers['Retry-After'] == '2'
+
+    def test_execute_code_stream(self, client, bypass_auth):
+        events = iter([("output", {"data": "Hello\n"}), ("exit", {"exit_code": 0, "error": None, "timed_out": False})])
+        with patch('routes.code_execution.stream_execution', return_value=events) as mock_stream:
+            response = client.post(
+                '/api/code/execute/stream',
+                json={'code': 'print("Hello")', 'language': 'python'}
+            )
+            body = response.get_data(as_text=True)
+
+            assert response.status_code == 200
+            assert response.mimetype == 'text/event-stream'
+            assert body == (
+                'event: output\ndata: {"data": "Hello\\n"}\n\n'
+                'event: exit\ndata: {"exit_code": 0, "error": null, "timed_out": false}\n\n'
+            )
+            mock_stream.assert_called_once_with('print("Hello")', 'python', execution=None)
+
+    def test_execute_code_stream_releases_slot(self, client, bypass_auth):
+        events = iter([("exit", {"exit_code": 0, "error": None, "timed_out": False})])
+        with patch('routes.code_execution.get_admission_controller') as mock_controller, \
+                patch('routes.code_execution.stream_execution', return_value=events):
+            response = client.post('/api/code/execute/stream', json={'code': '', 'language': 'python'})
+            response.get_data()
+            response.close()
+
+            mock_controller.return_value.acquire.assert_called_once()
+            mock_controller.return_value.release.assert_called_once()
+
 
 class TestAIAssistantRoutes:
     def test_ai_assistant_success(self, client, bypass_auth):
@@ -111,7 +193,8 @@ class TestAttemptsRoutes:
     def test_submit_attempt_success(self, client, bypass_auth, mock_user_info):
         with patch('routes.attempts.get_db_session') as mock_db, \
              patch('routes.attempts.get_or_create_user') as mock_get_user, \
-             patch('routes.attempts.create_attempt') as mock_create:
+             patch('routes.attempts.store_attempt') as mock_store, \
+             patch('routes.attempts.get_grading_queue') as mock_queue:
 
             mock_db.return_value = MagicMock()
             mock_user = MagicMock()
@@ -119,11 +202,10 @@ class TestAttemptsRoutes:
             mock_get_user.return_value = mock_user
 
             mock_attempt = MagicMock()
-            mock_attempt.id = 1
-            mock_attempt.stars = 3
-            mock_attempt.score = 10
+            mock_attempt.id = 7
+            mock_attempt.status = "pending"
             mock_attempt.exercise_id = 1
-            mock_create.return_value = mock_attempt
+            mock_store.return_value = mock_attempt
 
             with client.application.test_request_context(
                 '/api/attempts/',
@@ -132,10 +214,74 @@ class TestAttemptsRoutes:
             ):
                 request.user_info = mock_user_info
                 from routes.attempts import submit_attempt
-                response = submit_attempt()
+                response, status_code, headers = submit_attempt()
 
-            status_code = response[1] if isinstance(response, tuple) else 200
-            assert status_code in [200, 400, 500]
+            assert status_code == 202
+            assert response.json == {"attempt_id": 7, "status": "pending", "user_id": 1, "exercise_id": 1}
+            assert headers["Location"] == "/api/attempts/7"
+            mock_queue.return_value.submit.assert_called_once_with(7)
+
+    def test_submit_attempt_queue_full(self, client, bypass_auth, mock_user_info):
+        from services.grading_queue import GradingQueueFull
+        with patch('routes.attempts.get_db_session') as mock_db, \
+             patch('routes.attempts.get_or_create_user'), \
+             patch('routes.attempts.store_attempt') as mock_store, \
+             patch('routes.attempts.get_grading_queue') as mock_queue:
+
+            session = MagicMock()
+            mock_db.return_value = session
+            mock_queue.return_value.submit.side_effect = GradingQueueFull("Grading queue is full, try again later")
+
+            with client.application.test_request_context(
+                '/api/attempts/',
+                method='POST',
+                json={'exerciseId': 1, 'code': 'test code'}
+            ):
+                request.user_info = mock_user_info
+                from routes.attempts import submit_attempt
+                response, status_code = submit_attempt()
+
+            assert status_code == 503
+            session.delete.assert_called_once_with(mock_store.return_value)
+
+    def test_get_attempt_status_graded(self, client, bypass_auth, mock_user_info):
+        with patch('routes.attempts.get_db_session') as mock_db, \
+             patch('routes.attempts.get_user_by_keycloak_id') as mock_get_user, \
+             patch('routes.attempts.get_attempt') as mock_get_attempt:
+
+            mock_db.return_value = MagicMock()
+            mock_get_user.return_value = MagicMock(id=1)
+            mock_get_attempt.return_value = MagicMock(
+                id=7, user_id=1, exercise_id=2, status="graded", score=9, stars=3,
+                efficiency_score=8.5, relative_runtime=1.18, peak_memory_bytes=2048,
+                attempted_at=None, graded_at=None
+            )
+
+            with client.application.test_request_context('/api/attempts/7', method='GET'):
+                request.user_info = mock_user_info
+                from routes.attempts import get_attempt_status
+                response = get_attempt_status(7)
+
+            assert response.json["status"] == "graded"
+            assert response.json["score"] == 9
+            assert response.json["stars"] == 3
+            assert response.json["efficiency_score"] == 8.5
+
+    def test_get_attempt_status_other_user(self, client, bypass_auth, mock_user_info):
+        with patch('routes.attempts.get_db_session') as mock_db, \
+             patch('routes.attempts.get_user_by_keycloak_id') as mock_get_user, \
+             patch('routes.attempts.get_attempt') as mock_get_attempt:
+
+            mock_db.return_value = MagicMock()
+            mock_get_user.return_value = MagicMock(id=1)
+            mock_get_attempt.return_value = MagicMock(id=7, user_id=2)
+
+            with client.application.test_request_context('/api/attempts/7', method='GET'):
+                request.user_info = mock_user_info
+                from routes.attempts import get_attempt_status
+                response, status_code = get_attempt_status(7)
+
+            assert status_code == 404
 
     def test_submit_attempt_missing_data(self, client, bypass_auth, mock_user_info):
         with client.application.test_request_context(
@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import json
+import shutil
+import pytest
+from unittest.mock import patch
+from services.syntax_check import check_syntax
+
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+
+class TestCheckSyntax:
+    def test_python_syntax_error(self):
+        error = check_syntax("print('unclosed", "python")
+        assert "SyntaxError: unterminated string literal" in error
+        assert 'line 1' in error
+
+    def test_python_indentation_error(self):
+        assert "IndentationError" in check_syntax("def f():\nreturn 1", "python")
+
+    def test_python_valid_code(self):
+        assert check_syntax("def f(x):\n    return x * 2\n", "python") is None
+
+    def test_python_code_is_not_run(self, capsys):
+        assert check_syntax("print('side effect')", "python") is None
+        assert capsys.readouterr().out == ""
+
+    @patch('services.syntax_check.Config')
+    def test_disabled(self, mock_config):
+        mock_config.SYNTAX_PRECHECK = False
+        assert check_syntax("print('unclosed", "python") is None
+
+    @requires_node
+    def test_javascript_syntax_error(self):
+        error = check_syntax("let x = ;", "javascript")
+        assert "SyntaxError: Unexpected token ';'" in error
+        assert error.startswith("main.js:1")
+
+    @requires_node
+    def test_javascript_valid_code(self):
+        assert check_syntax("const x = require('fs');\nconsole.log(x);", "javascript") is None
+
+    @requires_node
+    def test_javascript_top_level_return_is_rejected(self):
+        error = check_syntax("console.log(1);\nreturn 1;", "javascript")
+        assert "SyntaxError: Illegal return statement" in error
+
+    @requires_node
+    def test_javascript_esm_import_is_left_to_the_run(self):
+        assert check_syntax("import fs from 'fs';\nconsole.log(fs);", "javascript") is None
+
+    @requires_node
+    def test_javascript_esm_export_is_left_to_the_run(self):
+        assert check_syntax("export const x = 1;", "javascript") is None
+
+    @requires_node
+    def test_javascript_top_level_await_is_left_to_the_run(self):
+        assert check_syntax("const x = await Promise.resolve(3);\nconsole.log(x);", "javascript") is None
+
+
+class TestSyntaxFastPath:
+    @patch('services.code_execution_service.run_bounded')
+    def test_execute_code_returns_without_spawning(self, mock_run):
+        from services.code_execution_service import execute_code
+
+        result = execute_code("def f(:\n    pass", "python")
+
+        assert result["output"] == "(no output)"
+        assert "SyntaxError: invalid syntax" in result["error"]
+        mock_run.assert_not_called()
+
+    @patch('services.attempt_service.grade_python_attempt')
+    def test_grade_submission_zero_score(self, mock_grade, test_db, sample_exercise):
+        from services.attempt_service import grade_submission
+        sample_exercise.test_cases = json.dumps([{"args": [], "expected": 1}] * 2)
+
+        result = grade_submission("def test(:\n    pass", sample_exercise)
+
+        mock_grade.assert_not_called()
+        assert result["stars"] == 0
+        assert result["style_score"] == 0.0
+        assert result["tests_total"] == 2
+        assert [t["exception"] for t in result["test_results"]] == ["SyntaxError", "SyntaxError"]
+        assert "SyntaxError" in result["feedback"]
@@ -0,0 +1,445 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import os
+import shutil
+import pytest
+from unittest.mock import patch, MagicMock
+from services.resource_limits import limit_preexec
+from services.worker_pool import WorkerPool, WorkerError, WorkerDesync
+from workers.python_worker import run_snippet
+
+WORKERS_DIR = Path(__file__).parent.parent / "src" / "workers"
+PYTHON_WORKER = [sys.executable, "-u", str(WORKERS_DIR / "python_worker.py")]
+NODE_WORKER = ["node", str(WORKERS_DIR / "node_worker.js")]
+
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+requires_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="zygote backend needs os.fork")
+
+
+class TestPythonWorker:
+    def test_run_snippet_captures_stdout(self):
+        result = run_snippet("print('hello')")
+        assert result["output"] == "hello\n"
+        assert result["error"] == ""
+
+    def test_run_snippet_uses_clean_namespace(self):
+        run_snippet("leaked = 1")
+        result = run_snippet("print(leaked)")
+        assert "NameError" in result["error"]
+
+    def test_run_snippet_traceback_skips_worker_frame(self):
+        result = run_snippet("raise ValueError('boom')")
+        assert "ValueError: boom" in result["error"]
+        assert "run_snippet" not in result["error"]
+
+    def test_run_snippet_syntax_error(self):
+        result = run_snippet("print('unclosed")
+        assert "SyntaxError" in result["error"]
+
+    def test_run_snippet_sys_exit(self):
+        result = run_snippet("import sys\nprint('before')\nsys.exit('bye')")
+        assert result["output"] == "before\n"
+        assert result["error"] == "bye\n"
+
+    def test_run_snippet_output_cap(self):
+        result = run_snippet("try:\n    while True: print('x' * 10)\nexcept Exception:\n    pass", max_output_bytes=25)
+        assert result["output"] == "xxxxxxxxxx\nxxxxxxxxxx\nxxx"
+        assert result["truncated"] is True
+        assert run_snippet("print('ok')", max_output_bytes=25)["truncated"] is False
+
+
+class TestWorkerPool:
+    def test_run_returns_worker_response(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        try:
+            result = pool.run({"code": "print(6 * 7)"}, timeout=5)
+            assert result["output"] == "42\n"
+        finally:
+            pool.shutdown()
+
+    def test_worker_recycled_after_max_runs(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=2)
+        try:
+            first = pool.run({"code": "import os; print(os.getppid())"}, timeout=5)
+            second = pool.run({"code": "import os; print(os.getppid())"}, timeout=5)
+            third = pool.run({"code": "import os; print(os.getppid())"}, timeout=5)
+            assert first["output"] == second["output"]
+            assert third["output"] != second["output"]
+        finally:
+            pool.shutdown()
+
+    def test_worker_recycled_after_cpu_budget(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10, cpu_budget=0.5)
+        pid = "import os; print(os.getppid())"
+        try:
+            first = pool.run({"code": pid}, timeout=5)["output"]
+            assert pool.run({"code": pid}, timeout=5)["output"] == first
+            pool.run({"code": "import time\nend = time.process_time() + 0.6\nwhile time.process_time() < end: pass"},
+                     timeout=5)
+            assert pool.run({"code": pid}, timeout=5)["output"] != first
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="rlimits need a POSIX system")
+    def test_workers_run_under_rlimits(self):
+        limits = {"memory_mb": 0, "cpu_seconds": 1, "max_processes": 0}
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10, preexec_fn=limit_preexec(limits))
+        try:
+            result = pool.run({"code": "import resource; print(resource.getrlimit(resource.RLIMIT_CPU))"}, timeout=5)
+            assert result["output"] == "(1, 2)\n"
+            assert pool.run({"code": "while True: pass"}, timeout=5)["error"] == "CPU time limit exceeded"
+            assert pool.run({"code": "print('ok')"}, timeout=5)["output"] == "ok\n"
+        finally:
+            pool.shutdown()
+
+    def test_timeout_recycles_worker(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        try:
+            with pytest.raises(TimeoutError):
+                pool.run({"code": "while True: pass"}, timeout=0.5)
+            result = pool.run({"code": "print('recovered')"}, timeout=5)
+            assert result["output"] == "recovered\n"
+        finally:
+            pool.shutdown()
+
+    def test_crashed_worker_raises(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        try:
+            with pytest.raises(WorkerError):
+                pool.run({"code": "import os, signal; os.kill(os.getppid(), signal.SIGKILL)"}, timeout=5)
+            result = pool.run({"code": "print('ok')"}, timeout=5)
+            assert result["output"] == "ok\n"
+        finally:
+            pool.shutdown()
+
+    def test_forged_response_does_not_reach_the_pool(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        code = (
+            "import os\n"
+            "for fd in range(3, 20):\n"
+            "    try:\n"
+            "        os.write(fd, b'{\"output\": \"forged\", \"error\": \"\"}\\n')\n"
+            "    except OSError:\n"
+            "        pass\n"
+            "print('secret of user A')\n"
+        )
+        try:
+            # The pool's pipes are closed in the forked run, so only its own result is garbled
+            assert pool.run({"code": code}, timeout=5)["output"] != "forged"
+            assert pool.run({"code": "print('user B')"}, timeout=5)["output"] == "user B\n"
+        finally:
+            pool.shutdown()
+
+    def test_patched_builtins_do_not_reach_next_run(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        try:
+            pool.run({"code": "__builtins__['len'] = lambda x: 0\nprint = None"}, timeout=5)
+            assert pool.run({"code": "print(len('abc'))"}, timeout=5)["output"] == "3\n"
+        finally:
+            pool.shutdown()
+
+    def test_patched_modules_do_not_reach_next_run(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        worker = "import os; print(os.getppid())"
+        try:
+            first = pool.run({"code": worker}, timeout=5)["output"]
+            pool.run({"code": "import builtins, json\nbuiltins.print = len\njson.dumps = None"}, timeout=5)
+            assert pool.run({"code": "import json; print(json.dumps([1]))"}, timeout=5)["output"] == "[1]\n"
+            assert pool.run({"code": worker}, timeout=5)["output"] == first
+        finally:
+            pool.shutdown()
+
+    def test_patched_class_attributes_do_not_reach_next_run(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        attacker = (
+            "import sys\n"
+            "writer = sys.modules['__main__'].CappedWriter\n"
+            "if not hasattr(writer, 'seen'):\n"
+            "    writer.seen, original = [], writer.write\n"
+            "    writer.write = lambda self, text: (writer.seen.append(text), original(self, text))[1]\n"
+            "print(writer.seen)\n"
+        )
+        try:
+            pool.run({"code": attacker}, timeout=5)
+            assert pool.run({"code": "print('victim secret')"}, timeout=5)["output"] == "victim secret\n"
+            assert "victim secret" not in pool.run({"code": attacker}, timeout=5)["output"]
+        finally:
+            pool.shutdown()
+
+    def test_run_past_its_timeout_is_killed(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        try:
+            assert pool.run({"code": "while True: pass", "timeout_ms": 300}, timeout=5)["timed_out"] is True
+            assert pool.run({"code": "print('next')"}, timeout=5)["output"] == "next\n"
+        finally:
+            pool.shutdown()
+
+    def test_modules_imported_by_a_run_are_unloaded(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10)
+        try:
+            pool.run({"code": "import textwrap\ntextwrap.dedent = None"}, timeout=5)
+            assert pool.run({"code": "import textwrap; print(textwrap.dedent(' a'))"}, timeout=5)["output"] == "a\n"
+        finally:
+            pool.shutdown()
+
+    def test_queue_timeout_when_saturated(self):
+        pool = WorkerPool("test", PYTHON_WORKER, size=1, max_runs=10, queue_timeout=0.1)
+        try:
+            pool._idle.get()
+            with pytest.raises(TimeoutError):
+                pool.run({"code": "print(1)"}, timeout=5)
+        finally:
+            pool.shutdown()
+
+
+@requires_node
+class TestNodeWorker:
+    def run(self, pool, code, timeout_ms=1000):
+        return pool.run({"code": code, "timeout_ms": timeout_ms}, timeout=5)
+
+    def test_console_output_captured(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        try:
+            result = self.run(pool, "console.log('hi', 1 + 1); console.error('oops')")
+            assert result["output"] == "hi 2\n"
+            assert result["error"] == "oops\n"
+            assert result["timed_out"] is False
+        finally:
+            pool.shutdown()
+
+    def test_fresh_context_per_run(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        try:
+            self.run(pool, "var leaked = 1;")
+            result = self.run(pool, "console.log(typeof leaked)")
+            assert result["output"] == "undefined\n"
+        finally:
+            pool.shutdown()
+
+    def test_infinite_loop_times_out_in_vm(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        try:
+            result = self.run(pool, "while (true) {}", timeout_ms=200)
+            assert result["timed_out"] is True
+            assert self.run(pool, "console.log('alive')")["output"] == "alive\n"
+        finally:
+            pool.shutdown()
+
+    def test_timers_are_awaited(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        try:
+            result = self.run(pool, "setTimeout(() => console.log('later'), 20); console.log('now')")
+            assert result["output"] == "now\nlater\n"
+        finally:
+            pool.shutdown()
+
+    def test_output_cap_stops_script(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        try:
+            code = "try { while (true) console.log('x'.repeat(10)); } catch (e) {}"
+            result = pool.run({"code": code, "timeout_ms": 1000, "max_output_bytes": 25}, timeout=5)
+            assert result["output"] == "xxxxxxxxxx\nxxxxxxxxxx\nxxx"
+            assert result["truncated"] is True
+            assert result["timed_out"] is False
+        finally:
+            pool.shutdown()
+
+    def test_forged_response_retires_worker(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        code = (
+            "console.log.constructor('return process')().stdout.write("
+            "JSON.stringify({output: 'forged', error: ''}) + '\\n'); console.log('secret of user A')"
+        )
+        try:
+            with pytest.raises(WorkerDesync):
+                self.run(pool, code)
+            assert self.run(pool, "console.log('user B')")["output"] == "user B\n"
+        finally:
+            pool.shutdown()
+
+    @patch.dict('services.code_execution_service._pools', clear=True)
+    def test_host_process_escape_does_not_reach_next_run(self):
+        from services.code_execution_service import execute_in_pool, get_pool
+        attacker = (
+            "const host = console.log.constructor('return process')();"
+            "const util = host.mainModule.require('util');"
+            "if (!util.seen) { util.seen = []; const format = util.format;"
+            "  util.format = (...args) => { util.seen.push(args.join(' ')); return format(...args); }; }"
+            "console.log(JSON.stringify(util.seen));"
+        )
+        pool = get_pool("javascript")
+        try:
+            execute_in_pool(pool, attacker)
+            assert execute_in_pool(pool, "console.log('victim secret')")["output"] == "victim secret"
+            assert "victim secret" not in execute_in_pool(pool, attacker)["output"]
+        finally:
+            pool.shutdown()
+
+    def test_host_modules_are_not_available(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        try:
+            result = self.run(pool, "require('process')")
+            assert "Cannot find module 'process'" in result["error"]
+            assert "node_worker" not in result["error"]
+            assert self.run(pool, "console.log(require('util').format('%d', 7))")["output"] == "7\n"
+        finally:
+            pool.shutdown()
+
+    def test_process_stdout_write(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        try:
+            result = self.run(pool, "process.stdout.write('a'); process.stderr.write('b'); console.log('c')")
+            assert result["output"] == "ac\n"
+            assert result["error"] == "b"
+        finally:
+            pool.shutdown()
+
+    def test_uncaught_error_reported(self):
+        pool = WorkerPool("test-node", NODE_WORKER, size=1, max_runs=10)
+        try:
+            result = self.run(pool, "console.log(undefinedVariable)")
+            assert "ReferenceError: undefinedVariable is not defined" in result["error"]
+            assert "node:vm" not in result["error"]
+        finally:
+            pool.shutdown()
+
+
+@requires_fork
+class TestZygote:
+    @pytest.fixture
+    def zygote(self):
+        from services.zygote import Zygote
+        zygote = Zygote()
+        yield zygote
+        zygote.shutdown()
+
+    def test_run_in_forked_child(self, zygote):
+        first = zygote.run({"code": "import os; print(os.getpid())"}, timeout=5)
+        second = zygote.run({"code": "import os; print(os.getpid())"}, timeout=5)
+        assert first["output"] != second["output"]
+        assert first["error"] == ""
+
+    def test_children_do_not_share_random_state(self, zygote):
+        code = "import random; print(random.random())"
+        first = zygote.run({"code": code}, timeout=5)
+        second = zygote.run({"code": code}, timeout=5)
+        assert first["output"] != second["output"]
+
+    def test_timeout_kills_child(self, zygote):
+        with pytest.raises(TimeoutError):
+            zygote.run({"code": "while True: pass"}, timeout=0.5)
+        assert zygote.run({"code": "print('ok')"}, timeout=5)["output"] == "ok\n"
+
+    def test_child_applies_limits_and_reports_usage(self, zygote):
+        limits = {"memory_mb": 256, "cpu_seconds": 5, "max_processes": 0}
+        result = zygote.run({"code": "x = bytearray(512 * 1024 * 1024)", "limits": limits}, timeout=5)
+        assert "MemoryError" in result["error"]
+        assert result["usage"]["peak_rss_bytes"] > 0
+        assert zygote.run({"code": "x = bytearray(512 * 1024 * 1024)"}, timeout=5)["error"] == ""
+
+    def test_restarts_after_zygote_dies(self, zygote):
+        zygote.run({"code": "pass"}, timeout=5)
+        zygote._process.kill()
+        zygote._process.wait()
+        assert zygote.run({"code": "print('back')"}, timeout=5)["output"] == "back\n"
+
+
+class TestPoolExecutionBackend:
+    @patch('services.code_execution_service.get_pool')
+    @patch('services.code_execution_service.Config')
+    def test_execute_python_uses_pool(self, mock_config, mock_get_pool):
+        from services.code_execution_service import execute_code
+
+        mock_config.PYTHON_EXECUTION_BACKEND = "pool"
+        mock_pool = MagicMock()
+        mock_pool.run.return_value = {"output": "Hello\n", "error": ""}
+        mock_get_pool.return_value = mock_pool
+
+        result = execute_code("print('Hello')", "python")
+
+        assert result == {"output": "Hello", "error": None, "truncated": False, "usage": None}
+        mock_get_pool.assert_called_once_with("python")
+        assert mock_pool.run.call_args[0][0]["code"] == "print('Hello')"
+
+    @patch('services.code_execution_service.get_pool')
+    @patch('services.code_execution_service.Config')
+    def test_execute_javascript_uses_pool(self, mock_config, mock_get_pool):
+        from services.code_execution_service import execute_code
+
+        mock_config.JAVASCRIPT_EXECUTION_BACKEND = "pool"
+        mock_pool = MagicMock()
+        mock_pool.run.return_value = {"output": "Hello\n", "error": "", "timed_out": False}
+        mock_get_pool.return_value = mock_pool
+
+        result = execute_code("console.log('Hello')", "javascript")
+
+        assert result == {"output": "Hello", "error": None, "truncated": False, "usage": None}
+        mock_get_pool.assert_called_once_with("javascript")
+
+    def test_execute_in_pool_worker_reports_timeout(self):
+        from services.code_execution_service import execute_in_pool
+
+        mock_pool = MagicMock()
+        mock_pool.run.return_value = {"output": "", "error": "", "timed_out": True}
+
+        result = execute_in_pool(mock_pool, "while (true) {}")
+
+        assert result["error"] == "Execution timed out"
+        assert result["usage"] is None
+
+    def test_execute_in_pool_timeout(self):
+        from services.code_execution_service import execute_in_pool
+
+        mock_pool = MagicMock()
+        mock_pool.run.side_effect = TimeoutError()
+
+        result = execute_in_pool(mock_pool, "while True: pass")
+
+        assert result["error"] == "Execution timed out"
+        assert result["usage"] is None
+
+    def test_execute_in_pool_worker_error(self):
+        from services.code_execution_service import execute_in_pool
+
+        mock_pool = MagicMock()
+        mock_pool.run.side_effect = WorkerError("Worker exited unexpectedly")
+
+        result = execute_in_pool(mock_pool, "import os; os._exit(1)")
+
+        assert result["error"] == "Execution error: Worker exited unexpectedly"
+        assert result["usage"] is None
+
+    @patch('services.code_execution_service.get_zygote')
+    @patch('services.code_execution_service.Config')
+    def test_execute_python_uses_zygote(self, mock_config, mock_get_zygote):
+        from services.code_execution_service import execute_code
+
+        mock_config.PYTHON_EXECUTION_BACKEND = "zygote"
+        mock_get_zygote.return_value.run.return_value = {"output": "Hello\n", "error": ""}
+
+        result = execute_code("print('Hello')", "python")
+
+        assert result == {"output": "Hello", "error": None, "truncated": False, "usage": None}
+
+    @patch('services.attempt_service.get_zygote')
+    @patch('services.attempt_service.Config')
+    def test_grading_runs_on_zygote(self, mock_config, mock_get_zygote):
+        from services.attempt_service import run_python_source
+
+        mock_config.PYTHON_EXECUTION_BACKEND = "zygote"
+        mock_get_zygote.return_value.run.return_value = {"output": "RESULTS: 1/1\n", "error": ""}
+
+        assert run_python_source("print('RESULTS: 1/1')") == "RESULTS: 1/1\n"
+
+    @patch('services.attempt_service.get_zygote')
+    @patch('services.attempt_service.Config')
+    def test_grading_zygote_failure_returns_empty_output(self, mock_config, mock_get_zygote):
+        from services.attempt_service import run_python_source
+
+        mock_config.PYTHON_EXECUTION_BACKEND = "zygote"
+        mock_get_zygote.return_value.run.side_effect = TimeoutError()
+
+        assert run_python_source("while True: pass") == ""